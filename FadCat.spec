@@ -7,7 +7,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
-        ('src/core/pidcat.py', 'src/core'),
+        ('src/__init__.py', 'src'),
+        ('src/core/*.py', 'src/core'),
     ],
     hiddenimports=[
         'PyQt6',
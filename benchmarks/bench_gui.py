@@ -0,0 +1,236 @@
+"""Headless throughput, latency and memory benchmark for the FadCat GUI.
+
+Runs the real LogcatGUI window under QT_QPA_PLATFORM=offscreen and feeds its
+first tab through the same path a capture uses: a ProcessReader on a worker
+thread reads a child process over a pty into a bounded LineQueue, and
+LogcatTab._drain_queue moves the lines into the view. The child replays a synthetic corpus, rendered by
+pidcat exactly as the GUI receives it, at a fixed rate (or as fast as
+possible). No device is needed.
+
+Reported:
+  lines_per_s        sustained append rate while the stream runs
+  stall_max_ms/p99   how late a 5 ms main-thread timer fired (event-loop latency)
+  dropped            lines the queue shed under its overload policy
+  rss_mb_per_100k    resident memory growth per 100k lines
+  search_ms          search-bar latency for a few queries once the tab holds
+                     --search-lines lines (1M by default)
+
+  python benchmarks/bench_gui.py --lines 200000 --rate 20000
+  python benchmarks/bench_gui.py --rate 0 --search-lines 0     # throughput only
+  python benchmarks/bench_gui.py --rate 0 --policy block        # no shedding
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from src.core.line_queue import POLICIES  # noqa: E402
+
+TICK = 0.01            # feeder write interval
+PROBE_MS = 5           # event-loop probe interval
+SEARCH_QUERIES = (
+    ('rare literal', 'BadTokenException'),
+    ('common literal', 'example.com'),
+    ('field query', 'level>=E && tag~"^Android"'),
+)
+
+
+def rss_bytes():
+    """Current resident set size, or None where it can't be read cheaply."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def feed(path, rate):
+    """Child mode: copies a rendered stream to stdout at rate lines/s (0 = unthrottled)."""
+    with open(path, 'rb') as f:
+        lines = f.readlines()
+    out = sys.stdout.buffer
+    if rate <= 0:
+        for i in range(0, len(lines), 1024):
+            out.write(b''.join(lines[i:i + 1024]))
+        out.flush()
+        return
+    per_tick = max(int(rate * TICK), 1)
+    start = time.perf_counter()
+    for n, i in enumerate(range(0, len(lines), per_tick)):
+        delay = start + n * per_tick / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        out.write(b''.join(lines[i:i + per_tick]))
+        out.flush()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class GuiBench:
+    def __init__(self, opts):
+        from PyQt6.QtCore import QTimer
+        from PyQt6.QtWidgets import QApplication
+
+        self.opts = opts
+        self.app = QApplication.instance() or QApplication([])
+        if opts.tab_only:
+            from src.ui.logcat_tab import LogcatTab
+            self.window = self.tab = LogcatTab()
+        else:
+            from src.ui.gui_app import LogcatGUI
+            self.window = LogcatGUI()
+            self.tab = self.window._current_tab()
+        self.window.resize(1400, 900)
+        self.window.show()
+
+        self.appended = 0
+        self.first_append = self.last_append = None
+        original = self.tab._append_lines
+
+        def counting_append(lines):
+            now = time.perf_counter()
+            if self.first_append is None:
+                self.first_append = now
+            original(lines)
+            self.appended += len(lines)
+            self.last_append = time.perf_counter()
+        self.tab._append_lines = counting_append
+
+        self.stalls = []
+        self._last_probe = None
+        self.probe = QTimer()
+        self.probe.setInterval(PROBE_MS)
+        self.probe.timeout.connect(self._on_probe)
+
+    def _on_probe(self):
+        now = time.perf_counter()
+        if self._last_probe is not None:
+            self.stalls.append(max((now - self._last_probe) * 1000 - PROBE_MS, 0.0))
+        self._last_probe = now
+
+    def stream(self, rendered_path):
+        """Replays the rendered corpus through ProcessReader and LineQueue into the tab."""
+        from PyQt6.QtCore import QThread, QTimer
+        from src.core.line_queue import LineQueue
+        from src.core.process_reader import ProcessReader
+        from src.core.settings import Settings
+
+        settings = Settings()
+        cmd = [sys.executable, os.path.abspath(__file__), '--feed', rendered_path, '--rate', str(self.opts.rate)]
+        tab = self.tab
+        thread = QThread()
+        queue = tab._queue = LineQueue(self.opts.queue_lines or settings.queue_lines,
+                                       self.opts.policy or settings.overload_policy, tab._stats)
+        reader = ProcessReader(cmd=cmd, stats=tab._stats, queue=queue)
+        reader.moveToThread(thread)
+        thread.started.connect(reader.run)
+        reader.lines_available.connect(tab._drain_queue)
+        reader.finished.connect(thread.quit)
+
+        def finish():
+            # The reader is done; wait for the tab to drain what it queued.
+            if len(queue):
+                QTimer.singleShot(PROBE_MS, finish)
+            else:
+                self.app.quit()
+        thread.finished.connect(finish)
+
+        rss_before = rss_bytes()
+        self.probe.start()
+        thread.start()
+        self.app.exec()
+        self.probe.stop()
+        thread.wait()
+        self.app.processEvents()
+        rss_after = rss_bytes()
+
+        elapsed = (self.last_append or 0) - (self.first_append or 0)
+        result = {
+            'lines': self.appended,
+            'lines_per_s': round(self.appended / elapsed) if elapsed > 0 else None,
+            'stall_max_ms': round(max(self.stalls, default=0.0), 1),
+            'stall_p99_ms': round(percentile(self.stalls, 0.99), 1),
+            'dropped': tab._stats.lines_dropped,
+        }
+        if rss_before is not None and self.appended:
+            result['rss_mb_per_100k'] = round((rss_after - rss_before) / self.appended * 100000 / 2**20, 1)
+        return result
+
+    def search(self, rendered, target):
+        """Fills the tab up to target lines, then times the search bar."""
+        batch = 4096
+        while self.tab.line_count < target:
+            need = target - self.tab.line_count
+            for i in range(0, min(need, len(rendered)), batch):
+                self.tab._append_lines(rendered[i:min(i + batch, need)])
+            self.app.processEvents()
+        results = {}
+        for label, query in SEARCH_QUERIES:
+            self.tab.search_edit.clear()
+            start = time.perf_counter()
+            self.tab.search_edit.setText(query)
+            self.app.processEvents()
+            results[label] = {
+                'query': query,
+                'ms': round((time.perf_counter() - start) * 1000, 1),
+                'matches': self.tab.lbl_match.text(),
+            }
+        self.tab.search_edit.clear()
+        return {'lines': self.tab.line_count, 'queries': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the GUI append path and search offscreen.')
+    parser.add_argument('-n', '--lines', type=int, default=200000, help='Lines to stream (default: 200000)')
+    parser.add_argument('--rate', type=float, default=20000, help='Lines/s to stream at, 0 = as fast as possible (default: 20000)')
+    parser.add_argument('--search-lines', type=int, default=1000000, help='Tab size for the search timings, 0 to skip (default: 1000000)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='Corpus seed (default: 0)')
+    parser.add_argument('--policy', choices=POLICIES, help='Queue overload policy (default: the setting)')
+    parser.add_argument('--queue-lines', type=int, help='Queue capacity in lines (default: the setting)')
+    parser.add_argument('--tab-only', action='store_true', help='Use a bare LogcatTab instead of the main window')
+    parser.add_argument('--save', metavar='FILE', help='Write the results as JSON')
+    parser.add_argument('--feed', metavar='FILE', help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+
+    if opts.feed:
+        feed(opts.feed, opts.rate)
+        return
+
+    from bench_pipeline import render_annotated
+    from src.core.logline import parse_line
+    from src.utils.logcat_gen import generate_lines
+
+    records = [r for r in map(parse_line, generate_lines(opts.lines, 'threadtime', opts.seed)) if r]
+    rendered = render_annotated(records)
+
+    bench = GuiBench(opts)
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as f:
+        f.writelines(rendered)
+    try:
+        report = {'rate': opts.rate, 'stream': bench.stream(f.name)}
+    finally:
+        os.unlink(f.name)
+    print(f'stream  {report["stream"]}', file=sys.stderr)
+    if opts.search_lines:
+        report['search'] = bench.search(rendered, opts.search_lines)
+        print(f'search  {report["search"]}', file=sys.stderr)
+
+    if opts.save:
+        with open(opts.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
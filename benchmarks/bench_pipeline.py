@@ -0,0 +1,293 @@
+"""Throughput and allocation benchmarks for the FadCat pipeline stages.
+
+Runs a seeded synthetic corpus (src/utils/logcat_gen.py) through each stage on
+its own and reports lines/s plus traced Python memory per 1000 lines:
+
+  parse         logline.parse_line on raw threadtime lines
+  filter        the compiled filter predicate pidcat builds from its flags
+  render        pidcat's process_record in colored text mode (PID tracking + rendering)
+  structured    pidcat's process_record with --format tsv
+  reader        ProcessReader reading a corpus file through a pty and splitting lines
+  append        LogcatTab._append_lines with pidcat's annotated output (offscreen Qt)
+  store         RecordStore.append of parsed records (retained memory is the store itself)
+
+  python benchmarks/bench_pipeline.py --lines 200000
+  python benchmarks/bench_pipeline.py --save baseline.json
+  python benchmarks/bench_pipeline.py --compare baseline.json   # exits 1 on a regression
+
+Peak/retained memory comes from tracemalloc, so it covers Python objects only
+(not Qt's C++ allocations).
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from src.core.filter_query import compile_query, flags_query  # noqa: E402
+from src.core.logline import parse_line  # noqa: E402
+from src.utils.logcat_gen import generate_lines  # noqa: E402
+
+PIDCAT = os.path.join(ROOT, 'src', 'core', 'pidcat.py')
+
+
+# ── Harness ───────────────────────────────────────────────────────────────────
+
+def measure(run, items, repeat, alloc_sample):
+    """Best-of-repeat throughput of run(items), plus memory traced over a sample.
+
+    run receives a list and must process every element of it.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(items)
+        best = min(best, time.perf_counter() - start)
+
+    sample = items[:alloc_sample]
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    run(sample)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_k = 1000 / max(len(sample), 1) / 1024
+    return {
+        'lines_per_s': round(len(items) / best),
+        'peak_kib_per_1k': round((peak - base) * per_k, 1),
+        'retained_kib_per_1k': round(max(current - base, 0) * per_k, 1),
+    }
+
+
+@contextlib.contextmanager
+def _terminal_stdout():
+    """Points stdout at a pty (or devnull) so pidcat renders as it does for the GUI."""
+    if os.name == 'posix':
+        import pty
+        master, slave = pty.openpty()
+        stream = os.fdopen(slave, 'w')
+    else:
+        master, stream = None, open(os.devnull, 'w')
+    try:
+        with contextlib.redirect_stdout(stream), contextlib.redirect_stderr(stream):
+            yield
+    finally:
+        stream.close()
+        if master is not None:
+            os.close(master)
+
+
+def load_pidcat(*argv):
+    """Runs pidcat.py on an empty file and returns its globals.
+
+    pidcat is a script, so this is how its pipeline functions (process_line,
+    process_record, ...) can be timed in-process with a given set of flags.
+    """
+    namespace = {'__name__': 'pidcat', '__file__': PIDCAT}
+    with open(PIDCAT, encoding='utf-8') as f:
+        code = compile(f.read(), PIDCAT, 'exec')
+    saved_argv = sys.argv
+    os.environ.setdefault('COLUMNS', '2000')
+    with tempfile.NamedTemporaryFile(suffix='.txt') as empty, _terminal_stdout():
+        sys.argv = [PIDCAT, *argv, '-f', empty.name]
+        try:
+            exec(code, namespace)
+        except SystemExit:
+            pass
+        finally:
+            sys.argv = saved_argv
+    return namespace
+
+
+# ── Stages ────────────────────────────────────────────────────────────────────
+
+def bench_parse(lines, opts):
+    def run(items):
+        for line in items:
+            parse_line(line)
+    return measure(run, lines, opts.repeat, opts.alloc_sample)
+
+
+def bench_filter(records, opts):
+    app = {r.pid for r in records[:5000]}
+    predicate = compile_query(flags_query(2, ['Camera.*', 'FadCam', 'AndroidRuntime'], ['chatty'], app_only=True)
+                              + ' && !msg:"pending"', sets={'app': app})
+
+    def run(items):
+        for record in items:
+            predicate(record)
+    return measure(run, records, opts.repeat, opts.alloc_sample)
+
+
+def bench_process_record(records, opts, *argv):
+    # A fresh pidcat per run so PID tracking starts from the same state.
+    instances = [load_pidcat(*argv) for _ in range(opts.repeat + 1)]
+
+    def run(items):
+        process_record = instances.pop()['process_record']
+        out = []
+        for record in items:
+            process_record(record, out)
+            if len(out) >= 512:
+                out = []
+    return measure(run, records, opts.repeat, opts.alloc_sample)
+
+
+def bench_reader(path, count, opts):
+    from src.core.process_reader import ProcessReader
+
+    def run(items):
+        reader = ProcessReader(cmd=['cat', path])
+        received = []
+        reader.lines_ready.connect(lambda batch: received.append(len(batch)))
+        reader.run()  # synchronously, with the direct signal connection
+        if sum(received) < count:
+            raise RuntimeError(f'ProcessReader delivered {sum(received)} of {count} lines')
+    result = measure(run, [None] * count, opts.repeat, 0)
+    result.pop('peak_kib_per_1k'), result.pop('retained_kib_per_1k')
+    return result
+
+
+def bench_append(rendered, opts):
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.logcat_tab import LogcatTab
+
+    app = QApplication.instance() or QApplication([])
+    batches = [rendered[i:i + 256] for i in range(0, len(rendered), 256)]
+
+    def run(items):
+        tab = LogcatTab()
+        tab.btn_autoscroll.setChecked(False)
+        for batch in items:
+            tab._append_lines(batch)
+        app.processEvents()
+        tab.deleteLater()
+    result = measure(run, batches, opts.repeat, max(opts.alloc_sample // 256, 1))
+    # measure() counted batches; report per line
+    per_batch = len(rendered) / len(batches)
+    result['lines_per_s'] = round(result['lines_per_s'] * per_batch)
+    result['peak_kib_per_1k'] = round(result['peak_kib_per_1k'] / per_batch, 1)
+    result['retained_kib_per_1k'] = round(result['retained_kib_per_1k'] / per_batch, 1)
+    return result
+
+
+def bench_store(records, opts):
+    from src.core.record_store import RecordStore
+
+    fields = [((r.timestamp, r.level, r.tag, r.pid, r.tid), r.message) for r in records]
+    stores = []
+
+    def run(items):
+        store = RecordStore()
+        append = store.append
+        for meta, message in items:
+            append(message, meta, 'com.fadcam.beta')
+        stores[:] = [store]     # kept alive so tracemalloc sees it as retained
+    result = measure(run, fields, opts.repeat, opts.alloc_sample)
+    stores.clear()
+    return result
+
+
+def render_annotated(records):
+    """pidcat's output for records as the GUI receives it."""
+    process_record = load_pidcat('--annotate')['process_record']
+    out = []
+    for record in records:
+        process_record(record, out)
+    return [line + '\n' for chunk in out for line in chunk.split('\n')]
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+STAGES = ('parse', 'filter', 'render', 'structured', 'reader', 'append', 'store')
+
+
+def run_stages(opts):
+    lines = generate_lines(opts.lines, 'threadtime', opts.seed)
+    records = [r for r in map(parse_line, lines) if r]
+    results = {}
+    for stage in opts.stages:
+        if stage == 'parse':
+            results[stage] = bench_parse(lines, opts)
+        elif stage == 'filter':
+            results[stage] = bench_filter(records, opts)
+        elif stage == 'render':
+            results[stage] = bench_process_record(records, opts, '--all')
+        elif stage == 'structured':
+            results[stage] = bench_process_record(records, opts, '--all', '--format', 'tsv')
+        elif stage == 'reader':
+            if os.name != 'posix':
+                continue
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+                f.writelines(lines)
+            try:
+                results[stage] = bench_reader(f.name, len(lines), opts)
+            finally:
+                os.unlink(f.name)
+        elif stage == 'append':
+            rendered = render_annotated(records[:opts.append_lines])
+            results[stage] = bench_append(rendered, opts)
+        elif stage == 'store':
+            results[stage] = bench_store(records, opts)
+        print(f'{stage:<11} {results[stage]}', file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the stages whose throughput fell more than tolerance below baseline."""
+    regressions = []
+    for stage, result in results.items():
+        before = baseline.get('results', {}).get(stage)
+        if not before:
+            continue
+        ratio = result['lines_per_s'] / before['lines_per_s']
+        flag = 'REGRESSION' if ratio < 1 - tolerance else 'ok'
+        print(f'{stage:<11} {before["lines_per_s"]:>10,} -> {result["lines_per_s"]:>10,} lines/s  ({ratio:.0%})  {flag}')
+        if ratio < 1 - tolerance:
+            regressions.append(stage)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the FadCat pipeline stages on a synthetic corpus.')
+    parser.add_argument('-n', '--lines', type=int, default=100000, help='Corpus size (default: 100000)')
+    parser.add_argument('--append-lines', type=int, default=50000, help='Lines fed to LogcatTab (default: 50000)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='Corpus seed (default: 0)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Timed runs per stage, best is kept (default: 3)')
+    parser.add_argument('--alloc-sample', type=int, default=20000, help='Lines traced for memory (default: 20000)')
+    parser.add_argument('--stage', dest='stages', action='append', choices=STAGES, help='Stage(s) to run (default: all)')
+    parser.add_argument('--save', metavar='FILE', help='Write the results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='Compare against saved results, exit 1 on a regression')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed throughput drop for --compare (default: 0.15)')
+    opts = parser.parse_args()
+    opts.stages = opts.stages or list(STAGES)
+
+    results = run_stages(opts)
+    report = {
+        'python': sys.version.split()[0], 'lines': opts.lines, 'seed': opts.seed,
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'results': results,
+    }
+    if opts.save:
+        with open(opts.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    if opts.compare:
+        with open(opts.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, opts.tolerance):
+            sys.exit(1)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
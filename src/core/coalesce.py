@@ -0,0 +1,85 @@
+"""Coalescing of multi-line log output (stack traces, tombstones) into single records.
+
+A Java exception or a native crash arrives as dozens of lines from the same
+thread. Grouping them lets the rest of the pipeline filter and render each
+trace as one unit: a block record keeps its first line's fields and carries
+every line in its message, joined with newlines.
+"""
+import re
+
+# Lines that continue a trace whatever the tag: stack frames, causes, elided frames.
+CONTINUATION = re.compile(r'^(?:\s|at |Caused by: |Suppressed: |\.\.\. \d+ more|#\d+ pc )')
+# Tags whose consecutive lines from one thread always belong together.
+BLOCK_TAGS = frozenset(['AndroidRuntime', 'DEBUG'])
+# Lines that always open a new block, even right after another one.
+BLOCK_START = re.compile(r'^(?:FATAL EXCEPTION|\*\*\* \*\*\* \*\*\*)')
+
+
+def timestamp_ms(ts):
+    """Milliseconds since midnight of a 'MM-DD HH:MM:SS.mmm' timestamp, or None."""
+    if len(ts) < 18:
+        return None
+    return ((int(ts[6:8]) * 60 + int(ts[9:11])) * 60 + int(ts[12:14])) * 1000 + int(ts[15:18])
+
+
+class Coalescer:
+    """Groups continuation lines into the record that precedes them.
+
+    A record continues the pending block when it comes from the same pid, tid,
+    tag and level within window_ms of the block's previous line, and either
+    looks like a trace line or has one of BLOCK_TAGS. Every record is held
+    until the next one shows whether it continues; flush() releases the
+    pending block when the stream goes quiet or ends.
+    """
+
+    def __init__(self, window_ms=50):
+        self.window_ms = window_ms
+        self._head = None
+        self._matches = True
+        self._lines = []
+        self._key = None
+        self._last_ts = ''
+
+    @property
+    def pending(self):
+        return self._head is not None
+
+    def push(self, record, matches=True):
+        """Adds a record. Returns the (record, matches) it completes, or None.
+
+        matches is carried through for callers that pre-filter records; a block
+        takes its head's value, since all its lines share level and tag.
+        """
+        if self._head is not None:
+            if (record[1:5] == self._key
+                    and (record.tag in BLOCK_TAGS or CONTINUATION.match(record.message))
+                    and not BLOCK_START.match(record.message)
+                    and self._in_window(record.timestamp)):
+                self._lines.append(record.message)
+                self._last_ts = record.timestamp
+                return None
+            done = self.flush()
+        else:
+            done = None
+        self._head = record
+        self._matches = matches
+        self._key = record[1:5]
+        self._last_ts = record.timestamp
+        return done
+
+    def _in_window(self, ts):
+        if ts == self._last_ts:
+            return True
+        now, last = timestamp_ms(ts), timestamp_ms(self._last_ts)
+        return now is None or last is None or 0 <= now - last <= self.window_ms
+
+    def flush(self):
+        """Releases the pending block as (record, matches), or None."""
+        head = self._head
+        if head is None:
+            return None
+        if self._lines:
+            head = head._replace(message='\n'.join([head.message] + self._lines))
+            self._lines = []
+        self._head = None
+        return head, self._matches
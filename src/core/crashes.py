@@ -0,0 +1,199 @@
+"""Detection of Java crashes, native tombstones and ANRs, aggregated by fingerprint.
+
+A crash is gathered from the lines its tag logs on one thread: one coalesced
+block, or consecutive records when coalescing is off. Once it is complete its
+top of stack is normalized (line numbers, addresses, lambda and anonymous
+class numbers dropped) and hashed, so the same bug seen twice lands on one
+Crash whose count goes up.
+"""
+import hashlib
+import re
+
+TOP_FRAMES = 5
+
+JAVA_START = 'FATAL EXCEPTION'
+NATIVE_START = '*** *** ***'
+ANR_START = re.compile(r'^ANR in (\S+)')
+# Tags a crash is gathered from
+TAGS = frozenset(['AndroidRuntime', 'DEBUG', 'ActivityManager'])
+
+JAVA_PROCESS = re.compile(r'^Process: ([^,\s]+)')
+JAVA_FRAME = re.compile(r'^\s*at ([\w$.<>]+)\(([^:)]*)')
+JAVA_CAUSE = re.compile(r'^Caused by: ([\w$.]+)')
+SYNTHETIC = re.compile(r'\$\$\w*?Lambda\w*|\$\d+')
+NATIVE_PROCESS = re.compile(r'>>> (\S+) <<<')
+NATIVE_SIGNAL = re.compile(r'^signal \d+ \((\w+)\)')
+NATIVE_FRAME = re.compile(r'^\s*#\d+ pc [0-9a-fA-F]+\s+(\S+)(?:\s+\((?!BuildId)([^+)]+))?')
+ANR_REASON = re.compile(r'^Reason: (.*)')
+NUMBER = re.compile(r'\b0x[0-9a-fA-F]+\b|\d+')
+
+
+def wants(record):
+    """Whether a record may be part of a crash, so prefilters must let it through."""
+    return record.tag in TAGS
+
+
+class Crash:
+    """One fingerprint and how often it was seen."""
+    __slots__ = ('fingerprint', 'kind', 'title', 'process', 'count', 'first_ts', 'last_ts', 'tag', 'tid')
+
+    def __init__(self, fingerprint, kind, title, process):
+        self.fingerprint = fingerprint
+        self.kind = kind
+        self.title = title
+        self.process = process
+        self.count = 0
+        self.first_ts = ''
+        self.last_ts = ''
+        self.tag = ''           # tag and tid of the latest occurrence's first line
+        self.tid = ''
+
+
+class CrashDetector:
+    """Collects crash lines from records and counts the crashes they make up.
+
+    feed() returns the Crash a record completed, if any; a crash is complete
+    when a record from elsewhere follows it or on flush(). wanted(process, pid)
+    picks the crashes worth counting.
+    """
+
+    def __init__(self, wanted=None):
+        self.wanted = wanted
+        self.crashes = {}       # fingerprint -> Crash, in order of first sighting
+        self._kind = None
+        self._key = None
+        self._head = None
+        self._lines = []
+
+    @property
+    def pending(self):
+        return self._kind is not None
+
+    def feed(self, record):
+        tag = record.tag
+        if self._kind is not None:
+            if self._key == (tag, record.pid if self._kind == 'anr' else record.tid) \
+                    and not self._starts(tag, record.message):
+                self._lines.extend(record.message.split('\n'))
+                return None
+            done = self.flush()
+        else:
+            done = None
+        if tag in TAGS:
+            kind = self._starts(tag, record.message)
+            if kind:
+                self._kind = kind
+                # ActivityManager logs an ANR's lines from whichever binder thread is handy.
+                self._key = (tag, record.pid if kind == 'anr' else record.tid)
+                self._head = record
+                self._lines = record.message.split('\n')
+        return done
+
+    @staticmethod
+    def _starts(tag, message):
+        if tag == 'AndroidRuntime':
+            return 'java' if message.startswith(JAVA_START) else None
+        if tag == 'DEBUG':
+            return 'native' if message.startswith(NATIVE_START) else None
+        if tag == 'ActivityManager':
+            return 'anr' if ANR_START.match(message) else None
+        return None
+
+    def flush(self):
+        """Completes the pending crash; returns its Crash, or None."""
+        kind, head, lines = self._kind, self._head, self._lines
+        if kind is None:
+            return None
+        self._kind = self._key = self._head = None
+        self._lines = []
+        key, title, process = _NORMALIZE[kind](lines)
+        if self.wanted is not None and not self.wanted(process, head.pid):
+            return None
+        fingerprint = hashlib.sha1('\n'.join([kind] + key).encode('utf-8')).hexdigest()[:12]
+        crash = self.crashes.get(fingerprint)
+        if crash is None:
+            crash = self.crashes[fingerprint] = Crash(fingerprint, kind, title, process)
+            crash.first_ts = head.timestamp
+        crash.count += 1
+        crash.last_ts = head.timestamp
+        crash.tag, crash.tid = head.tag, head.tid
+        return crash
+
+    def summary(self):
+        """The crashes seen, most frequent first, as printable lines."""
+        crashes = sorted(self.crashes.values(), key=lambda c: -c.count)
+        total = sum(c.count for c in crashes)
+        lines = [f"💥 crashes: {len(crashes):,} distinct, {total:,} total"]
+        for c in crashes:
+            when = f"{c.first_ts} – {c.last_ts}" if c.count > 1 else c.first_ts
+            lines.append(f"   ×{c.count:<4} {c.kind:<6} {c.fingerprint}  {c.title}  [{c.process}]  {when}")
+        return lines
+
+
+# ── Normalization ─────────────────────────────────────────────────────────────
+# Each returns (fingerprint key lines, title, process) for a crash's lines.
+
+def _java(lines):
+    process = ''
+    exception = ''
+    frames = []
+    causes = []
+    for line in lines[1:]:
+        if not process:
+            m = JAVA_PROCESS.match(line)
+            if m:
+                process = m.group(1)
+                continue
+        m = JAVA_FRAME.match(line)
+        if m:
+            if len(frames) < TOP_FRAMES and not causes:
+                frames.append(SYNTHETIC.sub('$', m.group(1)) + '(' + m.group(2) + ')')
+            continue
+        m = JAVA_CAUSE.match(line)
+        if m:
+            causes.append(m.group(1))
+        elif not exception and line.strip():
+            exception = line.strip()
+    exception_class = exception.split(':', 1)[0]
+    key = [exception_class] + frames + ['caused by ' + cause for cause in causes]
+    title = exception if not causes else f"{exception_class} (caused by {causes[-1]})"
+    return key, title, process
+
+
+def _native(lines):
+    process = ''
+    signal = ''
+    frames = []
+    for line in lines:
+        if not process:
+            m = NATIVE_PROCESS.search(line)
+            if m:
+                process = m.group(1)
+                continue
+        if not signal:
+            m = NATIVE_SIGNAL.match(line)
+            if m:
+                signal = m.group(1)
+                continue
+        m = NATIVE_FRAME.match(line)
+        if m and len(frames) < TOP_FRAMES:
+            library, symbol = m.groups()
+            library = library.rsplit('/', 1)[-1]     # app install paths are randomized
+            frames.append(f"{library} ({symbol})" if symbol else library)
+    top = frames[0] if frames else 'unknown frame'
+    return [signal] + frames, f"{signal or 'signal'} in {top}", process
+
+
+def _anr(lines):
+    process = ANR_START.match(lines[0]).group(1)
+    reason = ''
+    for line in lines[1:]:
+        m = ANR_REASON.match(line)
+        if m:
+            reason = m.group(1)
+            break
+    masked = NUMBER.sub('#', reason)
+    return [process, masked], f"ANR: {reason or 'no reason given'}", process
+
+
+_NORMALIZE = {'java': _java, 'native': _native, 'anr': _anr}
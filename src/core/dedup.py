@@ -0,0 +1,113 @@
+"""Folding of repeated log lines into one entry with a repeat count.
+
+A run starts with the first line of a given (level, tag, message) and absorbs
+every repeat that arrives while it is among the most recently seen SLOTS
+distinct lines and within max_age seconds of its previous repeat. Per tag the
+message is compared exactly, after masking numbers, or not folded at all.
+"""
+import re
+from collections import OrderedDict
+
+from src.core.coalesce import timestamp_ms
+
+MODES = ('off', 'exact', 'masked')
+SLOTS = 8
+NUMBER = re.compile(r'\b0x[0-9a-fA-F]+\b|\d+')
+
+
+def parse_tag_modes(specs):
+    """{tag: mode} from 'Tag=mode' strings; raises ValueError on a bad one."""
+    modes = {}
+    for spec in specs or ():
+        tag, sep, mode = spec.rpartition('=')
+        if not sep or not tag.strip() or mode.strip() not in MODES:
+            raise ValueError(f"expected TAG=MODE with MODE one of {', '.join(MODES)}, got {spec!r}")
+        modes[tag.strip()] = mode.strip()
+    return modes
+
+
+class Run:
+    """A shown record and the repeats folded into it."""
+    __slots__ = ('id', 'record', 'count', 'last_ts', 'last_ms', 'reported', 'reported_at')
+
+    def __init__(self, run_id, record, ms):
+        self.id = run_id
+        self.record = record
+        self.count = 1
+        self.last_ts = record.timestamp
+        self.last_ms = ms
+        self.reported = 1       # count at the last update sent downstream
+        self.reported_at = 0.0
+
+
+class Deduplicator:
+    """Tracks the runs of the last SLOTS distinct lines."""
+
+    def __init__(self, mode='exact', tag_modes=None, max_age=5.0):
+        self.mode = mode
+        self.tag_modes = tag_modes or {}
+        self.max_age_ms = max_age * 1000
+        self.next_id = 0
+        self._runs = OrderedDict()
+        self._ended = []
+
+    def _key(self, record):
+        mode = self.tag_modes.get(record.tag, self.mode)
+        if mode == 'off':
+            return None
+        message = NUMBER.sub('#', record.message) if mode == 'masked' else record.message
+        return record.level, record.tag, message
+
+    def check(self, record):
+        """Returns the Run a record repeats (and counts it there), or the new Run it starts.
+
+        The new Run is returned with count 1; the caller shows its record.
+        Returns None for records that are never folded.
+        """
+        key = self._key(record)
+        if key is None:
+            return None
+        ms = timestamp_ms(record.timestamp)
+        runs = self._runs
+        # Runs are ordered by their last repeat, so the stale ones are at the front.
+        if ms is not None:
+            while runs:
+                oldest = next(iter(runs.values()))
+                if oldest.last_ms is None or ms - oldest.last_ms <= self.max_age_ms:
+                    break
+                self._end(runs.popitem(last=False)[1])
+        run = runs.get(key)
+        if run is not None:
+            run.count += 1
+            run.last_ts = record.timestamp
+            run.last_ms = ms
+            runs.move_to_end(key)
+            return run
+        run = Run(self.next_id, record, ms)
+        self.next_id += 1
+        runs[key] = run
+        if len(runs) > SLOTS:
+            self._end(runs.popitem(last=False)[1])
+        return run
+
+    def _end(self, run):
+        if run.count > run.reported:
+            self._ended.append(run)
+
+    def ended(self):
+        """Runs that closed with repeats not yet reported, oldest first."""
+        if not self._ended:
+            return ()
+        ended, self._ended = self._ended, []
+        return ended
+
+    def unreported(self):
+        """Open runs whose count changed since their last report."""
+        return [run for run in self._runs.values() if run.count > run.reported]
+
+    def flush(self):
+        """Closes every run when the stream ends."""
+        for run in self._runs.values():
+            self._end(run)
+        self._runs.clear()
+        return self.ended()
@@ -0,0 +1,141 @@
+import socket
+import subprocess
+import threading
+
+from PyQt6 import QtCore
+
+from src.utils.adb_utils import (
+    ADB_SERVER_HOST, ADB_SERVER_PORT, parse_device_list, get_adb_device_states,
+)
+
+
+class DeviceTracker(QtCore.QThread):
+    """App-wide background tracker of ADB devices.
+
+    Holds a persistent `host:track-devices` stream to the adb server and
+    publishes add/remove/state events as Qt signals, so no widget ever has to
+    call adb on the UI thread. If the server can't be reached over its socket
+    we fall back to polling `adb devices` with a timeout.
+    """
+    device_added = QtCore.pyqtSignal(str, str)
+    device_removed = QtCore.pyqtSignal(str)
+    device_state_changed = QtCore.pyqtSignal(str, str)
+    devices_changed = QtCore.pyqtSignal(dict)
+
+    CONNECT_TIMEOUT = 2.0
+    POLL_INTERVAL = 3.0
+    POLL_TIMEOUT = 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._devices: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._sock = None
+
+    # ── Public API (any thread) ───────────────────────────────────────────────
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._devices)
+
+    def request_refresh(self):
+        """Asks for a fresh device list without blocking the caller."""
+        self._wake.set()
+        sock = self._sock
+        if sock is not None:
+            # Reconnecting the stream makes the server resend the full list.
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self):
+        self._stop.set()
+        self.request_refresh()
+        # run() checks the stop flag between blocking steps, so one step is the longest wait.
+        self.wait(int((max(self.CONNECT_TIMEOUT, self.POLL_TIMEOUT) + 1) * 1000))
+
+    # ── Thread body ───────────────────────────────────────────────────────────
+
+    def run(self):
+        server_started = False
+        while not self._stop.is_set():
+            if self._track():
+                self._wake.wait(0.5)
+                self._wake.clear()
+                continue
+            if self._stop.is_set():
+                break
+            if not server_started:
+                server_started = True
+                try:
+                    subprocess.run(['adb', 'start-server'], capture_output=True, timeout=self.POLL_TIMEOUT)
+                    continue
+                except (FileNotFoundError, subprocess.TimeoutExpired):
+                    pass
+                if self._stop.is_set():
+                    break
+            states = get_adb_device_states(timeout=self.POLL_TIMEOUT)
+            if states is not None:
+                self._publish(states)
+            self._wake.wait(self.POLL_INTERVAL)
+            self._wake.clear()
+
+    def _track(self) -> bool:
+        """Follows host:track-devices until the stream drops. False if unavailable."""
+        try:
+            sock = socket.create_connection((ADB_SERVER_HOST, ADB_SERVER_PORT), timeout=self.CONNECT_TIMEOUT)
+        except OSError:
+            return False
+        try:
+            request = b'host:track-devices'
+            sock.sendall(b'%04x' % len(request) + request)
+            if self._recv_exact(sock, 4) != b'OKAY':
+                return False
+            sock.settimeout(None)
+            self._sock = sock
+            self._wake.clear()
+            while not self._stop.is_set():
+                length = self._recv_exact(sock, 4)
+                if length is None:
+                    break
+                payload = self._recv_exact(sock, int(length, 16)) if int(length, 16) else b''
+                if payload is None:
+                    break
+                self._publish(parse_device_list(payload.decode('utf-8', errors='replace')))
+            return True
+        except (OSError, ValueError):
+            return False
+        finally:
+            self._sock = None
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _recv_exact(sock, n):
+        buf = b''
+        while len(buf) < n:
+            chunk = sock.recv(n - len(buf))
+            if not chunk:
+                return None
+            buf += chunk
+        return buf
+
+    def _publish(self, states: dict):
+        with self._lock:
+            old = self._devices
+            self._devices = dict(states)
+        if old == states:
+            return
+        for serial in old.keys() - states.keys():
+            self.device_removed.emit(serial)
+        for serial, state in states.items():
+            if serial not in old:
+                self.device_added.emit(serial, state)
+            elif old[serial] != state:
+                self.device_state_changed.emit(serial, state)
+        self.devices_changed.emit(dict(states))
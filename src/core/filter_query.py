@@ -0,0 +1,323 @@
+"""Small filter expression language for log records, shared by pidcat and the GUI.
+
+  level>=W && tag~"^Camera" && !msg:"chatty" && pid in app
+
+Terms are `field OP value`, `field in NAME` / `field in (a, b)` or a bare value
+(substring of the message). Fields: level, tag, msg, pid, tid, ts. Operators:
+
+  == = !=        exact match
+  < <= > >=      level by severity, pid/tid numerically, ts as text
+  :              case-insensitive substring
+  ~ !~           regex search (use (?i) for case-insensitive)
+
+Terms combine with !, &&, || and parentheses; juxtaposed terms mean &&. Values
+are bare words or "quoted" strings where only \\" and \\\\ are escapes.
+
+A query is parsed once and compiled into a single Python predicate over
+LogRecord tuples, with the cheap checks of every && ordered first.
+"""
+import re
+
+from src.core.logline import LOG_LEVELS, LOG_LEVELS_MAP
+
+
+class FilterError(ValueError):
+    """Raised for a query that does not parse."""
+
+
+# Positions in LogRecord
+FIELDS = {
+    'ts': 0, 'time': 0,
+    'level': 1, 'lvl': 1,
+    'tag': 2,
+    'pid': 3,
+    'tid': 4,
+    'msg': 5, 'message': 5,
+}
+LEVEL_NAMES = {'verbose': 'V', 'debug': 'D', 'info': 'I', 'warn': 'W', 'warning': 'W', 'error': 'E', 'fatal': 'F'}
+COMPARISONS = ('==', '=', '!=', '<', '<=', '>', '>=', ':', '~', '!~')
+
+# Relative cost of evaluating a term on each field; regexes cost more again.
+_FIELD_COST = {0: 2, 1: 1, 2: 2, 3: 1, 4: 1, 5: 4}
+
+_TOKEN = re.compile(r'''
+    \s*(?:
+      (?P<str>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    | (?P<op>&&|\|\||==|!=|>=|<=|!~|[=<>~:!(),])
+    | (?P<word>\d[\w:.-]*|[^\s()!&|=<>~:,"']+)
+    )''', re.VERBOSE)
+_UNQUOTE = re.compile(r'\\([\\"\'])')
+
+
+def quote(value):
+    """Quotes a string so the parser reads it back unchanged."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise FilterError(f'unexpected {text[pos:].strip()[:1]!r} at column {pos + 1}')
+        if m.group('str'):
+            tokens.append(('value', _UNQUOTE.sub(r'\1', m.group('str')[1:-1]), m.start('str')))
+        elif m.group('op'):
+            tokens.append(('op', m.group('op'), m.start('op')))
+        else:
+            tokens.append(('word', m.group('word'), m.start('word')))
+        pos = m.end()
+    return tokens
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+#
+# Nodes are tuples:
+#   ('and', [nodes]) ('or', [nodes]) ('not', node)
+#   ('cmp', field_index, op, value) ('in', field_index, name_or_frozenset)
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect_op(self, op):
+        kind, value, column = self.take()
+        if kind != 'op' or value != op:
+            raise FilterError(f'expected {op!r}' + (f' at column {column + 1}' if column is not None else ' at end'))
+
+    def parse(self):
+        if not self.tokens:
+            return ('and', [])
+        node = self.parse_or()
+        kind, value, column = self.peek()
+        if kind is not None:
+            raise FilterError(f'unexpected {value!r} at column {column + 1}')
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.peek()[:2] == ('op', '||'):
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def parse_and(self):
+        nodes = [self.parse_unary()]
+        while True:
+            kind, value, _ = self.peek()
+            if kind == 'op' and value == '&&':
+                self.take()
+            elif kind is None or (kind == 'op' and value in ('||', ')')):
+                break
+            nodes.append(self.parse_unary())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def parse_unary(self):
+        kind, value, column = self.peek()
+        if kind == 'op' and value == '!':
+            self.take()
+            return ('not', self.parse_unary())
+        if kind == 'op' and value == '(':
+            self.take()
+            node = self.parse_or()
+            self.expect_op(')')
+            return node
+        return self.parse_term()
+
+    def parse_term(self):
+        kind, value, column = self.take()
+        if kind is None:
+            raise FilterError('unexpected end of query')
+        if kind == 'op':
+            raise FilterError(f'unexpected {value!r} at column {column + 1}')
+        next_kind, next_value, _ = self.peek()
+        if kind == 'word' and value.lower() in FIELDS:
+            field = FIELDS[value.lower()]
+            if next_kind == 'op' and next_value in COMPARISONS:
+                self.take()
+                return _comparison(field, next_value, self.parse_value())
+            if next_kind == 'word' and next_value == 'in':
+                self.take()
+                return self.parse_in(field)
+        return ('cmp', FIELDS['msg'], ':', value)
+
+    def parse_value(self):
+        kind, value, column = self.take()
+        if kind in ('word', 'value'):
+            return value
+        raise FilterError('expected a value' + (f' at column {column + 1}' if column is not None else ' at end'))
+
+    def parse_in(self, field):
+        kind, value, _ = self.peek()
+        if kind == 'word':
+            self.take()
+            return ('in', field, value)
+        self.expect_op('(')
+        values = [self.parse_value()]
+        while self.peek()[:2] == ('op', ','):
+            self.take()
+            values.append(self.parse_value())
+        self.expect_op(')')
+        if field == FIELDS['level']:
+            values = [_level(v) for v in values]
+        return ('in', field, frozenset(values))
+
+
+def _level(value):
+    level = LEVEL_NAMES.get(value.lower(), value.upper())
+    if level not in LOG_LEVELS_MAP:
+        raise FilterError(f'unknown level {value!r}, expected one of {", ".join(LOG_LEVELS)}')
+    return level
+
+
+def _comparison(field, op, value):
+    if op == '=':
+        op = '=='
+    if field == FIELDS['level'] and op not in (':', '~', '!~'):
+        value = _level(value)
+    elif field in (FIELDS['pid'], FIELDS['tid']) and op in ('<', '<=', '>', '>='):
+        if not value.isdigit():
+            raise FilterError(f'{op} needs a number, got {value!r}')
+    if op in ('~', '!~'):
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise FilterError(f'bad regex {value!r}: {e}') from None
+    return ('cmp', field, op, value)
+
+
+def parse(text):
+    """Parses a query into its node tree. Raises FilterError."""
+    return _Parser(text).parse()
+
+
+# ── Compilation ───────────────────────────────────────────────────────────────
+
+def _int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return -1
+
+
+class _Compiler:
+    def __init__(self, sets):
+        self.sets = sets or {}
+        self.namespace = {'_int': _int}
+
+    def const(self, value):
+        name = '_c%d' % len(self.namespace)
+        self.namespace[name] = value
+        return name
+
+    def compile(self, node):
+        """Returns (python expression over r, cost)."""
+        kind = node[0]
+        if kind in ('and', 'or'):
+            if not node[1]:
+                return ('True' if kind == 'and' else 'False'), 0
+            parts = sorted((self.compile(child) for child in node[1]), key=lambda p: p[1])
+            joiner = ' and ' if kind == 'and' else ' or '
+            return '(' + joiner.join(src for src, _ in parts) + ')', sum(cost for _, cost in parts)
+        if kind == 'not':
+            src, cost = self.compile(node[1])
+            return '(not ' + src + ')', cost
+        if kind == 'in':
+            _, field, values = node
+            if isinstance(values, str):
+                if values not in self.sets:
+                    known = ', '.join(sorted(self.sets)) or 'none'
+                    raise FilterError(f'unknown set {values!r} (known: {known})')
+                values = self.sets[values]
+            return 'r[%d] in %s' % (field, self.const(values)), _FIELD_COST[field]
+        return self.compile_cmp(*node[1:])
+
+    def compile_cmp(self, field, op, value):
+        r = 'r[%d]' % field
+        cost = _FIELD_COST[field]
+        if op == ':':
+            return '%s in %s.lower()' % (self.const(value.lower()), r), cost + 1
+        if op in ('~', '!~'):
+            search = self.const(re.compile(value).search)
+            return '%s(%s) is %sNone' % (search, r, 'not ' if op == '~' else ''), cost * 2 + 2
+        if op in ('==', '!='):
+            return '%s %s %s' % (r, op, self.const(value)), cost
+        if field == FIELDS['level']:
+            # Unknown levels pass lower bounds and fail upper bounds.
+            rank = LOG_LEVELS_MAP[value]
+            if op in ('>', '>='):
+                below = LOG_LEVELS[:rank + (op == '>')]
+                return '%s not in %s' % (r, self.const(frozenset(below))), cost
+            upto = LOG_LEVELS[:rank + (op == '<=')]
+            return '%s in %s' % (r, self.const(frozenset(upto))), cost
+        if field in (FIELDS['pid'], FIELDS['tid']):
+            return '_int(%s) %s %s' % (r, op, int(value)), cost + 1
+        if field == FIELDS['ts'] and '-' not in value:
+            # A bare time of day compares against the time part of the timestamp.
+            return '%s[6:] %s %s' % (r, op, self.const(value)), cost
+        return '%s %s %s' % (r, op, self.const(value)), cost
+
+
+def compile_query(query, sets=None):
+    """Compiles a query string (or parsed node) into a predicate over LogRecords.
+
+    sets maps the names usable in `field in NAME` to live containers, e.g.
+    {'app': tracked_pids}; they are looked up by reference, so later changes to
+    the container are seen by the predicate.
+    """
+    node = parse(query) if isinstance(query, str) else query
+    compiler = _Compiler(sets)
+    src, _ = compiler.compile(node)
+    predicate = eval('lambda r: ' + src, compiler.namespace)
+    predicate.source = src
+    return predicate
+
+
+def has_fields(node):
+    """True if a parsed query uses anything beyond bare message terms."""
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return kind == 'or' or any(has_fields(child) for child in node[1])
+    if kind == 'cmp':
+        return not (node[1] == FIELDS['msg'] and node[2] == ':')
+    return True
+
+
+def message_terms(node):
+    """Substrings every matching record's message must contain (for index lookups)."""
+    if node[0] == 'cmp' and node[1] == FIELDS['msg'] and node[2] == ':':
+        return [node[3]]
+    if node[0] == 'and':
+        return [term for child in node[1] for term in message_terms(child)]
+    return []
+
+
+def flags_query(min_level=0, tags=None, ignored_tags=None, app_only=False):
+    """Builds the query equivalent to pidcat's -l/-t/-i flags and package filter."""
+    parts = []
+    if app_only:
+        parts.append('pid in app')
+    if min_level > 0:
+        parts.append('level>=' + LOG_LEVELS[min_level])
+    if ignored_tags:
+        parts.append('!tag~' + quote(_tags_regex(ignored_tags)))
+    if tags:
+        parts.append('tag~' + quote(_tags_regex(tags)))
+    return ' && '.join(parts)
+
+
+def _tags_regex(tags):
+    # Same semantics as tag_in_tags_regex: any pattern matching the whole tag, ignoring case.
+    return '(?i)^(?:' + '|'.join('(?:%s)' % t.strip() for t in tags) + ')$'
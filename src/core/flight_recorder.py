@@ -0,0 +1,75 @@
+"""Flight recorder: the last minutes of a capture kept in memory, written out on demand.
+
+Records go into a ring as parsed tuples, nothing is rendered. The ring drops
+what is older than the window (by log time) or over max_lines. dump() snapshots
+the ring and writes it as a gzip-compressed threadtime log on a background
+thread, so the capture never waits for the disk; the file opens again with
+--replay.
+"""
+import gzip
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+
+from src.core.coalesce import timestamp_ms
+from src.core.logline import threadtime
+
+DAY_MS = 24 * 3600 * 1000
+# Triggers within this many seconds of a dump are folded into it.
+COOLDOWN = 10.0
+
+
+class FlightRecorder:
+    def __init__(self, minutes, directory='.', max_lines=500_000):
+        self.window_ms = minutes * 60_000
+        self.directory = directory
+        self.max_lines = max_lines
+        self._ring = deque()        # (ms, record)
+        self._last_dump = None
+        self._writers = []
+
+    def add(self, record):
+        ring = self._ring
+        ms = timestamp_ms(record.timestamp)
+        if ms is None:
+            ms = ring[-1][0] if ring else 0
+        ring.append((ms, record))
+        if len(ring) > self.max_lines:
+            ring.popleft()
+        while True:
+            age = ms - ring[0][0]
+            if age < -DAY_MS // 2:
+                age += DAY_MS       # log time restarted at midnight
+            if age <= self.window_ms:
+                break
+            ring.popleft()
+
+    def dump(self, reason, now):
+        """Writes the ring to a new file unless a dump ran less than COOLDOWN seconds ago.
+
+        now is a monotonic time. Returns (path, lines), or None when skipped.
+        """
+        if self._last_dump is not None and now - self._last_dump < COOLDOWN:
+            return None
+        self._last_dump = now
+        records = [record for _, record in self._ring]
+        slug = re.sub(r'[^\w.-]+', '_', reason).strip('_')[:40] or 'dump'
+        path = os.path.join(self.directory, f"flight_{datetime.now():%Y%m%d_%H%M%S}_{slug}.txt.gz")
+        writer = threading.Thread(target=self._write, args=(path, records), name='flight-dump')
+        writer.start()
+        self._writers.append(writer)
+        return path, len(records)
+
+    @staticmethod
+    def _write(path, records):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.writelines(threadtime(record) for record in records)
+
+    def close(self):
+        """Waits for dumps still being written."""
+        for writer in self._writers:
+            writer.join()
+        self._writers.clear()
@@ -0,0 +1,52 @@
+"""Structured output formats for pidcat --format: one record per line, no colors or wrapping."""
+from json.encoder import encode_basestring as _json_str
+
+FORMATS = ('text', 'ndjson', 'csv', 'tsv')
+COLUMNS = ('ts', 'level', 'tag', 'pid', 'tid', 'msg')
+
+_CSV_SPECIAL = frozenset(',"\r\n')
+
+
+def _csv_field(value):
+    if _CSV_SPECIAL.isdisjoint(value):
+        return value
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _tsv_field(value):
+    if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return value
+
+
+def _json_int(value):
+    return str(int(value)) if value.isascii() and value.isdigit() else 'null'
+
+
+def to_ndjson(record):
+    # Formatted by hand: several times faster than json.dumps() of a dict.
+    return '{"ts":%s,"level":%s,"tag":%s,"pid":%s,"tid":%s,"msg":%s}' % (
+        _json_str(record.timestamp), _json_str(record.level), _json_str(record.tag),
+        _json_int(record.pid), _json_int(record.tid), _json_str(record.message))
+
+
+def to_csv(record):
+    return ','.join(map(_csv_field, record))
+
+
+def to_tsv(record):
+    return '\t'.join(map(_tsv_field, record))
+
+
+def header(fmt):
+    """The header line of a format, or None."""
+    if fmt == 'csv':
+        return ','.join(COLUMNS)
+    if fmt == 'tsv':
+        return '\t'.join(COLUMNS)
+    return None
+
+
+def formatter(fmt):
+    """The record -> line function of a structured format (RFC 4180 csv, backslash-escaped tsv)."""
+    return {'ndjson': to_ndjson, 'csv': to_csv, 'tsv': to_tsv}[fmt]
@@ -0,0 +1,145 @@
+"""Highlight rules: regexes whose matches get a terminal style, found in one pass.
+
+A rule is written STYLE=REGEX, e.g.
+
+  bold red=Connection (reset|refused)
+  black on yellow=(?i)\\btimeout\\b
+
+where STYLE is any of a foreground color (optionally `bright`), `on` a
+background color, and `bold`. Built-in rules style single groups instead of
+the whole match.
+
+A Highlighter compiles its rules into one pattern of optional lookaheads, one
+named group per rule, so a message is scanned once however many rules there
+are and every rule's matches are found even where they overlap another's. It
+hands out spans (start, end, SGR codes) in rule order, so a later rule wins
+where spans overlap. render_ansi() turns spans into escape sequences for
+the terminal; the GUI paints those sequences like any other color.
+"""
+import re
+from typing import NamedTuple
+
+COLORS = ('black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white')
+RESET = '\x1b[0m'
+GLOBAL_FLAGS = re.compile(r'^\(\?([aiLmsux]+)\)')
+# Group numbers shift inside the combined alternation.
+NUMBERED_BACKREFERENCE = re.compile(r'\\(?:[1-9]|g<\d)')
+
+
+def parse_style(text):
+    """SGR codes ('1;31;43') for a style like 'bold red on yellow'. Raises ValueError."""
+    codes = []
+    words = text.lower().split()
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word == 'bold':
+            codes.append('1')
+        elif word == 'on' and i + 1 < len(words) and words[i + 1] in COLORS:
+            i += 1
+            codes.append('4%d' % COLORS.index(words[i]))
+        elif word == 'bright' and i + 1 < len(words) and words[i + 1] in COLORS:
+            i += 1
+            codes.append('9%d' % COLORS.index(words[i]))
+        elif word in COLORS:
+            codes.append('3%d' % COLORS.index(word))
+        else:
+            raise ValueError(f"unknown style '{text}' (use colors {', '.join(COLORS)}, 'bright', 'on' and 'bold')")
+        i += 1
+    if not codes:
+        raise ValueError('empty style')
+    return ';'.join(codes)
+
+
+class HighlightRule(NamedTuple):
+    pattern: str
+    styles: dict        # group number (0 for the whole match) -> SGR codes
+
+
+def parse_rule(text):
+    """The HighlightRule for a STYLE=REGEX line. Raises ValueError."""
+    style, sep, pattern = text.partition('=')
+    if not sep or not pattern:
+        raise ValueError(f"'{text}' is not STYLE=REGEX")
+    codes = parse_style(style)
+    m = GLOBAL_FLAGS.match(pattern)
+    if m:
+        # Global flags have to open the whole alternation; scoped ones work anywhere.
+        flags, rest = m.group(1), pattern[m.end():]
+        pattern = f'(?{flags}:{rest}\n)' if 'x' in flags else f'(?{flags}:{rest})'
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f'{text}: {e}') from None
+    return HighlightRule(pattern, {0: codes})
+
+
+class Highlighter:
+    """Rules compiled for scanning; spans() finds the styled parts of one message."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._regex = None
+        self._groups = []       # per rule: (group number of the rule in the alternation, its styles)
+        self._compiled = []     # per rule, when they cannot share the alternation
+        if rules and not any(NUMBERED_BACKREFERENCE.search(rule.pattern) for rule in rules):
+            try:
+                # At each place some rule matches, every rule is tried there
+                # in a lookahead of its own, so no rule hides another's match.
+                self._regex = re.compile('(?=%s)%s' % ('|'.join(rule.pattern for rule in rules), ''.join(
+                    f'(?:(?=(?P<h{i}>{rule.pattern})))?' for i, rule in enumerate(rules))))
+            except re.error:
+                pass            # clashing group names; one search per rule instead
+        if self._regex is not None:
+            self._groups = [(self._regex.groupindex[f'h{i}'], rule.styles) for i, rule in enumerate(rules)]
+        elif rules:
+            self._compiled = [re.compile(rule.pattern) for rule in rules]
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def spans(self, message):
+        """(start, end, SGR codes) of the styled parts of a message, in rule order."""
+        if self._regex is not None:
+            # A rule's lookahead matches again at every place inside its own
+            # match; like finditer, only non-overlapping matches of one rule count.
+            per_rule = [[] for _ in self._groups]
+            ends = [0] * len(self._groups)
+            for m in self._regex.finditer(message):
+                for i, (base, styles) in enumerate(self._groups):
+                    start, end = m.span(base)
+                    if end > start and start >= ends[i]:
+                        ends[i] = end
+                        for group, codes in styles.items():
+                            start, end = m.span(base + group)
+                            if start < end:
+                                per_rule[i].append((start, end, codes))
+            return [span for spans in per_rule for span in spans]
+        spans = []
+        for regex, rule in zip(self._compiled, self.rules):
+            for m in regex.finditer(message):
+                for group, codes in rule.styles.items():
+                    start, end = m.span(group)
+                    if start < end:
+                        spans.append((start, end, codes))
+        return spans
+
+
+def render_ansi(text, spans):
+    """text with spans in their styles; where spans overlap, the later one wins."""
+    if not spans:
+        return text
+    cuts = sorted({0, len(text)}.union(*((start, end) for start, end, _ in spans)))
+    parts = []
+    for a, b in zip(cuts, cuts[1:]):
+        codes = None
+        for start, end, style in spans:
+            if start <= a and b <= end:
+                codes = style
+        piece = text[a:b]
+        if codes:
+            # Lines of a block are indented separately, so each one gets its own escapes.
+            start_code = '\x1b[%sm' % codes
+            piece = start_code + piece.replace('\n', RESET + '\n' + start_code) + RESET
+        parts.append(piece)
+    return ''.join(parts)
@@ -0,0 +1,82 @@
+"""Event-driven ingest counters for one capture, read by the diagnostics panel.
+
+Each counter has a single writer: the reader thread bumps the read side, the UI
+thread the append/evict side. The panel only takes snapshots, so nothing here
+locks and nothing inspects widgets.
+"""
+import time
+
+SLOW_FRAME_MS = 16.0   # an append longer than one 60 Hz frame
+
+
+class IngestStats:
+    """Counters for the reader → view path of one tab."""
+
+    def __init__(self):
+        self.lines_read = 0         # reader thread
+        self.batches_read = 0
+        self.lines_appended = 0     # UI thread from here on
+        self.lines_taken = 0        # appended plus control lines consumed without a view line
+        self.batches_appended = 0
+        self.append_ns = 0
+        self.append_max_ns = 0
+        self.slow_frames = 0
+        self.lines_evicted = 0
+        self.lines_dropped = 0
+        self.chars_in_view = 0
+        self.lines_in_view = 0
+        self._last = (time.perf_counter(), 0, 0, 0)
+
+    # ── Events ────────────────────────────────────────────────────────────────
+
+    def read(self, lines):
+        self.lines_read += lines
+        self.batches_read += 1
+
+    def appended(self, lines, chars, elapsed_ns, updates=0):
+        self.lines_appended += lines
+        self.lines_taken += lines + updates
+        self.batches_appended += 1
+        self.lines_in_view += lines
+        self.chars_in_view += chars
+        self.append_ns += elapsed_ns
+        if elapsed_ns > self.append_max_ns:
+            self.append_max_ns = elapsed_ns
+        if elapsed_ns > SLOW_FRAME_MS * 1e6:
+            self.slow_frames += 1
+
+    def evicted(self, lines, chars):
+        self.lines_evicted += lines
+        self.lines_in_view -= lines
+        self.chars_in_view -= chars
+
+    def dropped(self, lines):
+        self.lines_dropped += lines
+
+    def cleared(self):
+        self.lines_in_view = self.chars_in_view = 0
+
+    # ── Snapshots ─────────────────────────────────────────────────────────────
+
+    def snapshot(self):
+        """Totals plus rates since the previous snapshot."""
+        now = time.perf_counter()
+        last_time, last_lines, last_batches, last_ns = self._last
+        span = max(now - last_time, 1e-9)
+        batches = self.batches_appended - last_batches
+        busy_ns = self.append_ns - last_ns
+        self._last = (now, self.lines_appended, self.batches_appended, self.append_ns)
+        append_max_ns, self.append_max_ns = self.append_max_ns, 0
+        return {
+            'lines_per_s': (self.lines_appended - last_lines) / span,
+            'queue': max(self.lines_read - self.lines_taken, 0),
+            'lines_in_view': self.lines_in_view,
+            # QTextDocument holds text as UTF-16; formats and layout come on top
+            'view_mb': self.chars_in_view * 2 / 2**20,
+            'append_ms': busy_ns / batches / 1e6 if batches else 0.0,
+            'append_max_ms': append_max_ns / 1e6,
+            'ui_load': busy_ns / 1e9 / span,
+            'slow_frames': self.slow_frames,
+            'evicted': self.lines_evicted,
+            'dropped': self.lines_dropped,
+        }
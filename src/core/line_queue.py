@@ -0,0 +1,141 @@
+"""Bounded queue of output lines between a reader thread and the view.
+
+The reader puts batches; the UI takes slices at its own pace. When the UI
+falls behind and the queue reaches its capacity, the overload policy decides:
+
+  block   - the reader waits for room, so pidcat and adb stop reading and
+            logd drops on the device
+  drop    - verbose/debug lines are dropped; past twice the capacity info
+            lines too. Warnings and errors are always kept.
+  sample  - one in SAMPLE_EVERY lines below warning is kept
+
+Dropped lines are counted per level and reported in the stream itself by a
+marker line, once the overload ends and at most every MARKER_INTERVAL seconds
+while it lasts.
+"""
+import threading
+import time
+from collections import deque
+
+POLICIES = ('block', 'drop', 'sample')
+SAMPLE_EVERY = 10
+MARKER_INTERVAL = 1.0
+KEEP_LEVELS = frozenset('WEFA')
+_BLOCK_HEAD = '\x1fb'
+
+
+def _level(line):
+    """The level of a pidcat --annotate line, or None for other lines."""
+    return line[3] if line.startswith('\x1b_F') and len(line) > 3 else None
+
+
+class LineQueue:
+    def __init__(self, capacity=50_000, policy='drop', stats=None):
+        self.capacity = capacity
+        self.policy = policy
+        self.stats = stats
+        self._batches = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._dropped = {}
+        self._marked_at = 0.0       # when the last marker went out
+        self._sample_n = 0
+        self._follow = 0            # lines left of a coalesced block
+        self._follow_keep = True
+
+    def __len__(self):
+        return self._size
+
+    def close(self):
+        """Wakes a blocked put(); everything put afterwards is discarded."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # ── Reader side ───────────────────────────────────────────────────────────
+
+    def put(self, lines):
+        """Queues a batch under the overload policy. Returns True if the queue was empty."""
+        with self._cond:
+            if self.policy == 'block':
+                while self._size >= self.capacity and not self._closed:
+                    self._cond.wait(0.25)
+            if self._closed:
+                return False
+            if self._size >= self.capacity and self.policy != 'block':
+                lines = self._shed(lines)
+            if self._dropped and (self._size < self.capacity // 2
+                                  or time.monotonic() - self._marked_at >= MARKER_INTERVAL):
+                lines = [self._marker()] + lines
+            if not lines:
+                return False
+            was_empty = not self._size
+            self._batches.append(lines)
+            self._size += len(lines)
+        if self.stats is not None:
+            self.stats.read(len(lines))
+        return was_empty
+
+    def _shed(self, lines):
+        kept = []
+        if not self._dropped:
+            self._marked_at = time.monotonic()     # an overload starts
+        dropped = self._dropped
+        sample = self.policy == 'sample'
+        info_too = self._size >= 2 * self.capacity
+        n_dropped = 0
+        for line in lines:
+            # Lines of one coalesced block share the decision for its head.
+            if self._follow:
+                self._follow -= 1
+                keep = self._follow_keep
+            else:
+                level = _level(line)
+                if level is None or level in KEEP_LEVELS:
+                    keep = True
+                elif sample:
+                    self._sample_n += 1
+                    keep = self._sample_n % SAMPLE_EVERY == 0
+                else:
+                    keep = not (level in 'VD' or info_too)
+                head = line.find(_BLOCK_HEAD, 0, line.find('\x1b\\'))
+                if level is not None and head != -1:
+                    digits = line[head + 2:line.find('\x1b\\')].split('\x1f')[0]
+                    if digits.isdigit():
+                        self._follow, self._follow_keep = int(digits), keep
+            if keep:
+                kept.append(line)
+            else:
+                level = _level(line)
+                dropped[level] = dropped.get(level, 0) + 1
+                n_dropped += 1
+        if n_dropped and self.stats is not None:
+            self.stats.dropped(n_dropped)
+        return kept
+
+    def _marker(self):
+        total = sum(self._dropped.values())
+        levels = ', '.join(f'{level} {n:,}' for level, n in sorted(self._dropped.items()))
+        self._dropped = {}
+        self._marked_at = time.monotonic()
+        noun = 'line' if total == 1 else 'lines'
+        return f'\x1b[1;93;43m ⚠ View overloaded: dropped {total:,} {noun} ({levels}) \x1b[0m\n'
+
+    # ── UI side ───────────────────────────────────────────────────────────────
+
+    def take(self, max_lines):
+        """Removes and returns up to max_lines lines, oldest first."""
+        taken = []
+        with self._cond:
+            while self._batches and len(taken) < max_lines:
+                batch = self._batches.popleft()
+                room = max_lines - len(taken)
+                if len(batch) > room:
+                    self._batches.appendleft(batch[room:])
+                    batch = batch[:room]
+                taken.extend(batch)
+            self._size -= len(taken)
+            if self.policy == 'block':
+                self._cond.notify_all()
+        return taken
@@ -0,0 +1,170 @@
+"""Logcat line formats shared by pidcat and the GUI."""
+import re
+from typing import NamedTuple
+
+LOG_LEVELS = 'VDIWEF'
+LOG_LEVELS_MAP = dict([(LOG_LEVELS[i], i) for i in range(len(LOG_LEVELS))])
+
+# 01-02 03:04:05.678  1234  5678 I Tag     : message   (optionally with a uid column)
+THREADTIME_LINE = re.compile(r'^(\d\d-\d\d\s+\d\d:\d\d:\d\d\.\d+)\s+(?:\S+\s+)?(\d+)\s+(\d+)\s+([A-Z])\s+(.*?)\s*:(?: (.*))?$')
+# 01-02 03:04:05.678 I/Tag( 1234): message
+TIME_LINE = re.compile(r'^(\d\d-\d\d\s+\d\d:\d\d:\d\d\.\d+)\s+([A-Z])/(.+?)\(\s*(\d+)\): (.*)$')
+# I/Tag( 1234): message
+BRIEF_LINE = re.compile(r'^([A-Z])/(.+?)\( *(\d+)\): (.*?)$')
+# [ 01-02 03:04:05.678  1234: 5678 I/Tag ]   (logcat -v long; message lines and a blank line follow)
+LONG_HEADER = re.compile(r'^\[ (\d\d-\d\d\s+\d\d:\d\d:\d\d\.\d+)\s+(?:\S+:\s*)?(\d+):\s*(\d+) ([A-Z])/(.*?)\s*\]$')
+TIMESTAMP = re.compile(r'^(\d\d-\d\d)\s+(\d\d:\d\d:\d\d\.\d+)')
+BUG_LINE  = re.compile(r'.*nativeGetEnabledTags.*')
+# pidcat --annotate prefixes every rendered record line with its fields in an
+# APC escape (ESC _ F level US tag US pid US tid US timestamp ESC \), which the
+# GUI strips off again. A record's first line may carry extra fields, each a
+# letter and a number: b<lines> heads a coalesced block of that many more
+# lines, r<id> starts repeat run id.
+ANNOTATION = re.compile(r'^\x1b_F([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1b\x1f]*)((?:\x1f[a-z]\d+)*)\x1b\\')
+ANNOTATION_EXTRA = re.compile(r'\x1f([a-z])(\d+)')
+# A line of its own updating repeat run id: ESC _ R id US count US last timestamp ESC \\
+REPEAT_UPDATE = re.compile(r'^\x1b_R(\d+)\x1f(\d+)\x1f([^\x1b]*)\x1b\\')
+# A line of its own reporting a crash fingerprint:
+# ESC _ C fingerprint US count US kind US tag US tid US timestamp US process US title ESC \\
+CRASH_UPDATE = re.compile(r'^\x1b_C([0-9a-f]+)\x1f(\d+)\x1f(\w+)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1b]*)\x1b\\')
+# A line of its own carrying a performance sample:
+# ESC _ M metric US package US name US timestamp US value ESC \\
+METRIC_UPDATE = re.compile(r'^\x1b_M(\w+)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f(\d+)\x1b\\')
+# A line of its own carrying a GC event:
+# ESC _ G process US timestamp US cause US freed KB US % free US used KB US heap KB US pause ms ESC \\
+GC_UPDATE = re.compile(r'^\x1b_G([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([\d.]+)\x1f(\d+)\x1f([\d.]+)\x1f([\d.]+)\x1f([\d.]+)\x1b\\')
+# A line of its own reporting watchlist rule hits (alert 1 when the rule's alert is due now):
+# ESC _ W rule index US hits US alert US tag US tid US timestamp US message ESC \\
+WATCH_UPDATE = re.compile(r'^\x1b_W(\d+)\x1f(\d+)\x1f([01])\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1b]*)\x1b\\')
+
+
+class LogRecord(NamedTuple):
+    timestamp: str  # 'MM-DD HH:MM:SS.mmm', or '' for formats without time
+    level: str
+    tag: str
+    pid: str
+    tid: str
+    message: str
+
+
+def parse_line(line):
+    """Parses one threadtime, time or brief logcat line. Returns None for anything else."""
+    if line[:1].isdigit():
+        m = THREADTIME_LINE.match(line)
+        if m:
+            ts, pid, tid, level, tag, message = m.groups()
+            return LogRecord(' '.join(ts.split()), level, tag.strip(), pid, tid, message or '')
+        m = TIME_LINE.match(line)
+        if m:
+            ts, level, tag, pid, message = m.groups()
+            return LogRecord(' '.join(ts.split()), level, tag.strip(), pid, '', message)
+        return None
+    m = BRIEF_LINE.match(line)
+    if m:
+        level, tag, pid, message = m.groups()
+        return LogRecord('', level, tag.strip(), pid, '', message)
+    return None
+
+
+def annotation(record, block_lines=0, run=None):
+    """The ANNOTATION prefix for a record; block_lines and run add the extra fields."""
+    extra = ''
+    if block_lines:
+        extra += '\x1fb%d' % block_lines
+    if run is not None:
+        extra += '\x1fr%d' % run
+    return '\x1b_F%s\x1f%s\x1f%s\x1f%s\x1f%s%s\x1b\\' % (
+        record.level, record.tag.replace('\x1f', ' '), record.pid, record.tid, record.timestamp, extra)
+
+
+def threadtime(record):
+    """A record as `logcat -v threadtime` text, one line per line of its message."""
+    head = '%s %5s %5s %s %s: ' % (record.timestamp, record.pid, record.tid or record.pid, record.level, record.tag)
+    return ''.join(head + line + '\n' for line in record.message.split('\n'))
+
+
+def repeat_update(run_id, count, last_timestamp):
+    """The REPEAT_UPDATE line for a repeat run."""
+    return '\x1b_R%d\x1f%d\x1f%s\x1b\\' % (run_id, count, last_timestamp)
+
+
+def crash_update(crash):
+    """The CRASH_UPDATE line for a crash fingerprint's latest occurrence."""
+    fields = (crash.tag, crash.tid, crash.last_ts, crash.process, crash.title)
+    return '\x1b_C%s\x1f%d\x1f%s\x1f%s\x1b\\' % (
+        crash.fingerprint, crash.count, crash.kind,
+        '\x1f'.join(f.replace('\x1f', ' ').replace('\x1b', '') for f in fields))
+
+
+def metric_update(timestamp, metric, package, name, value):
+    """The METRIC_UPDATE line for one performance sample."""
+    return '\x1b_M%s\x1f%s\x1f%s\x1f%s\x1f%d\x1b\\' % (metric, package, name, timestamp, value)
+
+
+def gc_update(process, event):
+    """The GC_UPDATE line for one GcEvent of a process."""
+    return '\x1b_G%s\x1f%s\x1f%s\x1f%.1f\x1f%d\x1f%.1f\x1f%.1f\x1f%.3f\x1b\\' % (
+        process, event.timestamp, event.cause.replace('\x1f', ' '), event.freed_kb, event.free_pct,
+        event.used_kb, event.heap_kb, event.pause_ms)
+
+
+def watch_update(index, rule, alert=False):
+    """The WATCH_UPDATE line for a watchlist rule and the latest record it hit."""
+    record = rule.last
+    fields = (record.tag, record.tid, record.timestamp, record.message.partition('\n')[0][:200])
+    return '\x1b_W%d\x1f%d\x1f%d\x1f%s\x1b\\' % (
+        index, rule.hits, alert, '\x1f'.join(f.replace('\x1f', ' ').replace('\x1b', '') for f in fields))
+
+
+class LongEntryParser:
+    """Assembles `logcat -v long` entries (header line, message lines, blank line) into records."""
+
+    def __init__(self):
+        self._head = None
+        self._message = []
+        self.active = False     # inside an entry; otherwise only '[' lines can start one
+
+    def feed(self, line):
+        """Returns (consumed, record).
+
+        consumed is False for a line outside any long entry, which the caller
+        parses as usual; record is set once an entry is complete.
+        """
+        text = line.rstrip('\r\n')
+        head = LONG_HEADER.match(text) if text.startswith('[ ') else None
+        if self._head is None:
+            if head is None:
+                return False, None
+            self._head = head.groups()
+            self.active = True
+            return True, None
+        if head is not None:
+            # An entry cut short without its blank line
+            record = self.flush()
+            self._head = head.groups()
+            self.active = True
+            return True, record
+        if text:
+            self._message.append(text)
+            return True, None
+        return True, self.flush()
+
+    def flush(self):
+        """The entry in progress as a record, or None."""
+        if self._head is None:
+            return None
+        ts, pid, tid, level, tag = self._head
+        message = '\n'.join(self._message)
+        self._head, self._message = None, []
+        self.active = False
+        return LogRecord(' '.join(ts.split()), level, tag.strip(), pid, tid, message)
+
+
+def line_timestamp(line):
+    """Returns the normalized 'MM-DD HH:MM:SS.mmm' prefix of a line, or ''."""
+    m = TIMESTAMP.match(line)
+    return m.group(1) + ' ' + m.group(2) if m else ''
+
+
+def tag_in_tags_regex(tag, tags):
+    return any(re.match(r'^' + t + r'$', tag, re.IGNORECASE) for t in map(str.strip, tags))
@@ -0,0 +1,114 @@
+"""Parallel parsing of large saved logcat files.
+
+The file is memory-mapped and split into chunks at newline boundaries. Each
+chunk is parsed and run through the stateless filters (level, tags) in a worker
+process; results come back in file order so the stateful part of the pipeline
+(PID tracking, rendering) can consume them sequentially.
+"""
+import mmap
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core import crashes, gc_stats, perf_metrics
+from src.core.logline import BUG_LINE, LONG_HEADER, LOG_LEVELS_MAP, parse_line, tag_in_tags_regex
+
+CHUNK_SIZE = 8 * 1024 * 1024
+# Lines from these tags can start or end tracked processes, so they must reach
+# the PID tracker even when the level/tag filters would drop them.
+LIFECYCLE_TAGS = frozenset(['ActivityManager', 'dalvikvm'])
+# The crash detector, perf metrics and GC analytics read every record before
+# the level/tag filters, so whatever they want is kept as well.
+ANALYTICS = (crashes.wants, perf_metrics.wants, gc_stats.wants)
+
+
+def chunk_bounds(mm, chunk_size=CHUNK_SIZE):
+    """Yields (start, end) byte ranges of roughly chunk_size that end on a newline."""
+    size = len(mm)
+    start = 0
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = mm.find(b'\n', end)
+            end = size if newline == -1 else newline + 1
+        yield start, end
+        start = end
+
+
+def parse_chunk(path, start, end, min_level=0, tags=None, ignored_tags=None):
+    """Parses one byte range of a file.
+
+    Returns a list of (record, matches) where matches tells whether the record
+    passed the level/tag filters; non-matching records are only kept when they
+    may carry process lifecycle, crash, performance or GC information.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode('utf-8', errors='replace')
+    results = []
+    append = results.append
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line or BUG_LINE.match(line):
+            continue
+        record = parse_line(line)
+        if not record:
+            continue
+        matches = not (
+            (record.level in LOG_LEVELS_MAP and LOG_LEVELS_MAP[record.level] < min_level)
+            or (ignored_tags and tag_in_tags_regex(record.tag, ignored_tags))
+            or (tags and not tag_in_tags_regex(record.tag, tags))
+        )
+        if matches or record.tag in LIFECYCLE_TAGS or 'Start proc' in record.message \
+                or any(wants(record) for wants in ANALYTICS):
+            append((record, matches))
+    return results
+
+
+def is_long_format(path):
+    """Whether a file was saved with `logcat -v long`, judging by its first lines."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for _, line in zip(range(64), f):
+            if line.strip():
+                return bool(LONG_HEADER.match(line.rstrip('\r\n')))
+    return False
+
+
+def _pool_context():
+    # Worker processes must not re-run the caller's script (pidcat parses argv and
+    # talks to adb at import time), so only fork-capable platforms get a pool.
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def iter_file_chunks(path, min_level=0, tags=None, ignored_tags=None, workers=None, chunk_size=CHUNK_SIZE):
+    """Yields parse_chunk() results for a file, in file order."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bounds = list(chunk_bounds(mm, chunk_size))
+
+    filters = (min_level, tags, ignored_tags)
+    context = _pool_context()
+    workers = workers or os.cpu_count() or 1
+    if context is None or workers == 1 or len(bounds) == 1:
+        for start, end in bounds:
+            yield parse_chunk(path, start, end, *filters)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Keep a bounded window in flight so results never pile up in memory.
+        pending = deque()
+        bounds = iter(bounds)
+        for start, end in bounds:
+            pending.append(pool.submit(parse_chunk, path, start, end, *filters))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            result = pending.popleft().result()
+            for start, end in bounds:
+                pending.append(pool.submit(parse_chunk, path, start, end, *filters))
+                break
+            yield result
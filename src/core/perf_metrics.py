@@ -0,0 +1,119 @@
+"""App performance telemetry picked out of the log.
+
+Three kinds of line already carry numbers worth tracking: activity launch
+times (`Displayed pkg/.Activity: +842ms`), dropped frames (Choreographer
+`Skipped N frames!`) and StrictMode violation durations. Each becomes a
+sample in a series keyed by metric, package and activity or violation, and
+every series reports its count, p50, p95 and max.
+"""
+import re
+from collections import deque
+
+METRICS = {
+    # metric: (label, unit)
+    'startup': ('Startup', 'ms'),
+    'jank': ('Skipped frames', 'frames'),
+    'strictmode': ('StrictMode', 'ms'),
+}
+SERIES_SAMPLES = 10_000     # latest samples kept per series for the percentiles
+
+DISPLAYED = re.compile(r'^Displayed ([^/\s]+)/(\S+?): \+(?:(\d+)s)?(\d+)ms')
+SKIPPED_FRAMES = re.compile(r'^Skipped (\d+) frames')
+STRICT_MODE = re.compile(r'^StrictMode policy violation(?:[^;]*); ~duration=(\d+) ms(?:: ([\w.$]+))?')
+# Tags whose lines carry samples
+TAGS = frozenset(['ActivityManager', 'ActivityTaskManager', 'Choreographer', 'StrictMode'])
+
+
+def wants(record):
+    """Whether a record may carry a sample, so prefilters must let it through."""
+    return record.tag in TAGS
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Series:
+    """Timestamped samples of one metric for one package and activity/violation."""
+    __slots__ = ('metric', 'package', 'name', 'samples', 'count')
+
+    def __init__(self, metric, package, name):
+        self.metric = metric
+        self.package = package
+        self.name = name
+        self.samples = deque(maxlen=SERIES_SAMPLES)    # (timestamp, value)
+        self.count = 0
+
+    def add(self, timestamp, value):
+        self.samples.append((timestamp, value))
+        self.count += 1
+
+    def stats(self):
+        """(p50, p95, max, last) over the kept samples."""
+        values = sorted(value for _, value in self.samples)
+        return percentile(values, 50), percentile(values, 95), values[-1], self.samples[-1][1]
+
+
+class PerfMetrics:
+    """Series per (metric, package, name), fed one record at a time.
+
+    processes maps pids to package names for the metrics an app logs itself;
+    the caller fills it from process start lines. wanted(package, pid) picks
+    the packages worth tracking.
+    """
+
+    def __init__(self, wanted=None, processes=None):
+        self.wanted = wanted
+        self.processes = processes if processes is not None else {}
+        self.series = {}
+
+    def inspect(self, record):
+        """Adds the sample a record carries, if any; returns (metric, package, name, value) or None."""
+        tag = record.tag
+        if tag not in TAGS:
+            return None
+        message = record.message
+        if tag == 'Choreographer':
+            m = SKIPPED_FRAMES.match(message)
+            if not m:
+                return None
+            sample = 'jank', self._package(record.pid), '', int(m.group(1))
+        elif tag == 'StrictMode':
+            m = STRICT_MODE.match(message)
+            if not m:
+                return None
+            violation = (m.group(2) or '').rsplit('.', 1)[-1].rsplit('$', 1)[-1]
+            sample = 'strictmode', self._package(record.pid), violation, int(m.group(1))
+        else:
+            m = DISPLAYED.match(message)
+            if not m:
+                return None
+            seconds, ms = m.group(3), int(m.group(4))
+            sample = 'startup', m.group(1), m.group(2), ms + (int(seconds) * 1000 if seconds else 0)
+        if self.wanted is not None and not self.wanted(sample[1], record.pid):
+            return None
+        self.add(record.timestamp, *sample)
+        return sample
+
+    def _package(self, pid):
+        return self.processes.get(pid) or f'pid {pid}'
+
+    def add(self, timestamp, metric, package, name, value):
+        key = (metric, package, name)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = Series(metric, package, name)
+        series.add(timestamp, value)
+
+    def summary(self):
+        """The series as printable lines, grouped by metric."""
+        lines = ["📈 performance:"]
+        for series in sorted(self.series.values(), key=lambda s: (list(METRICS).index(s.metric), s.package, s.name)):
+            label, unit = METRICS[series.metric]
+            p50, p95, worst, _ = series.stats()
+            what = f"{series.package}/{series.name}" if series.name else series.package
+            lines.append(f"   {label:<14} {what:<48} n={series.count:<6,} "
+                         f"p50 {p50:,} {unit}  p95 {p95:,} {unit}  max {worst:,} {unit}")
+        return lines
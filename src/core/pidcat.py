@@ -22,13 +22,36 @@ limitations under the License.
 # Package filtering and output improvements by Jake Wharton, http://jakewharton.com
 
 import argparse
+import os
 import sys
 import re
 import subprocess
+import time
 from subprocess import PIPE
 import shutil
+import signal
 import colorama
 
+# pidcat runs as a standalone script; make the shared src/ modules importable.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core.coalesce import Coalescer
+from src.core.crashes import CrashDetector
+from src.core.dedup import MODES as DEDUP_MODES, Deduplicator, parse_tag_modes
+from src.core.formats import FORMATS, formatter, header
+from src.core.gc_stats import GcAnalytics
+from src.core.highlight import HighlightRule, Highlighter, parse_rule as parse_highlight, render_ansi
+from src.core.filter_query import FilterError, compile_query, flags_query, parse as parse_query
+from src.core.flight_recorder import FlightRecorder
+from src.core.logline import BUG_LINE, LOG_LEVELS, LOG_LEVELS_MAP, LongEntryParser, annotation, crash_update, gc_update, metric_update, parse_line, repeat_update, watch_update
+from src.core.offline import is_long_format, iter_file_chunks
+from src.core.perf_metrics import PerfMetrics
+from src.core.profiler import StageProfiler
+from src.core.sampling import Sampler
+from src.core.session_store import SessionStore
+from src.core.sources import AdbLogcatSource, Backlog, BugreportSource, Idle, ReplaySource, SectionMarker, StreamGap, with_idle_ticks
+from src.core.watchlist import ALERT_INTERVAL, Watchlist, parse_rules
+
 # Initialize colorama to process ANSI escape codes on Windows
 colorama.init()
 
@@ -90,8 +113,6 @@ def check_adb_device():
         sys.exit(1)
 
 
-LOG_LEVELS = 'VDIWEF'
-LOG_LEVELS_MAP = dict([(LOG_LEVELS[i], i) for i in range(len(LOG_LEVELS))])
 parser = argparse.ArgumentParser(
     description='Filter logcat by package name with colored output.',
     epilog='Example: python pidcat.py com.example.app'
@@ -108,16 +129,99 @@ parser.add_argument('-e', '--emulator', dest='use_emulator', action='store_true'
 parser.add_argument('-c', '--clear', dest='clear_logcat', action='store_true', help='Clear the entire log before running')
 parser.add_argument('-t', '--tag', dest='tag', action='append', help='Filter output by specified tag(s)')
 parser.add_argument('-i', '--ignore-tag', dest='ignored_tag', action='append', help='Filter output by ignoring specified tag(s)')
+parser.add_argument('-F', '--filter', dest='filter', metavar='EXPR', help='Filter expression, e.g. \'level>=W && tag~"^Camera" && !msg:chatty && pid in app\'')
 parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__, help='Print the version number and exit')
 parser.add_argument('-a', '--all', dest='all', action='store_true', default=False, help='Print all log messages')
+parser.add_argument('--backlog', dest='backlog', choices=AdbLogcatSource.BACKLOG_MODES, default='dump', help='How to handle the device buffer on start: dump it in bulk, stream it through the live path, or skip it (default: dump)')
+parser.add_argument('--backlog-lines', metavar='N', dest='backlog_lines', type=int, default=0, help='Only fetch the last N lines of the device buffer on start')
+parser.add_argument('-f', '--file', dest='input_file', metavar='PATH', help='Read a saved logcat file instead of a device (parsed in parallel)')
+parser.add_argument('-b', '--bugreport', dest='bugreport', metavar='ZIP', help='Read the log sections of an adb bugreport zip (or its .txt)')
+parser.add_argument('--section', dest='sections', action='append', metavar='NAME', help='Bugreport section(s) to read (default: SYSTEM LOG, EVENT LOG, CRASH LOG)')
+parser.add_argument('--store', dest='store', metavar='DIR', help='Also record every captured line into an indexed session store')
+parser.add_argument('--from-store', dest='from_store', metavar='DIR', help='Query a session store instead of a device')
+parser.add_argument('--since', dest='since', metavar='TIME', help='With --from-store: first time to show (HH:MM[:SS] or MM-DD HH:MM[:SS])')
+parser.add_argument('--until', dest='until', metavar='TIME', help='With --from-store: last time to show')
+parser.add_argument('--replay', dest='replay', metavar='PATH', help='Replay a saved logcat file or session store through the live path, with its original timing')
+parser.add_argument('--replay-speed', dest='replay_speed', metavar='X', type=float, default=1.0, help='With --replay: speed factor, 0 for as fast as possible (default: 1)')
+parser.add_argument('--no-coalesce', dest='coalesce', action='store_false', help='Show stack trace and tombstone lines as separate records instead of one block')
+parser.add_argument('--coalesce-window', dest='coalesce_window', metavar='MS', type=int, default=50, help='Max gap between the lines of one block (default: 50)')
+parser.add_argument('--dedup', dest='dedup', choices=DEDUP_MODES, default='off', help='Fold repeats of a line into one entry with a count: exact matches, or matches after masking numbers (default: off; text output only)')
+parser.add_argument('--dedup-tag', dest='dedup_tags', action='append', metavar='TAG=MODE', help='Dedup mode for one tag, overriding --dedup')
+parser.add_argument('--dedup-window', dest='dedup_window', metavar='SECONDS', type=float, default=5.0, help='Longest gap between repeats of one entry (default: 5)')
+parser.add_argument('--sample', dest='sample_every', metavar='N', type=int, default=1, help='Show one in N V/D/I lines of each tag past its first --sample-first; W and above are always shown (text output only)')
+parser.add_argument('--sample-target', dest='sample_target', metavar='LINES_PER_S', type=int, default=0, help='Like --sample, with N adjusted every second of log time to hold this rate')
+parser.add_argument('--sample-first', dest='sample_first', metavar='K', type=int, default=20, help='Lines of each tag shown before sampling applies (default: 20)')
+parser.add_argument('--flight-recorder', dest='flight_minutes', metavar='MINUTES', type=float, default=0, help='Show nothing; keep the last MINUTES of the capture in memory and write them to a compressed file when a trigger fires or on SIGUSR1')
+parser.add_argument('--flight-dir', dest='flight_dir', metavar='DIR', default='.', help='Where --flight-recorder writes its dumps (default: current directory)')
+parser.add_argument('--flight-max-lines', dest='flight_max_lines', metavar='N', type=int, default=500_000, help='Most lines --flight-recorder keeps, whatever their age (default: 500000)')
+parser.add_argument('--trigger-on', dest='trigger_on', metavar='KINDS', default='java,native,anr', help='Crashes of the watched packages that make --flight-recorder dump: any of java, native, anr, comma-separated (default: all)')
+parser.add_argument('--trigger', dest='triggers', action='append', metavar='REGEX', help='Also make --flight-recorder dump when a message matches REGEX')
+parser.add_argument('--highlight', dest='highlights', action='append', metavar='STYLE=REGEX', help='Color what REGEX matches in messages, e.g. "bold red on yellow=Connection (reset|refused)"')
+parser.add_argument('--watch', dest='watch', action='append', metavar='RULE', help='Highlight and count messages containing a keyword, or matching /REGEX/ (/REGEX/i ignores case); a leading ! also alerts on a hit')
+parser.add_argument('--watch-file', dest='watch_file', metavar='PATH', help='Read --watch rules from a file, one per line (# starts a comment)')
+parser.add_argument('--watch-alert-interval', dest='watch_alert_interval', metavar='SECONDS', type=float, default=ALERT_INTERVAL, help='Least time between two alerts of one watch rule (default: %g)' % ALERT_INTERVAL)
+parser.add_argument('--no-reconnect', dest='reconnect', action='store_false', help='Stop when the logcat stream is lost instead of resuming it')
+parser.add_argument('--format', dest='format', choices=FORMATS, default='text', help='Output colored text (default), or one ndjson/csv/tsv record per line for other tools')
+parser.add_argument('--profile', dest='profile', action='store_true', help='Time each pipeline stage and count filtered lines; reports to stderr periodically and on exit')
+parser.add_argument('--profile-interval', dest='profile_interval', metavar='SECONDS', type=float, default=10.0, help='Seconds between --profile reports, 0 for only the final one (default: 10)')
+parser.add_argument('--annotate', dest='annotate', action='store_true', help=argparse.SUPPRESS)  # record fields for the GUI
 
 args = parser.parse_args()
 min_level = LOG_LEVELS_MAP[args.min_level.upper()]
+try:
+  filter_node = parse_query(args.filter or '')
+except FilterError as e:
+  parser.error(f'--filter: {e}')
+
+try:
+  dedup_tag_modes = parse_tag_modes(args.dedup_tags)
+except ValueError as e:
+  parser.error(f'--dedup-tag: {e}')
+
+trigger_kinds = set(filter(None, (kind.strip() for kind in args.trigger_on.split(','))))
+if trigger_kinds - {'java', 'native', 'anr'}:
+  parser.error(f"--trigger-on: unknown kind(s) {', '.join(sorted(trigger_kinds - {'java', 'native', 'anr'}))}")
+try:
+  triggers = [re.compile(pattern) for pattern in args.triggers or ()]
+except re.error as e:
+  parser.error(f'--trigger: {e}')
+try:
+  user_highlights = [parse_highlight(rule) for rule in args.highlights or ()]
+except ValueError as e:
+  parser.error(f'--highlight: {e}')
+
+watch_lines = list(args.watch or ())
+if args.watch_file:
+  try:
+    with open(args.watch_file, encoding='utf-8') as f:
+      watch_lines += f.read().splitlines()
+  except OSError as e:
+    parser.error(f'--watch-file: {e}')
+try:
+  watchlist = Watchlist(parse_rules(watch_lines), args.watch_alert_interval) if watch_lines else None
+except ValueError as e:
+  parser.error(f'--watch: {e}')
+if args.flight_minutes > 0 and (args.input_file or args.bugreport or args.from_store):
+  parser.error('--flight-recorder needs a device or --replay')
 
 package = args.package
 
+output = sys.stdout
+structured = args.format != 'text'
+if structured:
+  # Records get stdout to themselves through a large buffer; everything else
+  # pidcat prints goes to stderr.
+  output = open(sys.stdout.fileno(), 'w', encoding='utf-8', buffering=1 << 20, closefd=False)
+  sys.stdout = sys.stderr
+  format_record = formatter(args.format)
+  if header(args.format):
+    output.write(header(args.format) + '\n')
+
 print(f"--- Colored Logcat v{__version__} ---")
-selected_device = check_adb_device()
+offline = bool(args.input_file or args.bugreport or args.from_store)
+# A replay stands in for the device, so nothing below may talk to adb.
+no_device = offline or bool(args.replay)
+selected_device = None if no_device else check_adb_device()
 
 base_adb_command = ['adb']
 if args.device_serial:
@@ -133,7 +237,7 @@ elif args.use_emulator:
   base_adb_command.append('-e')
   print(" targeting first running emulator.")
 
-if args.current_app:
+if args.current_app and not no_device:
   print(" looking for current running app...")
   system_dump_command = base_adb_command + ["shell", "dumpsys", "activity", "activities"]
   system_dump_process = subprocess.Popen(system_dump_command, stdout=PIPE, stderr=PIPE, universal_newlines=True)
@@ -198,11 +302,15 @@ def allocate_color(tag):
     LAST_USED.append(color)
   return color
 
-RULES = {re.compile(r'^(StrictMode policy violation)(; ~duration=)(\d+ ms)') : r'%s\1%s\2%s\3%s' % (termcolor(RED), RESET, termcolor(YELLOW), RESET)}
+# Built-in highlights style single groups; --highlight rules come after them and win overlaps.
+RULES = [HighlightRule(r'^(StrictMode policy violation)(; ~duration=)(\d+ ms)', {1: '3%d' % RED, 3: '3%d' % YELLOW})]
 if args.color_gc:
-  key = re.compile(r'^(GC_(?:CONCURRENT|FOR_M?ALLOC|EXTERNAL_ALLOC|EXPLICIT) )(freed <?\d+.)(, \d+\% free \d+./\d+., )(paused \d+ms(?:\+\d+ms)?)')
-  val = r'\1%s\2%s\3%s\4%s' % (termcolor(GREEN), RESET, termcolor(YELLOW), RESET)
-  RULES[key] = val
+  GC_STYLES = {2: '3%d' % GREEN, 4: '3%d' % YELLOW}
+  RULES.append(HighlightRule(r'^(GC_(?:CONCURRENT|FOR_M?ALLOC|EXTERNAL_ALLOC|EXPLICIT) )(freed <?\d+.)(, \d+\% free \d+./\d+., )(paused \d+ms(?:\+\d+ms)?)', GC_STYLES))
+  # ART: 'Background concurrent copying GC freed 84(5MB) AllocSpace objects, ..., 61% free, 31MB/232MB, paused 1422us total 33.509ms'
+  RULES.append(HighlightRule(r'^(.*?GC )(freed (?:\d+\(\d+(?:\.\d+)?[KM]?B\) AllocSpace objects|\d+(?:\.\d+)?[KM]?B AllocSpace bytes))(.*?, \d+% free, [\d.]+[KM]?B/[\d.]+[KM]?B, )(paused [\d.,a-z]+ total [\d.]+[um]?s)', GC_STYLES))
+highlighter = Highlighter(RULES + user_highlights)
+WATCH_STYLE = '1;3%d;4%d' % (WHITE, MAGENTA)
 
 TAGTYPES = {
   'V': colorize(' V ', fg=WHITE, bg=BLACK), 'D': colorize(' D ', fg=BLACK, bg=BLUE),
@@ -213,38 +321,33 @@ TAGTYPES = {
 PID_LINE = re.compile(r'^\w+\s+(\w+)\s+.*?\s([\w|\.|\/]+)$')
 PID_START = re.compile(r'^.*: Start proc ([a-zA-Z0-9._:]+) for ([a-z]+ [^:]+): pid=(\d+) uid=(\d+) gids=(.*)$')
 PID_START_5_1 = re.compile(r'^.*: Start proc (\d+):([a-zA-Z0-9._:]+)/[a-z0-9]+ for (.*)$')
-PID_START_DALVIK = re.compile(r'^E/dalvikvm\(\s*(\d+)\): >>>>> ([a-zA-Z0-9._:]+) \[ userId:0 \| appId:(\d+) \]$')
+PID_START_DALVIK = re.compile(r'^>>>>> ([a-zA-Z0-9._:]+) \[ userId:0 \| appId:(\d+) \]$')
 PID_KILL  = re.compile(r'^Killing (\d+):([a-zA-Z0-9._:]+)/[^:]+: (.*)$')
 PID_LEAVE = re.compile(r'^No longer want ([a-zA-Z0-9._:]+) \(pid (\d+)\): .*$')
 PID_DEATH = re.compile(r'^Process ([a-zA-Z0-9._:]+) \(pid (\d+)\) has died.?$')
-LOG_LINE  = re.compile(r'^([A-Z])/(.+?)\( *(\d+)\): (.*?)$')
-BUG_LINE  = re.compile(r'.*nativeGetEnabledTags.*')
 BACKTRACE_LINE = re.compile(r'^#(.*?)pc\s(.*?)$')
+TOMBSTONE_PROCESS = re.compile(r'^pid: (\d+), tid: \d+, name: .*>>> (\S+) <<<', re.M)
 
-adb_command = base_adb_command[:]
-adb_command.append('logcat')
-adb_command.extend(['-v', 'brief'])
-
-if args.clear_logcat:
+if args.clear_logcat and not no_device:
   print("Clearing logcat buffer (this may fail on some Android versions)...")
   try:
-    subprocess.run(list(adb_command) + ['-c'], check=True, capture_output=True)
+    subprocess.run(base_adb_command + ['logcat', '-c'], check=True, capture_output=True)
     print("Buffer cleared successfully.")
   except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
     print("Warning: Could not clear log buffer. This is common on newer Android versions.")
 
-class FakeStdinProcess():
-  def __init__(self):
-    self.stdout = sys.stdin
-    self.returncode = None
-  
-  def poll(self):
-    return None
-
 pids = set()
 last_tag = None
 app_pid = None
 
+# -l/-t/-i, the package filter and --filter all compile into one predicate.
+try:
+  record_filter = compile_query(
+    ('and', [parse_query(flags_query(min_level, args.tag, args.ignored_tag, app_only=not args.all)), filter_node]),
+    sets={'app': pids})
+except FilterError as e:
+  parser.error(f'--filter: {e}')
+
 def match_packages(token):
   if not package: return True
   if token in named_processes: return True
@@ -261,26 +364,20 @@ def parse_death(tag, message):
       if match_packages(pname) and pid in pids: return pid, pname
   return None, None
 
-def parse_start_proc(line):
-  patterns = [PID_START_5_1, PID_START, PID_START_DALVIK]
-  for pattern in patterns:
+def parse_start_proc(record):
+  if record.tag == 'dalvikvm':
+    start = PID_START_DALVIK.match(record.message)
+    return (start.group(1), '', record.pid, start.group(2), '') if start else None
+  if 'Start proc' not in record.message: return None
+  line = record.tag + ': ' + record.message
+  for pattern in [PID_START_5_1, PID_START]:
     start = pattern.match(line)
     if start:
       if pattern == PID_START_5_1: return start.group(2), start.group(3), start.group(1), '', ''
       if pattern == PID_START: return start.groups()
-      if pattern == PID_START_DALVIK: return start.group(2), '', start.group(1), start.group(3), ''
   return None
 
-def tag_in_tags_regex(tag, tags):
-  return any(re.match(r'^' + t + r'$', tag, re.IGNORECASE) for t in map(str.strip, tags))
-
-# Initialize ADB connection
-if sys.stdin.isatty():
-    adb = subprocess.Popen(adb_command, stdin=PIPE, stdout=PIPE, text=True)
-else:
-    adb = FakeStdinProcess()
-
-if not args.all:
+def scan_running_pids():
     print(f"Searching for running process(es) for '{', '.join(package)}'...")
     ps_command = base_adb_command + ['shell', 'ps']
     try:
@@ -301,93 +398,495 @@ if not args.all:
     except subprocess.CalledProcessError:
         print("⚠️ Warning: Error executing PS command. Will still attempt to capture logs.")
 
+long_entries = LongEntryParser()
+
+def watched(process, pid):
+  """Whether crashes and performance samples of a process concern the packages being watched."""
+  return pid in pids or match_packages(process)
+
+process_names = {}      # pid -> package, from process start lines
+crash_detector = CrashDetector(None if args.all else watched)
+perf_metrics = PerfMetrics(None if args.all else watched, process_names)
+gc_stats = GcAnalytics(None if args.all else watched, process_names)
+coalescer = Coalescer(args.coalesce_window) if args.coalesce else None
+# Structured output is for other tools, which get every record.
+dedup = None
+if not structured and (args.dedup != 'off' or any(mode != 'off' for mode in dedup_tag_modes.values())):
+  dedup = Deduplicator(args.dedup, dedup_tag_modes, args.dedup_window)
+sampler = None
+if not structured and (args.sample_every > 1 or args.sample_target > 0):
+  sampler = Sampler(args.sample_every, args.sample_target, args.sample_first)
+# The flight recorder keeps raw records; nothing is rendered until a dump is replayed.
+flight = None
+if args.flight_minutes > 0:
+  flight = FlightRecorder(args.flight_minutes, args.flight_dir, args.flight_max_lines)
+  coalescer = dedup = sampler = watchlist = None
+
+def process_line(line, out):
+    """Runs one raw logcat line through PID tracking, filtering and rendering into out."""
+    consumed = False
+    if long_entries.active or line[:1] == '[':
+        consumed, record = long_entries.feed(line)
+    if not consumed:
+        line = line.strip()
+        if not line:
+            return
+
+        if BUG_LINE.match(line):
+            return
+
+        record = parse_line(line)
+    if record:
+        if store:
+            store.append(record)
+        ingest_record(record, out)
+
+def ingest_record(record, out, matches=True):
+    """Passes a record on to process_record, through the coalescer when it is on."""
+    if coalescer is None:
+        process_record(record, out, matches)
+        return
+    done = coalescer.push(record, matches)
+    if done:
+        process_record(done[0], out, done[1])
+
+if flight:
+  def ingest_record(record, out, matches=True):
+    """Flight recorder mode: keeps the record in the ring, and dumps the ring when a trigger fires."""
+    flight.add(record)
+    record = track_record(record, [])
+    crash = crash_detector.feed(record)
+    if crash:
+      flight_crash(crash)
+    elif triggers and any(trigger.search(record.message) for trigger in triggers):
+      flight_dump('trigger ' + record.tag)
+
+def flight_crash(crash):
+  if crash.kind in trigger_kinds:
+    flight_dump(f'{crash.kind} {crash.process}')
+
+def flight_dump(reason):
+  done = flight.dump(reason, time.monotonic())
+  if done:
+    print(f"✈ Flight recorder: {reason}, writing {done[1]:,} lines to {done[0]}", file=sys.stderr, flush=True)
+
+def flush_pending(out, final=True):
+    """Processes the records a long entry or the coalescer still hold back.
+
+    final closes the repeat runs too; otherwise (a quiet live stream) the GUI
+    just gets their current counts.
+    """
+    record = long_entries.flush()
+    if record:
+        if store:
+            store.append(record)
+        ingest_record(record, out)
+    done = coalescer and coalescer.flush()
+    if done:
+        process_record(done[0], out, done[1])
+    crash = crash_detector.flush()
+    if crash and flight:
+        flight_crash(crash)
+    elif crash and args.annotate:
+        out.append(crash_update(crash))
+    if dedup:
+        for run in dedup.flush() if final else dedup.unreported() if args.annotate else ():
+            render_repeats(run, out)
+    if watchlist and args.annotate:
+        for index, rule in enumerate(watchlist.rules):
+            if rule.hits != rule.reported:
+                out.append(watch_update(index, rule))
+                rule.reported, rule.reported_at = rule.hits, time.monotonic()
+
+store = SessionStore(args.store) if args.store else None
+
+def track_record(record, out):
+    """PID tracking: adds process start/end banners to out and returns the record
+    with the pid it should be attributed to."""
+    global last_tag, app_pid
+    tag, message = record.tag, record.message
+
+    start = parse_start_proc(record)
+    if start:
+      line_package, target, line_pid, line_uid, line_gids = start
+      process_names[line_pid] = line_package
+      if match_packages(line_package) and line_pid not in pids:
+        pids.add(line_pid)
+        app_pid = line_pid
+        if not structured:
+          linebuf  = '\n' + colorize(' ' * (header_size - 1), bg=WHITE)
+          linebuf += indent_wrap(' Process %s created for %s\n' % (line_package, target))
+          linebuf += colorize(' ' * (header_size - 1), bg=WHITE)
+          linebuf += ' PID: %s   UID: %s   GIDs: %s' % (line_pid, line_uid, line_gids)
+          linebuf += '\n'
+          out.append(linebuf)
+          last_tag = None
+
+    dead_pid, dead_pname = parse_death(tag, message)
+    if dead_pid and dead_pid in pids:
+      pids.remove(dead_pid)
+      if not structured:
+        linebuf  = '\n' + colorize(' ' * (header_size - 1), bg=RED)
+        linebuf += ' Process %s (PID: %s) ended' % (dead_pname, dead_pid)
+        linebuf += '\n'
+        out.append(linebuf)
+        last_tag = None
+
+    if tag == 'DEBUG':
+      # Tombstones are logged by crash_dump, not the process that crashed.
+      crash = TOMBSTONE_PROCESS.search(message)
+      if crash:
+        if match_packages(crash.group(2)):
+          pids.add(crash.group(1))
+        return record._replace(pid=crash.group(1))
+      if BACKTRACE_LINE.match(message.lstrip()):
+        return record._replace(pid=app_pid or record.pid, message=message.lstrip())
+    return record
+
+def render_record(record, out, run=None, spans=None):
+    """Renders a record that passed the filters into out; run is the repeat run it
+    starts, spans the watchlist hits to highlight."""
+    global last_tag
+    tag, level, message = record.tag, record.level, record.message
+    linebuf = ''
+    if args.tag_width > 0:
+      if tag != last_tag or args.always_tags:
+        last_tag = tag
+        color = allocate_color(tag)
+        tag = tag[-args.tag_width:].rjust(args.tag_width)
+        linebuf += colorize(tag, fg=color)
+      else:
+        linebuf += ' ' * args.tag_width
+      linebuf += ' '
+
+    linebuf += TAGTYPES.get(level, ' ' + level + ' ')
+    linebuf += ' '
+
+    if stdout_isatty:
+      styled = highlighter.spans(message)
+      if spans:
+        styled += [(start, end, WATCH_STYLE) for start, end, _ in spans]
+      message = render_ansi(message, styled)
+
+    if '\n' in message:
+      # A coalesced block: its lines continue under the message column.
+      indent = '\n' + ' ' * (header_size - 4 if args.tag_width > 0 else 0) + TAGTYPES.get(level, ' ' + level + ' ') + ' '
+      linebuf += indent.join(map(indent_wrap, message.split('\n')))
+      if args.annotate:
+        prefix = annotation(record)
+        linebuf = annotation(record, linebuf.count('\n'), run) + linebuf.replace('\n', '\n' + prefix)
+    else:
+      linebuf += indent_wrap(message)
+      if args.annotate:
+        prefix = annotation(record)
+        linebuf = (prefix if run is None else annotation(record, run=run)) + linebuf.replace('\n', '\n' + prefix)
+    out.append(linebuf)
+
+REPEAT_REPORT_INTERVAL = 0.25   # seconds between count updates of one run for the GUI
+
+def note_repeat(run, out):
+    """A record folded into run: the GUI gets the new count now and then."""
+    if args.annotate:
+      now = time.monotonic()
+      if now - run.reported_at >= REPEAT_REPORT_INTERVAL:
+        render_repeats(run, out)
+        run.reported_at = now
+
+def render_repeats(run, out):
+    """Reports the repeat count of a run: as an update for the GUI, or a summary line."""
+    global last_tag
+    run.reported = run.count
+    if args.annotate:
+      out.append(repeat_update(run.id, run.count, run.last_ts))
+      return
+    linebuf = ' ' * (header_size - 4 if args.tag_width > 0 else 0)
+    linebuf += TAGTYPES.get(run.record.level, ' ' + run.record.level + ' ') + ' '
+    linebuf += colorize('×%d' % run.count, fg=YELLOW)
+    first_line = run.record.message.partition('\n')[0]
+    linebuf += '  ' + (first_line if len(first_line) <= 60 else first_line[:59] + '…')
+    if run.record.timestamp:
+      linebuf += '  %s – %s' % (run.record.timestamp, run.last_ts)
+    out.append(linebuf)
+    last_tag = None
+
+WATCH_REPORT_INTERVAL = 0.25   # seconds between hit count updates of one rule for the GUI
+
+def note_watch(record, spans, out):
+    """Counts the watchlist hits of a record; alerts for the rules that are due."""
+    now = time.monotonic()
+    hit, due = watchlist.count(spans, record, now)
+    if args.annotate:
+      for index in hit:
+        rule = watchlist.rules[index]
+        if index in due or now - rule.reported_at >= WATCH_REPORT_INTERVAL:
+          out.append(watch_update(index, rule, index in due))
+          rule.reported, rule.reported_at = rule.hits, now
+      return
+    for index in due:
+      rule = watchlist.rules[index]
+      print(f"\a🔔 Watch: {rule.text} ×{rule.hits:,}  {record.timestamp} {record.tag}: "
+            f"{record.message.partition(chr(10))[0][:120]}", file=sys.stderr, flush=True)
+
+if structured:
+  def render_record(record, out, run=None, spans=None):
+    out.append(format_record(record))
+
+def process_record(record, out, matches=True):
+    """Tracks PIDs from a parsed record and renders it into out when it passes the filters.
+
+    matches=False means the stateless level/tag filters already rejected the
+    record elsewhere, so it is only inspected for process lifecycle events.
+    """
+    record = track_record(record, out)
+    crash = crash_detector.feed(record)
+    if crash and args.annotate:
+      out.append(crash_update(crash))
+    sample = perf_metrics.inspect(record)
+    if sample and args.annotate:
+      out.append(metric_update(record.timestamp, *sample))
+    gc = gc_stats.inspect(record)
+    if gc and args.annotate:
+      out.append(gc_update(*gc))
+    if matches and record_filter(record):
+      spans = watchlist.scan(record.message) if watchlist else None
+      if spans:
+        note_watch(record, spans, out)
+      elif sampler is not None and not sampler.keep(record):
+        return
+      if dedup is None:
+        render_record(record, out, spans=spans)
+        return
+      run = dedup.check(record)
+      if run is None:
+        render_record(record, out, spans=spans)
+      elif run.count > 1:
+        note_repeat(run, out)
+      else:
+        render_record(record, out, run.id, spans)
+      for ended in dedup.ended():
+        render_repeats(ended, out)
+
+def write_output(out, flush=True):
+    """Writes rendered lines in one call; finite sources leave flushing to the buffer."""
+    if out:
+        output.write('\n'.join(out) + '\n')
+        if flush:
+            output.flush()
+
+def flush_output():
+    try:
+        output.flush()
+    except BrokenPipeError:
+        pass
+
+OUTPUT_BATCH = 512
+
+# --profile swaps the stage functions for timed versions, so the normal path
+# carries no instrumentation at all.
+profiler = None
+if args.profile:
+  profiler = StageProfiler(args.profile_interval)
+  filter_checks = [(reason, compile_query(query, sets={'app': pids})) for reason, query in [
+    ('pid', flags_query(app_only=not args.all)),
+    ('level', flags_query(min_level)),
+    ('ignored tag', flags_query(ignored_tags=args.ignored_tag)),
+    ('tag', flags_query(tags=args.tag)),
+  ] if query]
+  if args.filter:
+    filter_checks.append(('--filter', compile_query(filter_node, sets={'app': pids})))
+  parse_line = profiler.wrap('parse', parse_line)
+  track_record = profiler.wrap('track', track_record, counter='lines in')
+  record_filter = profiler.wrap_filter(record_filter, filter_checks)
+  render_record = profiler.wrap('render', render_record, counter='shown')
+  write_output = profiler.wrap('write', write_output, counter='bytes written',
+                               amount=lambda out, flush=True: sum(len(s.encode('utf-8', 'replace')) + 1 for s in out))
+
+def profiled(source):
+    return profiler.iterate('read', source) if profiler else source
+
+def drain(source):
+    """Runs a finite source through the pipeline with buffered writes."""
+    global last_tag
+    out = []
+    for item in profiled(source):
+        if isinstance(item, SectionMarker):
+            # The previous section's last record goes out above the banner.
+            flush_pending(out, final=False)
+            if structured:
+                continue
+            linebuf  = '\n' + colorize(' ' * (header_size - 1), bg=BLUE)
+            linebuf += ' ' + item.title
+            linebuf += '\n'
+            out.append(linebuf)
+            last_tag = None
+        else:
+            process_line(item, out)
+        if len(out) >= OUTPUT_BATCH:
+            write_output(out, flush=False)
+            out = []
+    flush_pending(out)
+    write_output(out, flush=False)
+
+def query_store(path):
+    """Streams the records of a session store matching --since/--until and the filters."""
+    session = SessionStore(path)
+    since = session.parse_time(args.since) if args.since else None
+    until = session.parse_time(args.until, end=True) if args.until else None
+    # Level/tag filters can only be pushed down when no PID tracking needs the other lines.
+    pushdown = dict(min_level=min_level, tags=args.tag) if args.all else {}
+    out = []
+    for record in profiled(session.query(since, until, **pushdown)):
+        ingest_record(record, out)
+        if len(out) >= OUTPUT_BATCH:
+            write_output(out, flush=False)
+            out = []
+    flush_pending(out)
+    write_output(out, flush=False)
+
+def on_terminate(signum, frame):
+    # SIGTERM (the GUI's Stop) unwinds like Ctrl+C, so the finally blocks below
+    # close the session store and wait for flight recorder dumps.
+    raise SystemExit(128 + signum)
+
+signal.signal(signal.SIGTERM, on_terminate)
+
+if offline:
+    input_path = args.input_file or args.bugreport or args.from_store
+    try:
+        if args.bugreport:
+            drain(BugreportSource(args.bugreport, args.sections))
+        elif args.from_store:
+            query_store(args.from_store)
+        elif is_long_format(args.input_file):
+            # Entries span lines, so the file can't be split for the workers.
+            with open(args.input_file, encoding='utf-8', errors='replace') as f:
+                drain(f)
+        else:
+            # When recording into a store every line has to reach this process.
+            filters = () if store else (min_level, args.tag, args.ignored_tag)
+            for chunk in profiled(iter_file_chunks(args.input_file, *filters)):
+                out = []
+                for record, matches in chunk:
+                    if store:
+                        store.append(record)
+                    ingest_record(record, out, matches)
+                write_output(out, flush=False)
+            out = []
+            flush_pending(out)
+            write_output(out, flush=False)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    except (OSError, ValueError) as e:
+        print(f"❌ ERROR: Could not read {input_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if store:
+            store.close()
+        flush_output()
+        if profiler:
+            profiler.report(final=True)
+        if sampler:
+            print(sampler.summary(), file=sys.stderr)
+        if crash_detector.crashes and not args.annotate:
+            print('\n'.join(crash_detector.summary()), file=sys.stderr)
+        if perf_metrics.series and not args.annotate:
+            print('\n'.join(perf_metrics.summary()), file=sys.stderr)
+        if gc_stats.series and not args.annotate:
+            print('\n'.join(gc_stats.summary()), file=sys.stderr)
+        if watchlist and not args.annotate:
+            print('\n'.join(watchlist.summary()), file=sys.stderr)
+        colorama.deinit()
+    sys.exit(0)
+
+# Initialize ADB connection
+if args.replay:
+    source = ReplaySource(args.replay, args.replay_speed)
+elif sys.stdin.isatty():
+    source = AdbLogcatSource(base_adb_command, reconnect=args.reconnect,
+                             backlog=args.backlog, backlog_lines=args.backlog_lines)
+else:
+    source = sys.stdin
+
+if not args.all and not no_device:
+    scan_running_pids()
+
+if flight:
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: flight_dump('manual'))
+    print(f"✈ Flight recorder: keeping the last {args.flight_minutes:g} min (at most {args.flight_max_lines:,} lines); "
+          f"dumps go to {os.path.abspath(args.flight_dir)}"
+          + (f", kill -USR1 {os.getpid()} dumps now" if hasattr(signal, 'SIGUSR1') else ''))
+
 print("\n--- Listening for logcat messages... (Press Ctrl+C to exit) ---\n")
 
+# The coalescer holds the latest record until the next one arrives, repeat
+# counts are only sent now and then and the session store writes out a partial
+# block every few seconds; idle ticks catch up when the stream goes quiet.
+stream = source
+if coalescer or store or ((dedup or watchlist) and args.annotate):
+    stream = with_idle_ticks(source, max(args.coalesce_window, 50) / 1000)
+
+first_live_reported = False
 try:
-    while adb and adb.poll() is None:
+    for line in profiled(stream):
+        out = []
         try:
-            if hasattr(adb, 'stdout') and adb.stdout:
-                line = adb.stdout.readline()
-            elif not sys.stdin.isatty():
-                line = sys.stdin.readline()
-            else:
-                # No valid input source
-                break
-                
-            if not line:  # End of file
-                break
-                
-            # Ensure it's a string (should be with text=True)
-            line = line.strip()
-            if not line:
-                continue
-                
-            if BUG_LINE.match(line):
-                continue
-                
-            log_line = LOG_LINE.match(line)
-            if not log_line:
-                continue
-
-            level, tag, owner, message = log_line.groups()
-            tag = tag.strip()
-            
-            start = parse_start_proc(line)
-            if start:
-              line_package, target, line_pid, line_uid, line_gids = start
-              if match_packages(line_package) and line_pid not in pids:
-                pids.add(line_pid)
-                app_pid = line_pid
-                linebuf  = '\n' + colorize(' ' * (header_size - 1), bg=WHITE)
-                linebuf += indent_wrap(' Process %s created for %s\n' % (line_package, target))
-                linebuf += colorize(' ' * (header_size - 1), bg=WHITE)
-                linebuf += ' PID: %s   UID: %s   GIDs: %s' % (line_pid, line_uid, line_gids)
-                linebuf += '\n'
-                print(linebuf)
-                last_tag = None
-
-            dead_pid, dead_pname = parse_death(tag, message)
-            if dead_pid and dead_pid in pids:
-              pids.remove(dead_pid)
-              linebuf  = '\n' + colorize(' ' * (header_size - 1), bg=RED)
-              linebuf += ' Process %s (PID: %s) ended' % (dead_pname, dead_pid)
+            if isinstance(line, Idle):
+              flush_pending(out, final=False)
+              write_output(out)
+              if store:
+                store.flush_if_due()
+              continue
+
+            if isinstance(line, StreamGap):
+              linebuf  = '\n' + colorize(' ' * (header_size - 1), bg=YELLOW)
+              linebuf += ' Reconnected, %d s gap' % round(line.seconds)
               linebuf += '\n'
               print(linebuf)
               last_tag = None
-
-            if tag == 'DEBUG' and BACKTRACE_LINE.match(message.lstrip()):
-              message = message.lstrip()
-              owner = app_pid
-
-            if not args.all and owner not in pids: continue
-            if level in LOG_LEVELS_MAP and LOG_LEVELS_MAP[level] < min_level: continue
-            if args.ignored_tag and tag_in_tags_regex(tag, args.ignored_tag): continue
-            if args.tag and not tag_in_tags_regex(tag, args.tag): continue
-
-            linebuf = ''
-            if args.tag_width > 0:
-              if tag != last_tag or args.always_tags:
-                last_tag = tag
-                color = allocate_color(tag)
-                tag = tag[-args.tag_width:].rjust(args.tag_width)
-                linebuf += colorize(tag, fg=color)
-              else:
-                linebuf += ' ' * args.tag_width
-              linebuf += ' '
-
-            linebuf += TAGTYPES.get(level, ' ' + level + ' ')
-            linebuf += ' '
-
-            for matcher, replace in RULES.items():
-              message = matcher.sub(replace, message)
-
-            linebuf += indent_wrap(message)
-            print(linebuf)
-
-        except KeyboardInterrupt:
-            print("\n--- Exiting gracefully. ---")
+              if not args.all:
+                pids.clear()
+                scan_running_pids()
+              continue
+
+            if isinstance(line, Backlog):
+              for backlog_line in line.lines:
+                process_line(backlog_line, out)
+              write_output(out)
+              print(f"⏱ Backlog: {len(line.lines)} lines fetched in {line.elapsed * 1000:.0f} ms", file=sys.stderr)
+              continue
+
+            process_line(line, out)
+            write_output(out)
+            if not first_live_reported and getattr(source, 'first_live_after', None) is not None:
+              first_live_reported = True
+              print(f"⏱ First live line after {source.first_live_after * 1000:.0f} ms", file=sys.stderr)
         except Exception as e:
             print(f"\nAn unexpected error occurred: {e}", file=sys.stderr)
+    out = []
+    flush_pending(out)
+    write_output(out)
+except KeyboardInterrupt:
+    print("\n--- Exiting gracefully. ---")
 finally:
+    if isinstance(source, AdbLogcatSource):
+        source.close()
+    if flight:
+        flight.close()
+    if store:
+        store.close()
+    flush_output()
+    if profiler:
+        profiler.report(final=True)
+    if sampler:
+        print(sampler.summary(), file=sys.stderr)
+    if crash_detector.crashes and not args.annotate:   # the GUI lists them itself
+        print('\n'.join(crash_detector.summary()), file=sys.stderr)
+    if perf_metrics.series and not args.annotate:
+        print('\n'.join(perf_metrics.summary()), file=sys.stderr)
+    if gc_stats.series and not args.annotate:
+        print('\n'.join(gc_stats.summary()), file=sys.stderr)
+    if watchlist and not args.annotate:
+        print('\n'.join(watchlist.summary()), file=sys.stderr)
     # De-initialize colorama to restore original terminal settings.
     colorama.deinit()
\ No newline at end of file
@@ -6,15 +6,26 @@ class ProcessReader(QtCore.QThread):
     """Background thread that runs pidcat (or whatever cmd) and emits lines.
     On POSIX we attach the child to a pty so pidcat will emit ANSI escapes; on other
     systems we fall back to using pipes.
+    Lines are emitted in batches: everything complete in one read goes out in a
+    single lines_ready signal, so a bulk backlog dump costs one UI update.
+    With stats (an IngestStats), every batch is counted as it is emitted.
+    With queue (a LineQueue), batches go into the queue instead, under its
+    overload policy, and lines_available fires when it stops being empty; the
+    view then takes lines at its own pace rather than Qt queueing every batch.
     """
-    line_ready = QtCore.pyqtSignal(str)
+    lines_ready = QtCore.pyqtSignal(list)
+    lines_available = QtCore.pyqtSignal()
     finished = QtCore.pyqtSignal()
 
-    def __init__(self, cmd, env=None, input_text=None):
+    READ_SIZE = 65536
+
+    def __init__(self, cmd, env=None, input_text=None, stats=None, queue=None):
         super().__init__()
         self.cmd = cmd
         self.env = env or os.environ.copy()
         self.input_text = input_text
+        self.stats = stats
+        self.queue = queue
         self.process = None
 
     def run(self):
@@ -37,25 +48,18 @@ class ProcessReader(QtCore.QThread):
                 buf = b''
                 while True:
                     try:
-                        chunk = os.read(master, 4096)
+                        chunk = os.read(master, self.READ_SIZE)
                     except OSError:
                         break
                     if not chunk:
                         break
                     buf += chunk
-                    while b'\n' in buf:
-                        line, buf = buf.split(b'\n', 1)
-                        try:
-                            decoded = line.decode('utf-8', errors='replace')
-                        except Exception:
-                            decoded = line.decode('latin-1', errors='replace')
-                        self.line_ready.emit(decoded + '\n')
+                    if b'\n' in chunk:
+                        lines = buf.split(b'\n')
+                        buf = lines.pop()
+                        self._emit([self._decode(line) + '\n' for line in lines])
                 if buf:
-                    try:
-                        decoded = buf.decode('utf-8', errors='replace')
-                    except Exception:
-                        decoded = buf.decode('latin-1', errors='replace')
-                    self.line_ready.emit(decoded)
+                    self._emit([self._decode(buf)])
                 try:
                     os.close(master)
                 except Exception:
@@ -80,7 +84,7 @@ class ProcessReader(QtCore.QThread):
             for line in iter(self.process.stdout.readline, ''):
                 if not line:
                     break
-                self.line_ready.emit(line)
+                self._emit([line])
 
             try:
                 if self.process.stdout:
@@ -90,3 +94,19 @@ class ProcessReader(QtCore.QThread):
             self.process.wait()
         finally:
             self.finished.emit()
+
+    def _emit(self, lines):
+        if self.queue is not None:
+            if self.queue.put(lines):
+                self.lines_available.emit()
+            return
+        if self.stats is not None:
+            self.stats.read(len(lines))
+        self.lines_ready.emit(lines)
+
+    @staticmethod
+    def _decode(raw: bytes) -> str:
+        try:
+            return raw.decode('utf-8', errors='replace')
+        except Exception:
+            return raw.decode('latin-1', errors='replace')
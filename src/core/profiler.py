@@ -0,0 +1,118 @@
+"""Per-stage timing and counters for pidcat --profile.
+
+Nothing here runs unless profiling is on: pidcat swaps its stage functions for
+the wrapped versions from wrap()/iterate() only when --profile is given.
+"""
+import sys
+import time
+
+STAGES = ('read', 'parse', 'track', 'filter', 'render', 'write')
+
+
+def _seconds(ns):
+    return ns / 1e9
+
+
+class StageProfiler:
+    """perf_counter_ns accumulators per stage plus named counters, reported to stderr."""
+
+    def __init__(self, interval=10.0, stream=None):
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.elapsed = dict.fromkeys(STAGES, 0)
+        self.counters = {}
+        self.filtered = {}
+        self.started = time.perf_counter()
+        self._next_report = self.started + interval if interval > 0 else None
+        self._last = (self.started, 0)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def count_filtered(self, reason):
+        self.filtered[reason] = self.filtered.get(reason, 0) + 1
+
+    # ── Wrappers ──────────────────────────────────────────────────────────────
+
+    def wrap(self, stage, function, counter=None, amount=None):
+        """function, with its run time added to stage.
+
+        With counter, each call also adds amount(*args, **kwargs) (or 1) to that counter.
+        """
+        elapsed = self.elapsed
+        counters = self.counters
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            if counter:
+                counters[counter] = counters.get(counter, 0) + (amount(*args, **kwargs) if amount else 1)
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed[stage] += clock() - start
+        return timed
+
+    def wrap_filter(self, predicate, checks):
+        """A timed predicate that attributes each rejection to the first failing check.
+
+        checks is a list of (reason, predicate) whose conjunction is predicate.
+        """
+        elapsed = self.elapsed
+        clock = time.perf_counter_ns
+
+        def timed(record):
+            start = clock()
+            passed = predicate(record)
+            elapsed['filter'] += clock() - start
+            if not passed:
+                self.count_filtered(next((reason for reason, check in checks if not check(record)), 'filter'))
+            return passed
+        return timed
+
+    def iterate(self, stage, iterable):
+        """Yields from iterable, adding the time spent waiting for each item to stage.
+
+        Also the point where periodic reports are emitted, since every source
+        passes through here.
+        """
+        elapsed = self.elapsed
+        clock = time.perf_counter_ns
+        iterator = iter(iterable)
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed[stage] += clock() - start
+                return
+            elapsed[stage] += clock() - start
+            if self._next_report is not None and time.perf_counter() >= self._next_report:
+                self.report()
+            yield item
+
+    # ── Reports ───────────────────────────────────────────────────────────────
+
+    def report(self, final=False):
+        now = time.perf_counter()
+        total = now - self.started
+        lines = self.counters.get('lines in', 0)
+        last_time, last_lines = self._last
+        rate = (lines - last_lines) / (now - last_time) if now > last_time else 0.0
+        self._last = (now, lines)
+        if self._next_report is not None:
+            self._next_report = now + self.interval
+
+        filtered = sum(self.filtered.values())
+        head = f"⏱ profile{' (final)' if final else ''} {total:.1f} s: {lines:,} lines in ({rate:,.0f}/s)"
+        for name, value in self.counters.items():
+            if name != 'lines in':
+                head += f', {value:,} {name}'
+        if filtered:
+            reasons = ', '.join(f'{reason} {n:,}' for reason, n in
+                                sorted(self.filtered.items(), key=lambda item: -item[1]))
+            head += f', {filtered:,} filtered ({reasons})'
+        busy = sum(self.elapsed.values()) or 1
+        stages = '  '.join(f'{stage} {_seconds(ns):.2f} s ({ns * 100 / busy:.0f}%)'
+                           for stage, ns in self.elapsed.items())
+        print(head + '\n   ' + stages, file=self.stream, flush=True)
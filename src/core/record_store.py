@@ -0,0 +1,200 @@
+"""Columnar in-memory store of the lines a view shows and their record fields.
+
+Every line lives in typed arrays rather than as Python objects:
+
+  text      UTF-8 bytes of all lines back to back, '\\n'-separated, plus an
+            int64 array of where each line starts
+  level     uint8, the level letter's code (0 for a line without fields)
+  pid, tid  int32 (-1 when empty or not a plain number)
+  ts        int64, the timestamp packed into an integer (negative values
+            refer to interned strings that do not parse as one)
+  tag       uint32 id into a table of interned strings
+  package   uint32 id likewise (0 is '')
+
+That is 34 bytes per line besides the text itself, against several hundred
+for a str plus a tuple of field strings. Lines are evicted from the front;
+the arrays are compacted lazily, so eviction stays amortised O(1).
+
+The contiguous text buffer also lets a literal search run over many lines in
+one regex call (find()).
+"""
+from array import array
+from bisect import bisect_right
+
+# Timestamps pack as ((((month * 32 + day) * 24 + hour) * 60 + minute) * 60 + second)
+# * 1_000_000 + microseconds, times 2, plus 1 when the fraction had 6 digits.
+_SECOND = 2_000_000
+_SECOND_CACHE = 65536
+
+
+def _number(text):
+    """A pid or tid as stored: -1 for '' and for anything that would not read back the same."""
+    if text.isascii() and text.isdigit() and len(text) < 10 and (text[0] != '0' or text == '0'):
+        return int(text)
+    return -1
+
+
+class RecordStore:
+    """Lines with optional (ts, level, tag, pid, tid) fields, by consecutive id."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._text = bytearray()
+        self._starts = array('q', (0,))     # one more than there are lines: the end of the last
+        self._text_base = 0                 # absolute offset of self._text[0]
+        self._level = array('B')
+        self._pid = array('i')
+        self._tid = array('i')
+        self._ts = array('q')
+        self._tag = array('I')
+        self._package = array('I')
+        self._strings = ['']
+        self._ids = {'': 0}
+        self._seconds = {}                  # packed second -> 'MM-DD HH:MM:SS'
+        self._second_ids = {}               # and back
+        self._base = 0                      # id of the first line still in the arrays
+        self.next_id = 0
+
+    def __len__(self):
+        return self.next_id - self._base
+
+    def _intern(self, text):
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self._strings)
+            self._strings.append(text)
+        return string_id
+
+    # ── Adding and evicting ───────────────────────────────────────────────────
+
+    def append(self, text, fields=None, package=''):
+        """Stores a line and, if given, its (ts, level, tag, pid, tid) fields; returns its id."""
+        self._text += text.encode('utf-8', 'surrogateescape')
+        self._text += b'\n'
+        self._starts.append(self._text_base + len(self._text))
+        if fields is None:
+            self._level.append(0)
+            self._pid.append(-1)
+            self._tid.append(-1)
+            self._ts.append(-1)
+            self._tag.append(0)
+        else:
+            ts, level, tag, pid, tid = fields
+            self._level.append(ord(level) if len(level) == 1 and level < '\x80' else ord('?'))
+            self._pid.append(_number(pid))
+            self._tid.append(_number(tid))
+            self._ts.append(self._pack_ts(ts))
+            self._tag.append(self._intern(tag))
+        self._package.append(self._intern(package) if package else 0)
+        line_id = self.next_id
+        self.next_id += 1
+        return line_id
+
+    def evict_before(self, line_id):
+        """Drops the lines below line_id from the arrays once enough of them are dead.
+
+        Returns True when it compacted.
+        """
+        dead = min(line_id, self.next_id) - self._base
+        if dead <= 4096 or dead * 2 <= len(self):
+            return False
+        cut = self._starts[dead]
+        del self._text[:cut - self._text_base]
+        self._text_base = cut
+        for column in (self._starts, self._level, self._pid, self._tid, self._ts, self._tag, self._package):
+            del column[:dead]
+        self._base += dead
+        return True
+
+    # ── Reading ───────────────────────────────────────────────────────────────
+
+    def text(self, line_id):
+        i = line_id - self._base
+        return self._text[self._starts[i] - self._text_base:self._starts[i + 1] - self._text_base - 1].decode(
+            'utf-8', 'surrogateescape')
+
+    def fields(self, line_id):
+        """The (ts, level, tag, pid, tid) stored with a line, or None."""
+        i = line_id - self._base
+        level = self._level[i]
+        if not level:
+            return None
+        pid, tid = self._pid[i], self._tid[i]
+        return (self._unpack_ts(self._ts[i]), chr(level), self._strings[self._tag[i]],
+                str(pid) if pid >= 0 else '', str(tid) if tid >= 0 else '')
+
+    def package(self, line_id):
+        return self._strings[self._package[line_id - self._base]]
+
+    def find(self, regex, start_id, end_id):
+        """Ids in [start_id, end_id) of the lines a bytes regex matches.
+
+        The whole range is scanned in one pass over the text buffer, so the
+        regex must not be able to match a newline.
+        """
+        starts, base, text_base = self._starts, self._base, self._text_base
+        lo, hi = start_id - base, end_id - base
+        if lo >= hi:
+            return []
+        pos, end = starts[lo] - text_base, starts[hi] - text_base
+        ids = []
+        search = regex.search
+        text = self._text
+        m = search(text, pos, end)
+        while m:
+            i = bisect_right(starts, m.start() + text_base, lo, hi) - 1
+            ids.append(i + base)
+            pos = starts[i + 1] - text_base
+            m = search(text, pos, end)
+        return ids
+
+    def nbytes(self):
+        """Bytes held by the arrays and the text buffer (the string table aside)."""
+        columns = (self._starts, self._level, self._pid, self._tid, self._ts, self._tag, self._package)
+        return len(self._text) + sum(column.itemsize * len(column) for column in columns)
+
+    # ── Timestamps ────────────────────────────────────────────────────────────
+
+    def _pack_ts(self, ts):
+        # 'MM-DD HH:MM:SS.mmm' or .mmmmmm; anything else is interned as is.
+        n = len(ts)
+        if (n == 18 or n == 21) and ts[14] == '.':
+            second = self._second_ids.get(ts[:14])
+            if second is None:
+                second = self._parse_second(ts[:14])
+            fraction = ts[15:]
+            if second is not None and fraction.isascii() and fraction.isdigit():
+                return second + (int(fraction) * 2000 if n == 18 else int(fraction) * 2 + 1)
+        return -1 - self._intern(ts)
+
+    def _parse_second(self, prefix):
+        """The packed 'MM-DD HH:MM:SS' (microseconds 0), cached, or None."""
+        if prefix[2] != '-' or prefix[5] != ' ' or prefix[8] != ':' or prefix[11] != ':':
+            return None
+        try:
+            second = (((int(prefix[0:2]) * 32 + int(prefix[3:5])) * 24 + int(prefix[6:8])) * 60
+                      + int(prefix[9:11])) * 60 + int(prefix[12:14])
+        except ValueError:
+            return None
+        if len(self._second_ids) >= _SECOND_CACHE:
+            self._second_ids.clear()
+        packed = self._second_ids[prefix] = second * _SECOND
+        return packed
+
+    def _unpack_ts(self, packed):
+        if packed < 0:
+            return self._strings[-1 - packed]
+        second, rest = divmod(packed, _SECOND)
+        prefix = self._seconds.get(second)
+        if prefix is None:
+            if len(self._seconds) >= _SECOND_CACHE:
+                self._seconds.clear()
+            rest_s, s = divmod(second, 60)
+            rest_s, minute = divmod(rest_s, 60)
+            rest_s, hour = divmod(rest_s, 24)
+            month, day = divmod(rest_s, 32)
+            prefix = self._seconds[second] = '%02d-%02d %02d:%02d:%02d' % (month, day, hour, minute, s)
+        micros, six = divmod(rest, 2)
+        return '%s.%06d' % (prefix, micros) if six else '%s.%03d' % (prefix, micros // 1000)
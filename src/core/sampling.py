@@ -0,0 +1,70 @@
+"""Level-aware sampling for captures too dense to show in full.
+
+Warnings and above are always shown, and so are the first few records of
+every tag, so a new component is never hidden. Past those, V/D/I records of
+each tag are shown one in every N: a fixed N, or one recomputed every second
+of log time to hold a target rate. Every record is still counted per tag, so
+the totals stay exact for what was skipped.
+"""
+from src.core.coalesce import timestamp_ms
+
+ALWAYS_LEVELS = frozenset('WEFA')
+WINDOW_MS = 1000
+
+
+class Sampler:
+    def __init__(self, every=1, target=0, first=20):
+        self.every = max(1, every)
+        self.target = target        # lines/s; 0 keeps every fixed
+        self.first = first
+        self.totals = {}            # tag -> [seen, shown]
+        self._window_start = None
+        self._window_always = 0     # shown regardless of the rate in this window
+        self._window_sampled = 0    # subject to the rate in this window
+
+    def keep(self, record):
+        """Counts a record and returns whether it should be shown."""
+        counts = self.totals.get(record.tag)
+        if counts is None:
+            counts = self.totals[record.tag] = [0, 0]
+        seen = counts[0]
+        counts[0] = seen + 1
+        if self.target:
+            self._advance(record.timestamp)
+        if record.level in ALWAYS_LEVELS or seen < self.first:
+            self._window_always += 1
+            counts[1] += 1
+            return True
+        self._window_sampled += 1
+        if (seen - self.first) % self.every:
+            return False
+        counts[1] += 1
+        return True
+
+    def _advance(self, ts):
+        """Starts a new window once a second of log time has passed, resetting the rate."""
+        ms = timestamp_ms(ts)
+        if ms is None:
+            return
+        if self._window_start is None or ms < self._window_start:
+            self._window_start = ms
+            return
+        if ms - self._window_start < WINDOW_MS:
+            return
+        seconds = (ms - self._window_start) / 1000
+        budget = self.target * seconds - self._window_always
+        sampled = self._window_sampled
+        self.every = max(1, int(-(-sampled // budget))) if budget >= 1 else max(1, sampled)
+        self._window_start = ms
+        self._window_always = self._window_sampled = 0
+
+    def summary(self, top=10):
+        """One line of totals plus the tags with the most skipped records."""
+        seen = sum(counts[0] for counts in self.totals.values())
+        shown = sum(counts[1] for counts in self.totals.values())
+        line = f"⏱ sampling: {shown:,} of {seen:,} lines shown"
+        skipped = sorted(((counts[0] - counts[1], tag, counts[0]) for tag, counts in self.totals.items()
+                          if counts[0] > counts[1]), reverse=True)[:top]
+        if skipped:
+            line += '; most skipped: ' + ', '.join(f'{tag} {n:,} of {total:,}' for n, tag, total in skipped)
+        return line
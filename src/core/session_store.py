@@ -0,0 +1,332 @@
+"""Indexed, compressed on-disk store of captured logcat records.
+
+A store is a directory of append-only segments:
+
+  seg-000001.dat   zlib-compressed blocks of records, back to back
+  seg-000001.idx   one JSON line per block: offset, size, record count,
+                   time range, level mask and the pids/tags it contains
+  seg-000001.sum   the same summary for the whole segment, written on close
+
+Queries first skip whole segments by their summary, then skip blocks by their
+index entry, and only decompress what can contain matching records.
+"""
+import json
+import os
+import re
+import time
+import zlib
+from datetime import datetime
+
+from src.core.logline import LOG_LEVELS, LOG_LEVELS_MAP, LogRecord, tag_in_tags_regex
+
+# Above this many distinct values a summary stops listing them ("may contain anything").
+SUMMARY_LIMIT = 256
+ALL_LEVELS = (1 << len(LOG_LEVELS)) - 1
+SEGMENT_NAME = re.compile(r'^seg-(\d{6})\.dat$')
+QUERY_TIME = re.compile(r'^(?:(\d\d)-(\d\d)[ T])?(\d\d?):(\d\d)(?::(\d\d)(?:\.(\d{1,3}))?)?$')
+
+
+def _escape(text):
+    if '\\' in text or '\t' in text or '\n' in text:
+        return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+    return text
+
+
+_UNESCAPE = re.compile(r'\\(.)')
+_UNESCAPES = {'t': '\t', 'n': '\n', '\\': '\\'}
+
+
+def _unescape(text):
+    if '\\' not in text:
+        return text
+    return _UNESCAPE.sub(lambda m: _UNESCAPES.get(m.group(1), m.group(1)), text)
+
+
+def _level_bit(level):
+    return 1 << LOG_LEVELS_MAP[level] if level in LOG_LEVELS_MAP else ALL_LEVELS
+
+
+def _min_level_mask(min_level):
+    return ALL_LEVELS & ~((1 << min_level) - 1)
+
+
+def format_ms(ms):
+    """Formats epoch milliseconds as a logcat 'MM-DD HH:MM:SS.mmm' timestamp."""
+    return time.strftime('%m-%d %H:%M:%S', time.localtime(ms // 1000)) + '.%03d' % (ms % 1000)
+
+
+class _Summary:
+    """Time range, level mask and pid/tag sets of a block or segment."""
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.count = data.get('n', 0)
+        self.t0 = data.get('t0')
+        self.t1 = data.get('t1')
+        self.levels = data.get('lv', 0)
+        self.pids = set(data['pids']) if data.get('pids') is not None else (set() if not data else None)
+        self.tags = set(data['tags']) if data.get('tags') is not None else (set() if not data else None)
+
+    def add(self, ms, level, pid, tag):
+        self.count += 1
+        self.t0 = ms if self.t0 is None else min(self.t0, ms)
+        self.t1 = ms if self.t1 is None else max(self.t1, ms)
+        self.levels |= _level_bit(level)
+        if self.pids is not None:
+            self.pids.add(pid)
+            if len(self.pids) > SUMMARY_LIMIT:
+                self.pids = None
+        if self.tags is not None:
+            self.tags.add(tag)
+            if len(self.tags) > SUMMARY_LIMIT:
+                self.tags = None
+
+    def merge(self, other):
+        if not other.count:
+            return
+        self.count += other.count
+        self.t0 = other.t0 if self.t0 is None else min(self.t0, other.t0)
+        self.t1 = other.t1 if self.t1 is None else max(self.t1, other.t1)
+        self.levels |= other.levels
+        self.pids = None if self.pids is None or other.pids is None else self.pids | other.pids
+        self.tags = None if self.tags is None or other.tags is None else self.tags | other.tags
+        if self.pids is not None and len(self.pids) > SUMMARY_LIMIT:
+            self.pids = None
+        if self.tags is not None and len(self.tags) > SUMMARY_LIMIT:
+            self.tags = None
+
+    def to_dict(self):
+        return {
+            'n': self.count, 't0': self.t0, 't1': self.t1, 'lv': self.levels,
+            'pids': sorted(self.pids) if self.pids is not None else None,
+            'tags': sorted(self.tags) if self.tags is not None else None,
+        }
+
+    def may_match(self, since, until, level_mask, tags, pids):
+        if not self.count:
+            return False
+        if since is not None and self.t1 < since:
+            return False
+        if until is not None and self.t0 > until:
+            return False
+        if not self.levels & level_mask:
+            return False
+        if pids and self.pids is not None and not self.pids & pids:
+            return False
+        if tags and self.tags is not None and not any(tag_in_tags_regex(t, tags) for t in self.tags):
+            return False
+        return True
+
+
+class _Segment:
+    def __init__(self, directory, number):
+        self.number = number
+        base = os.path.join(directory, 'seg-%06d' % number)
+        self.data_path = base + '.dat'
+        self.index_path = base + '.idx'
+        self.summary_path = base + '.sum'
+        self.summary = _Summary()
+        self.blocks = None  # loaded lazily: list of (offset, length, _Summary)
+
+    def load_summary(self):
+        if os.path.exists(self.summary_path):
+            with open(self.summary_path) as f:
+                self.summary = _Summary(json.load(f))
+        else:
+            self.summary = _Summary()
+            for _, _, block in self.load_blocks():
+                self.summary.merge(block)
+
+    def load_blocks(self):
+        if self.blocks is None:
+            self.blocks = []
+            if os.path.exists(self.index_path):
+                with open(self.index_path) as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self.blocks.append((entry['off'], entry['len'], _Summary(entry)))
+        return self.blocks
+
+
+class SessionStore:
+    """Segmented, append-only record store with block-level indexes.
+
+    Use append()/close() to record a session and query() to read it back; the
+    same directory can be reopened later and appended to.
+    """
+    BLOCK_RECORDS = 2048
+    SEGMENT_BYTES = 32 * 1024 * 1024
+    FLUSH_SECONDS = 5.0     # longest a record waits in memory, so a kill loses seconds at most
+
+    def __init__(self, path, year=None):
+        self.path = path
+        self.year = year or datetime.now().year
+        os.makedirs(path, exist_ok=True)
+        self._segments = []
+        for name in sorted(os.listdir(path)):
+            m = SEGMENT_NAME.match(name)
+            if m:
+                segment = _Segment(path, int(m.group(1)))
+                segment.load_summary()
+                self._segments.append(segment)
+        self._writing = None
+        self._data_file = None
+        self._index_file = None
+        self._pending = []
+        self._pending_summary = _Summary()
+        self._unflushed_since = None    # monotonic time of the oldest record not yet on disk
+        self._ts_cache = {}
+
+    # ── Writing ───────────────────────────────────────────────────────────────
+
+    def _to_ms(self, timestamp):
+        if not timestamp:
+            return int(time.time() * 1000)
+        second, _, frac = timestamp.partition('.')
+        base = self._ts_cache.get(second)
+        if base is None:
+            if len(self._ts_cache) > 4096:
+                self._ts_cache.clear()
+            base = int(datetime.strptime('%d-%s' % (self.year, second), '%Y-%m-%d %H:%M:%S').timestamp() * 1000)
+            self._ts_cache[second] = base
+        return base + int((frac + '00')[:3] or 0)
+
+    def append(self, record):
+        ms = self._to_ms(record.timestamp)
+        self._pending.append('%d\t%s\t%s\t%s\t%s\t%s\n' % (
+            ms, record.level, record.pid, record.tid, _escape(record.tag), _escape(record.message)))
+        self._pending_summary.add(ms, record.level, record.pid, record.tag)
+        if len(self._pending) >= self.BLOCK_RECORDS:
+            self._write_block()
+        self.flush_if_due()
+
+    def _open_segment(self):
+        number = self._segments[-1].number + 1 if self._segments else 1
+        segment = _Segment(self.path, number)
+        segment.blocks = []
+        self._segments.append(segment)
+        self._writing = segment
+        self._data_file = open(segment.data_path, 'ab')
+        self._index_file = open(segment.index_path, 'a')
+
+    def _write_block(self):
+        if not self._pending:
+            return
+        if self._writing is None:
+            self._open_segment()
+        payload = zlib.compress(''.join(self._pending).encode('utf-8'), 6)
+        offset = self._data_file.tell()
+        self._data_file.write(payload)
+        entry = self._pending_summary.to_dict()
+        entry.update(off=offset, len=len(payload))
+        self._index_file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._writing.blocks.append((offset, len(payload), self._pending_summary))
+        self._writing.summary.merge(self._pending_summary)
+        self._pending = []
+        self._pending_summary = _Summary()
+        if offset + len(payload) >= self.SEGMENT_BYTES:
+            self._close_segment()
+
+    def _close_segment(self):
+        if self._writing is None:
+            return
+        self._data_file.close()
+        self._index_file.close()
+        with open(self._writing.summary_path, 'w') as f:
+            json.dump(self._writing.summary.to_dict(), f)
+        self._writing = self._data_file = self._index_file = None
+
+    def flush(self):
+        self._write_block()
+        if self._data_file:
+            self._data_file.flush()
+            self._index_file.flush()
+        self._unflushed_since = None
+
+    def flush_if_due(self):
+        """Writes out a partial block once its oldest record has waited FLUSH_SECONDS."""
+        now = time.monotonic()
+        if self._unflushed_since is None:
+            if self._pending:
+                self._unflushed_since = now
+        elif now - self._unflushed_since >= self.FLUSH_SECONDS:
+            self.flush()
+
+    def close(self):
+        self._write_block()
+        self._close_segment()
+        self._unflushed_since = None
+
+    # ── Reading ───────────────────────────────────────────────────────────────
+
+    @property
+    def time_range(self):
+        """(first, last) epoch ms of everything in the store, or (None, None)."""
+        total = _Summary()
+        for segment in self._segments:
+            total.merge(segment.summary)
+        return total.t0, total.t1
+
+    def parse_time(self, text, end=False):
+        """Parses 'HH:MM[:SS[.mmm]]' or 'MM-DD HH:MM[:SS]' into epoch ms.
+
+        A bare time of day refers to the day of the last record in the store,
+        and a date without a year to that record's year.
+        With end=True an unspecified seconds field means the end of that minute.
+        """
+        m = QUERY_TIME.match(text.strip())
+        if not m:
+            raise ValueError(f'invalid time {text!r}, expected HH:MM[:SS] or MM-DD HH:MM[:SS]')
+        month, day, hour, minute, second, frac = m.groups()
+        last = self.time_range[1]
+        date = datetime.fromtimestamp(last / 1000) if last is not None else datetime.now()
+        if month:
+            date = datetime(date.year, int(month), int(day))
+        ms = int(date.replace(hour=int(hour), minute=int(minute), second=int(second or 0),
+                              microsecond=0).timestamp() * 1000)
+        if frac:
+            ms += int((frac + '00')[:3])
+        elif end:
+            ms += 59999 if second is None else 999
+        return ms
+
+    def query(self, since=None, until=None, min_level=0, tags=None, pids=None):
+        """Yields the LogRecords matching every given filter, in storage order.
+
+        since/until are epoch ms (inclusive), tags are regexes as for pidcat -t.
+        """
+        self.flush()
+        level_mask = _min_level_mask(min_level)
+        pids = set(pids) if pids else None
+        for segment in self._segments:
+            if not segment.summary.may_match(since, until, level_mask, tags, pids):
+                continue
+            blocks = [b for b in segment.load_blocks() if b[2].may_match(since, until, level_mask, tags, pids)]
+            if not blocks:
+                continue
+            with open(segment.data_path, 'rb') as f:
+                for offset, length, _ in blocks:
+                    f.seek(offset)
+                    text = zlib.decompress(f.read(length)).decode('utf-8', errors='replace')
+                    yield from self._filter_block(text, since, until, level_mask, tags, pids)
+
+    @staticmethod
+    def _filter_block(text, since, until, level_mask, tags, pids):
+        for line in text.split('\n'):
+            if not line:
+                continue
+            ms, level, pid, tid, tag, message = line.split('\t', 5)
+            ms = int(ms)
+            if since is not None and ms < since:
+                continue
+            if until is not None and ms > until:
+                continue
+            if not _level_bit(level) & level_mask:
+                continue
+            if pids and pid not in pids:
+                continue
+            tag = _unescape(tag)
+            if tags and not tag_in_tags_regex(tag, tags):
+                continue
+            yield LogRecord(format_ms(ms), level, tag, pid, tid, _unescape(message))
@@ -6,7 +6,21 @@ SETTINGS_FILE = Path.home() / ".fadcat_settings.json"
 DEFAULT_SETTINGS = {
     "packages": ["com.fadcam.beta", "com.android.systemui"],
     "default_package": "com.fadcam.beta",
-    "theme": "dark"
+    "theme": "dark",
+    "backlog": "dump",
+    "backlog_lines": 0,
+    "record_sessions": False,
+    "sessions_dir": str(Path.home() / ".fadcat_sessions"),
+    "scrollback_lines": 1_000_000,
+    "dedup": "exact",
+    "dedup_tags": "",
+    "overload_policy": "drop",
+    "queue_lines": 50_000,
+    "sample_target": 0,
+    "flight_minutes": 0,
+    "watchlist": [],
+    "watch_alert_interval": 30,
+    "highlight_rules": []
 }
 
 class SettingsManager:
@@ -54,6 +68,132 @@ class Settings:
     def default_package(self, value: str):
         self._data["default_package"] = value
     
+    @property
+    def backlog(self) -> str:
+        return self._data.get("backlog", "dump")
+
+    @backlog.setter
+    def backlog(self, value: str):
+        self._data["backlog"] = value
+
+    @property
+    def backlog_lines(self) -> int:
+        return int(self._data.get("backlog_lines", 0))
+
+    @backlog_lines.setter
+    def backlog_lines(self, value: int):
+        self._data["backlog_lines"] = value
+
+    @property
+    def record_sessions(self) -> bool:
+        return bool(self._data.get("record_sessions", False))
+
+    @record_sessions.setter
+    def record_sessions(self, value: bool):
+        self._data["record_sessions"] = value
+
+    @property
+    def sessions_dir(self) -> str:
+        return self._data.get("sessions_dir", DEFAULT_SETTINGS["sessions_dir"])
+
+    @sessions_dir.setter
+    def sessions_dir(self, value: str):
+        self._data["sessions_dir"] = value
+
+    @property
+    def scrollback_lines(self) -> int:
+        return int(self._data.get("scrollback_lines", DEFAULT_SETTINGS["scrollback_lines"]))
+
+    @scrollback_lines.setter
+    def scrollback_lines(self, value: int):
+        self._data["scrollback_lines"] = value
+
+    @property
+    def dedup(self) -> str:
+        """How repeated lines are folded: 'off', 'exact' or 'masked' (numbers ignored)."""
+        return self._data.get("dedup", DEFAULT_SETTINGS["dedup"])
+
+    @dedup.setter
+    def dedup(self, value: str):
+        self._data["dedup"] = value
+
+    @property
+    def dedup_tags(self) -> str:
+        """Per-tag overrides of dedup, as 'Tag=mode, Tag=mode'."""
+        return self._data.get("dedup_tags", "")
+
+    @dedup_tags.setter
+    def dedup_tags(self, value: str):
+        self._data["dedup_tags"] = value
+
+    @property
+    def overload_policy(self) -> str:
+        """What a tab does when lines arrive faster than it shows them: 'block', 'drop' or 'sample'."""
+        return self._data.get("overload_policy", DEFAULT_SETTINGS["overload_policy"])
+
+    @overload_policy.setter
+    def overload_policy(self, value: str):
+        self._data["overload_policy"] = value
+
+    @property
+    def queue_lines(self) -> int:
+        """Lines a tab holds between reading and showing before the overload policy applies."""
+        return int(self._data.get("queue_lines", DEFAULT_SETTINGS["queue_lines"]))
+
+    @queue_lines.setter
+    def queue_lines(self, value: int):
+        self._data["queue_lines"] = value
+
+    @property
+    def sample_target(self) -> int:
+        """Lines/s pidcat samples V/D/I lines down to; 0 shows everything."""
+        return int(self._data.get("sample_target", DEFAULT_SETTINGS["sample_target"]))
+
+    @sample_target.setter
+    def sample_target(self, value: int):
+        self._data["sample_target"] = value
+
+    @property
+    def flight_minutes(self) -> int:
+        """Minutes a capture keeps in memory in flight recorder mode; 0 shows the log as usual."""
+        return int(self._data.get("flight_minutes", DEFAULT_SETTINGS["flight_minutes"]))
+
+    @flight_minutes.setter
+    def flight_minutes(self, value: int):
+        self._data["flight_minutes"] = value
+
+    @property
+    def watchlist(self) -> list[str]:
+        """Watchlist rules, one per entry (see src.core.watchlist for the syntax)."""
+        return self._data.get("watchlist", [])
+
+    @watchlist.setter
+    def watchlist(self, value: list[str]):
+        self._data["watchlist"] = value
+
+    @property
+    def watch_alert_interval(self) -> int:
+        """Least seconds between two notifications of one watchlist rule."""
+        return int(self._data.get("watch_alert_interval", DEFAULT_SETTINGS["watch_alert_interval"]))
+
+    @watch_alert_interval.setter
+    def watch_alert_interval(self, value: int):
+        self._data["watch_alert_interval"] = value
+
+    @property
+    def highlight_rules(self) -> list[str]:
+        """STYLE=REGEX highlight rules (see src.core.highlight)."""
+        return self._data.get("highlight_rules", [])
+
+    @highlight_rules.setter
+    def highlight_rules(self, value: list[str]):
+        self._data["highlight_rules"] = value
+
+    @property
+    def flights_dir(self) -> str:
+        """Where flight recorder dumps are written."""
+        return str(Path(self.sessions_dir) / "flights")
+
     def save(self):
         SettingsManager.save(self._data)
 
@@ -0,0 +1,322 @@
+"""Input sources that feed logcat lines into pidcat's pipeline."""
+import gzip
+import io
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+import zipfile
+from datetime import datetime
+from subprocess import PIPE
+
+from src.core.logline import line_timestamp, threadtime
+
+
+class StreamGap:
+    """Yielded by a source in place of a line when the stream was lost and resumed."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+
+class Backlog:
+    """Yielded once by a source with the device's buffered history, to be ingested as one batch."""
+
+    def __init__(self, lines, elapsed):
+        self.lines = lines
+        self.elapsed = elapsed
+
+
+class Idle:
+    """Yielded by with_idle_ticks() when its source has been quiet for a while."""
+
+
+class SectionMarker:
+    """Yielded by a source when a new named section of its input begins."""
+
+    def __init__(self, title):
+        self.title = title
+
+
+def with_idle_ticks(source, seconds):
+    """Iterates source on a helper thread, yielding Idle whenever nothing arrives for seconds.
+
+    Lets a consumer that holds items back (see coalesce.Coalescer) release them
+    while a live stream is quiet.
+    """
+    items = queue.SimpleQueue()
+    done = object()
+    failure = []
+
+    def pump():
+        try:
+            for item in source:
+                items.put(item)
+        except Exception as e:
+            failure.append(e)
+        finally:
+            items.put(done)
+
+    threading.Thread(target=pump, name='source', daemon=True).start()
+    idle = Idle()
+    while True:
+        try:
+            item = items.get(timeout=seconds)
+        except queue.Empty:
+            yield idle
+            continue
+        if item is done:
+            if failure:
+                raise failure[0]
+            return
+        yield item
+
+
+class AdbLogcatSource:
+    """Follows `adb logcat -v threadtime`, surviving cable blips and adbd restarts.
+
+    When the stream hits EOF we wait for the device to come back and resume with
+    `-T <last timestamp>`. Lines logcat replays from that boundary are dropped so
+    the consumer sees each line once, preceded by a single StreamGap marker.
+
+    The device's existing buffer is handled by `backlog`:
+      'dump'   - fetch it in bulk with `logcat -d` (or `-t N`), yield it as one
+                 Backlog batch, then follow from its last timestamp
+      'stream' - let the live stream replay it line by line
+      'none'   - skip it and follow from the device's current time
+    """
+    MAX_FAILED_RESUMES = 5
+    BACKLOG_MODES = ('dump', 'stream', 'none')
+
+    def __init__(self, base_adb_command, reconnect=True, backlog='stream', backlog_lines=0):
+        self.base_adb_command = list(base_adb_command)
+        self.reconnect = reconnect
+        self.backlog = backlog
+        self.backlog_lines = backlog_lines
+        self.started_at = None
+        self.first_live_after = None
+        self.process = None
+        self._closed = False
+        self._last_ts = ''
+        self._boundary = set()
+
+    def logcat_command(self, *extra):
+        return self.base_adb_command + ['logcat', '-v', 'threadtime'] + list(extra)
+
+    def close(self):
+        self._closed = True
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.terminate()
+            except OSError:
+                pass
+
+    def _remember(self, ts, line):
+        if ts != self._last_ts:
+            self._last_ts = ts
+            self._boundary = set()
+        self._boundary.add(line)
+
+    def _is_replayed(self, ts, line):
+        return ts < self._last_ts or (ts == self._last_ts and line in self._boundary)
+
+    def _follow(self, *extra):
+        """Yields lines from one logcat process until it exits."""
+        self.process = subprocess.Popen(self.logcat_command(*extra), stdout=PIPE, text=True, errors='replace')
+        try:
+            for line in self.process.stdout:
+                yield line
+        finally:
+            try:
+                self.process.stdout.close()
+            except OSError:
+                pass
+            self.process.wait()
+
+    def _follow_after(self):
+        """Follows from the last seen timestamp, dropping lines already emitted."""
+        replaying = bool(self._last_ts)
+        for line in self._follow(*(['-T', self._last_ts] if self._last_ts else [])):
+            ts = line_timestamp(line)
+            if replaying:
+                if not ts or self._is_replayed(ts, line):
+                    continue
+                replaying = False
+            if ts:
+                self._remember(ts, line)
+            yield line
+
+    def _dump(self):
+        """Reads the buffered history in one call."""
+        extra = ['-t', str(self.backlog_lines)] if self.backlog_lines > 0 else ['-d']
+        result = subprocess.run(self.logcat_command(*extra), stdout=PIPE, stdin=subprocess.DEVNULL, text=True, errors='replace')
+        lines = result.stdout.splitlines()
+        for line in lines:
+            ts = line_timestamp(line)
+            if ts:
+                self._remember(ts, line)
+        return lines
+
+    def _device_time(self):
+        try:
+            result = subprocess.run(self.base_adb_command + ['shell', 'date', '+%m-%d %H:%M:%S'],
+                                    stdout=PIPE, stdin=subprocess.DEVNULL, text=True, timeout=5)
+        except subprocess.TimeoutExpired:
+            return ''
+        stamp = result.stdout.strip() + '.000'
+        return stamp if line_timestamp(stamp) == stamp else ''
+
+    def _resume(self):
+        """Yields the remaining lines of a stream, resuming after losses."""
+        failures = 0
+        while self.reconnect and not self._closed:
+            lost_at = time.monotonic()
+            subprocess.run(self.base_adb_command + ['wait-for-device'], stdin=subprocess.DEVNULL)
+            if self._closed:
+                return
+            gap = StreamGap(time.monotonic() - lost_at)
+            received = False
+            for line in self._follow_after():
+                if gap:
+                    yield gap
+                    gap = None
+                received = True
+                yield line
+            if received:
+                failures = 0
+            else:
+                failures += 1
+                if failures >= self.MAX_FAILED_RESUMES:
+                    return
+                time.sleep(1)
+
+    def __iter__(self):
+        self.started_at = time.perf_counter()
+        if self.backlog == 'dump':
+            lines = self._dump()
+            if lines:
+                yield Backlog(lines, time.perf_counter() - self.started_at)
+        elif self.backlog == 'none':
+            self._last_ts = self._device_time()
+        for line in self._follow_after():
+            if self.first_live_after is None:
+                self.first_live_after = time.perf_counter() - self.started_at
+            yield line
+        yield from self._resume()
+
+
+DUMPSTATE_SECTION = re.compile(r'^------ (.*?) ------$')
+DUMPSTATE_DURATION = re.compile(r"^[\d.]+s was the duration of '.*'$")
+
+
+class BugreportSource:
+    """Streams the logcat sections out of an `adb bugreport` zip (or its .txt).
+
+    The main dumpstate entry is read straight from the archive without being
+    extracted, and only lines inside the wanted sections are yielded, so memory
+    stays bounded regardless of the report size.
+    """
+    DEFAULT_SECTIONS = ('SYSTEM LOG', 'EVENT LOG', 'CRASH LOG')
+
+    def __init__(self, path, sections=None):
+        self.path = path
+        self.sections = [s.upper() for s in (sections or self.DEFAULT_SECTIONS)]
+
+    @staticmethod
+    def main_entry(zf):
+        """Returns the name of the dumpstate text inside a bugreport zip."""
+        names = zf.namelist()
+        if 'main_entry.txt' in names:
+            name = zf.read('main_entry.txt').decode('utf-8', errors='replace').strip()
+            if name in names:
+                return name
+        candidates = [i for i in zf.infolist() if i.filename.endswith('.txt') and '/' not in i.filename]
+        reports = [i for i in candidates if i.filename.startswith('bugreport')]
+        pool = reports or candidates
+        if not pool:
+            raise ValueError(f'{zf.filename}: no bugreport text entry found')
+        return max(pool, key=lambda i: i.file_size).filename
+
+    def _wanted(self, title):
+        title = re.sub(r'\s*\(.*\)$', '', title).upper()
+        return any(title.startswith(s) for s in self.sections)
+
+    def _scan(self, stream):
+        in_section = False
+        for line in stream:
+            header = DUMPSTATE_SECTION.match(line.rstrip('\r\n'))
+            if header:
+                title = header.group(1)
+                if DUMPSTATE_DURATION.match(title):
+                    in_section = False
+                    continue
+                in_section = self._wanted(title)
+                if in_section:
+                    yield SectionMarker(re.sub(r'\s*\(.*\)$', '', title))
+                continue
+            if in_section:
+                yield line
+
+    def __iter__(self):
+        if zipfile.is_zipfile(self.path):
+            with zipfile.ZipFile(self.path) as zf:
+                with zf.open(self.main_entry(zf)) as raw:
+                    yield from self._scan(io.TextIOWrapper(raw, encoding='utf-8', errors='replace'))
+        else:
+            with open(self.path, encoding='utf-8', errors='replace') as f:
+                yield from self._scan(f)
+
+
+class ReplaySource:
+    """Re-emits a recorded capture with its original timing, for reproducing load offline.
+
+    path is a saved logcat file or a session store directory (pidcat --store).
+    Gaps between line timestamps are divided by speed; speed 0 replays as fast
+    as possible. Lines without a timestamp go out immediately after the previous
+    one, and timestamps going backwards (interleaved buffers) don't wait.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self._seconds = {}
+
+    def _timestamp_seconds(self, ts):
+        second, _, frac = ts.partition('.')
+        base = self._seconds.get(second)
+        if base is None:
+            if len(self._seconds) > 4096:
+                self._seconds.clear()
+            # Any leap year will do: only differences are used.
+            base = datetime.strptime('2000-' + second, '%Y-%m-%d %H:%M:%S').timestamp()
+            self._seconds[second] = base
+        return base + int((frac + '00')[:3] or 0) / 1000
+
+    def _lines(self):
+        if os.path.isdir(self.path):
+            from src.core.session_store import SessionStore
+            for r in SessionStore(self.path).query():
+                yield threadtime(r)
+        else:
+            # Flight recorder dumps are gzip-compressed.
+            opener = gzip.open if self.path.endswith('.gz') else open
+            with opener(self.path, 'rt', encoding='utf-8', errors='replace') as f:
+                yield from f
+
+    def __iter__(self):
+        if self.speed <= 0:
+            yield from self._lines()
+            return
+        first = started = None
+        for line in self._lines():
+            ts = line_timestamp(line)
+            if ts:
+                at = self._timestamp_seconds(ts)
+                if first is None:
+                    first, started = at, time.monotonic()
+                delay = started + (at - first) / self.speed - time.monotonic()
+                if delay > 0.001:
+                    time.sleep(delay)
+            yield line
@@ -0,0 +1,214 @@
+"""Incrementally maintained trigram index for fast search over long sessions.
+
+Lines get consecutive ids as they are added and can be evicted from the front;
+their text and record fields live in a columnar RecordStore. Posting lists map
+each lowercased trigram to the chunks (runs of CHUNK_LINES lines) containing
+it, which keeps the index a fraction of the text size. A query intersects the
+postings of its trigrams to find candidate chunks and then verifies only their
+lines with a substring or regex match. Plain-text queries are verified over
+whole runs of candidate chunks at once, in the store's contiguous text buffer.
+"""
+import re
+from array import array
+from bisect import bisect_left
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from src.core.record_store import RecordStore
+
+CHUNK_LINES = 32
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern, flags=0):
+    """Returns literal substrings every match of a regex must contain.
+
+    Only the top-level sequence is inspected; alternations, classes and optional
+    parts simply end a literal run. An empty list means "no usable literal".
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return []
+    literals = []
+    run = []
+    for op, arg in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+        if run:
+            literals.append(''.join(run))
+            run = []
+        if op is sre_parse.MAX_REPEAT or op is sre_parse.MIN_REPEAT:
+            low, _, sub = arg
+            if low >= 1 and len(sub) == 1 and sub[0][0] is sre_parse.LITERAL:
+                run.append(chr(sub[0][1]))
+        elif op is sre_parse.SUBPATTERN:
+            literals.extend(required_literals_from(arg[-1]))
+    if run:
+        literals.append(''.join(run))
+    return [l for l in literals if len(l) >= 3]
+
+
+def required_literals_from(subpattern):
+    literals = []
+    run = []
+    for op, arg in subpattern:
+        if op is sre_parse.LITERAL:
+            run.append(chr(arg))
+        else:
+            if run:
+                literals.append(''.join(run))
+            run = []
+    if run:
+        literals.append(''.join(run))
+    return literals
+
+
+class TrigramIndex:
+    """Trigram posting index over a growing, front-evicted sequence of lines."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._store = RecordStore()
+        self.first_id = 0       # oldest live id (everything below is evicted)
+        self.next_id = 0
+        self._postings = {}
+
+    def __len__(self):
+        return self.next_id - self.first_id
+
+    def text(self, line_id):
+        return self._store.text(line_id)
+
+    def data(self, line_id):
+        """The (ts, level, tag, pid, tid) stored with a line by add(), or None."""
+        return self._store.fields(line_id)
+
+    def package(self, line_id):
+        """The package stored with a line by add(), or ''."""
+        return self._store.package(line_id)
+
+    def nbytes(self):
+        """Bytes held by the stored lines, postings aside."""
+        return self._store.nbytes()
+
+    # ── Maintenance ───────────────────────────────────────────────────────────
+
+    def add(self, text, data=None, package=''):
+        """Indexes one line, keeping its (ts, level, tag, pid, tid) and package, and returns its id."""
+        line_id = self._store.append(text, data, package)
+        self.next_id = line_id + 1
+        chunk = line_id // CHUNK_LINES
+        postings = self._postings
+        for gram in _trigrams(text.lower()):
+            p = postings.get(gram)
+            if p is None:
+                postings[gram] = array('i', (chunk,))
+            elif p[-1] != chunk:
+                p.append(chunk)
+        return line_id
+
+    def evict_before(self, line_id):
+        """Forgets every line with an id below line_id."""
+        if line_id <= self.first_id:
+            return
+        self.first_id = min(line_id, self.next_id)
+        if self._store.evict_before(self.first_id):
+            self._prune_postings()
+
+    def _prune_postings(self):
+        first_chunk = self.first_id // CHUNK_LINES
+        for gram in list(self._postings):
+            p = self._postings[gram]
+            if p[-1] < first_chunk:
+                del self._postings[gram]
+            elif p[0] < first_chunk:
+                del p[:bisect_left(p, first_chunk)]
+
+    # ── Search ────────────────────────────────────────────────────────────────
+
+    def _candidate_chunks(self, literals, first_chunk):
+        """Chunks that may contain all literals, or None if the index can't narrow it."""
+        grams = set()
+        for literal in literals:
+            grams |= _trigrams(literal.lower())
+        if not grams:
+            return None
+        lists = []
+        for gram in grams:
+            p = self._postings.get(gram)
+            if p is None:
+                return []
+            lists.append(p)
+        lists.sort(key=len)
+        candidates = lists[0][bisect_left(lists[0], first_chunk):]
+        for p in lists[1:]:
+            if not candidates:
+                break
+            if len(candidates) * 16 < len(p):
+                candidates = [c for c in candidates if self._contains(p, c)]
+            else:
+                members = set(p)
+                candidates = [c for c in candidates if c in members]
+        return candidates
+
+    @staticmethod
+    def _contains(p, value):
+        i = bisect_left(p, value)
+        return i < len(p) and p[i] == value
+
+    def search(self, query, case_sensitive=False, regex=False, start_id=None):
+        """Returns the ascending ids of live lines matching query.
+
+        With start_id only lines from that id on are searched, which lets callers
+        extend a previous result as new lines stream in.
+        """
+        if not query:
+            return []
+        start = max(self.first_id, start_id or 0)
+        scan = None
+        if regex:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            try:
+                matcher = re.compile(query, flags)
+            except re.error:
+                return []
+            literals = required_literals(query, flags)
+            test = lambda text: matcher.search(text) is not None
+        else:
+            literals = [query]
+            if case_sensitive:
+                test = lambda text: query in text
+            else:
+                needle = query.lower()
+                test = lambda text: needle in text.lower()
+            if '\n' not in query and (case_sensitive or query.isascii()):
+                # Bytes only fold ASCII case, so other case-insensitive needles go line by line.
+                scan = re.compile(re.escape(query.encode('utf-8', 'surrogateescape')),
+                                  0 if case_sensitive else re.IGNORECASE)
+
+        chunks = self._candidate_chunks(literals, start // CHUNK_LINES) if literals else None
+        if chunks is None:
+            ranges = [(start, self.next_id)] if start < self.next_id else []
+        else:
+            ranges = []
+            for c in chunks:
+                lo, hi = max(c * CHUNK_LINES, start), min((c + 1) * CHUNK_LINES, self.next_id)
+                if ranges and ranges[-1][1] == lo:
+                    ranges[-1] = (ranges[-1][0], hi)
+                elif lo < hi:
+                    ranges.append((lo, hi))
+        store = self._store
+        if scan is not None:
+            return [i for lo, hi in ranges for i in store.find(scan, lo, hi)]
+        text = store.text
+        return [i for lo, hi in ranges for i in range(lo, hi) if test(text(i))]
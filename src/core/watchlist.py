@@ -0,0 +1,208 @@
+"""Watchlist: keywords and patterns looked for in every message in one pass.
+
+One rule per line:
+  E_TIMEOUT            a keyword, matched case-insensitively anywhere in a message
+  /HTTP [45]\\d\\d/      a regex; /.../i ignores case
+  !sqlite_busy         a leading ! also raises an alert on a hit
+  # ...                comments and blank lines are skipped
+
+All keywords go into one Aho-Corasick automaton (pyahocorasick when it is
+installed, a pure-Python one otherwise) and all regexes into one pattern of
+optional lookaheads, one named group per rule, so a message is scanned at
+most twice however long the list is and every rule that matches is seen,
+even where its match overlaps another's. Each rule counts the messages it
+hit; its alerts are rate-limited.
+"""
+import re
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+ALERT_INTERVAL = 30.0   # seconds between two alerts of one rule
+# Group numbers shift inside the combined alternation.
+NUMBERED_BACKREFERENCE = re.compile(r'\\(?:[1-9]|g<\d)')
+
+
+class WatchRule:
+    """One watchlist entry and its hits."""
+    __slots__ = ('text', 'pattern', 'regex', 'alert', 'hits', 'last', 'last_alert', 'reported', 'reported_at')
+
+    def __init__(self, text, pattern, regex, alert):
+        self.text = text            # the line it was parsed from
+        self.pattern = pattern      # lowercased keyword, or regex source
+        self.regex = regex          # compiled regex, or None for a keyword
+        self.alert = alert
+        self.hits = 0
+        self.last = None            # latest record hit
+        self.last_alert = None
+        self.reported = 0           # hits last reported to the GUI
+        self.reported_at = 0.0
+
+
+def parse_rule(line):
+    """The WatchRule a watchlist line describes, or None for blank and comment lines.
+
+    Raises ValueError for a regex that does not compile.
+    """
+    text = line.strip()
+    if not text or text.startswith('#'):
+        return None
+    body = text
+    alert = body.startswith('!')
+    if alert:
+        body = body[1:].lstrip()
+    if len(body) > 2 and body.startswith('/') and (body.endswith('/') or body.endswith('/i')):
+        ignore_case = body.endswith('/i')
+        source = body[1:-2] if ignore_case else body[1:-1]
+        try:
+            regex = re.compile(source, re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            raise ValueError(f'{text}: {e}') from None
+        # Scoped flags keep the rule's case handling inside the combined alternation.
+        return WatchRule(text, f'(?i:{source})' if ignore_case else source, regex, alert)
+    if body.startswith('\\'):
+        body = body[1:]             # \!word and \/word are keywords
+    return WatchRule(text, body.lower(), None, alert) if body else None
+
+
+def parse_rules(lines):
+    """WatchRules for watchlist lines, in order."""
+    return [rule for rule in map(parse_rule, lines) if rule is not None]
+
+
+class _Automaton:
+    """Pure-Python Aho-Corasick with the bits of the pyahocorasick API used here."""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+    def add_word(self, word, value):
+        goto = self._goto
+        node = 0
+        for ch in word:
+            child = goto[node].get(ch)
+            if child is None:
+                child = goto[node][ch] = len(goto)
+                goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = child
+        self._out[node] = (value,)
+
+    def make_automaton(self):
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(ch, 0)
+                out[child] += out[fail[child]]
+                queue.append(child)
+
+    def iter(self, text):
+        """(end index, value) for every keyword occurrence, overlapping ones included."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for value in out[node]:
+                yield i, value
+
+
+class Watchlist:
+    """Rules compiled for scanning; scan() finds the hits of one message."""
+
+    def __init__(self, rules, alert_interval=ALERT_INTERVAL):
+        self.rules = rules
+        self.alert_interval = alert_interval
+        self._keywords = None
+        self._regex = None
+        self._regex_rules = []
+        self._groups = []       # (rule index, its group number in self._regex)
+        keywords = {}
+        for index, rule in enumerate(rules):
+            if rule.regex is None:
+                keywords.setdefault(rule.pattern, []).append(index)
+            else:
+                self._regex_rules.append(index)
+        if keywords:
+            self._keywords = ahocorasick.Automaton() if ahocorasick else _Automaton()
+            for word, indexes in keywords.items():
+                self._keywords.add_word(word, (len(word), tuple(indexes)))
+            self._keywords.make_automaton()
+        if self._regex_rules and not any(NUMBERED_BACKREFERENCE.search(rules[index].pattern)
+                                         for index in self._regex_rules):
+            patterns = [rules[index].pattern for index in self._regex_rules]
+            try:
+                # At each place some rule matches, every rule is tried there
+                # in a lookahead of its own, so no rule hides another's hit.
+                self._regex = re.compile('(?=%s)%s' % ('|'.join(patterns), ''.join(
+                    f'(?:(?=(?P<w{index}>{pattern})))?' for index, pattern in zip(self._regex_rules, patterns))))
+            except re.error:
+                # Global flags or clashing group names do not survive the
+                # combined pattern; such lists fall back to one search per regex.
+                self._regex = None
+            else:
+                self._groups = [(index, self._regex.groupindex[f'w{index}']) for index in self._regex_rules]
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def scan(self, message):
+        """Hit spans of a message as (start, end, rule index), in no particular order."""
+        spans = []
+        if self._keywords is not None:
+            for end, (length, indexes) in self._keywords.iter(message.lower()):
+                for index in indexes:
+                    spans.append((end + 1 - length, end + 1, index))
+        if self._regex is not None:
+            # A rule's lookahead matches again at every place inside its own
+            # match; like finditer, only non-overlapping matches of one rule count.
+            ends = {}
+            for m in self._regex.finditer(message):
+                for index, group in self._groups:
+                    start, end = m.span(group)
+                    if end > start and start >= ends.get(index, 0):
+                        ends[index] = end
+                        spans.append((start, end, index))
+        elif self._regex_rules:
+            rules = self.rules
+            for index in self._regex_rules:
+                spans.extend((m.start(), m.end(), index) for m in rules[index].regex.finditer(message)
+                             if m.end() > m.start())
+        return spans
+
+    def count(self, spans, record, now):
+        """Counts one hit of record per rule in spans.
+
+        Returns (indexes of the rules hit, indexes of those whose alert is due).
+        """
+        hit = {index for _, _, index in spans}
+        due = []
+        rules = self.rules
+        for index in hit:
+            rule = rules[index]
+            rule.hits += 1
+            rule.last = record
+            if rule.alert and (rule.last_alert is None or now - rule.last_alert >= self.alert_interval):
+                rule.last_alert = now
+                due.append(index)
+        return hit, due
+
+    def summary(self):
+        """The rules with hits, most hits first, as printable lines."""
+        hit = sorted((rule for rule in self.rules if rule.hits), key=lambda rule: -rule.hits)
+        lines = [f"👁 watchlist: {len(hit):,} of {len(self.rules):,} rules hit"]
+        for rule in hit:
+            lines.append(f"   ×{rule.hits:<6,} {rule.text}")
+        return lines
@@ -0,0 +1,114 @@
+"""Diagnostics dock — per-tab ingest rate, queue depth, memory and append cost."""
+from __future__ import annotations
+
+import os
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QLabel,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+)
+
+from src.ui import theme
+
+COLUMNS = (
+    ("Tab", "Tab title"),
+    ("Lines/s", "Lines appended to the view per second"),
+    ("Queue", "Lines read from pidcat but not yet in the view"),
+    ("In view", "Lines currently held in scrollback"),
+    ("Text MB", "Scrollback text size (UTF-16), before formatting and layout"),
+    ("Append ms", "Average / worst time of one batch append on the UI thread"),
+    ("UI load", "Share of UI-thread time spent appending for this tab"),
+    ("Slow frames", "Appends that took longer than one 60 Hz frame"),
+    ("Evicted", "Lines discarded from the front of the scrollback"),
+    ("Dropped", "Lines discarded before reaching the view"),
+)
+
+# A tab over either threshold is marked as the one bogging the app down.
+QUEUE_WARN = 20_000
+LOAD_WARN = 0.5
+
+
+def _rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class DiagnosticsPanel(QDockWidget):
+    """Snapshots every tab's IngestStats once a second while visible."""
+
+    def __init__(self, tabs, parent=None):
+        super().__init__("Diagnostics", parent)
+        self.setObjectName("diagnostics")
+        self._tabs = tabs   # callable returning [(title, LogcatTab)]
+
+        body = QWidget()
+        layout = QVBoxLayout(body)
+        layout.setContentsMargins(8, 6, 8, 6)
+        layout.setSpacing(4)
+
+        self.lbl_process = QLabel("")
+        self.lbl_process.setStyleSheet(f"color: {theme.TEXT_MUTED}; font-size: 11px;")
+        layout.addWidget(self.lbl_process)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table.verticalHeader().setVisible(False)
+        for col, (title, tip) in enumerate(COLUMNS):
+            item = QTableWidgetItem(title)
+            item.setToolTip(tip)
+            self.table.setHorizontalHeaderItem(col, item)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+        self.setWidget(body)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._on_visibility_changed)
+
+    def _on_visibility_changed(self, visible: bool):
+        if visible:
+            self.refresh()
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    def refresh(self):
+        rows = [(title, tab.stats.snapshot()) for title, tab in self._tabs()]
+        self.table.setRowCount(len(rows))
+        total_rate = 0.0
+        for row, (title, s) in enumerate(rows):
+            total_rate += s["lines_per_s"]
+            cells = (
+                title,
+                f"{s['lines_per_s']:,.0f}",
+                f"{s['queue']:,}",
+                f"{s['lines_in_view']:,}",
+                f"{s['view_mb']:,.1f}",
+                f"{s['append_ms']:.1f} / {s['append_max_ms']:.1f}",
+                f"{s['ui_load']:.0%}",
+                f"{s['slow_frames']:,}",
+                f"{s['evicted']:,}",
+                f"{s['dropped']:,}",
+            )
+            hot = s["queue"] > QUEUE_WARN or s["ui_load"] > LOAD_WARN
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if col:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if hot:
+                    item.setForeground(QColor(theme.ACCENT))
+                self.table.setItem(row, col, item)
+
+        summary = f"{len(rows)} tab{'s' if len(rows) != 1 else ''}  ·  {total_rate:,.0f} lines/s"
+        rss = _rss_mb()
+        if rss is not None:
+            summary += f"  ·  process RSS {rss:,.0f} MB"
+        self.lbl_process.setText(summary)
@@ -4,11 +4,13 @@ from __future__ import annotations
 from PyQt6.QtCore import Qt, QTimer, QSize, QRect, QPoint
 from PyQt6.QtGui import QAction, QPainter, QColor, QFont, QPolygon
 from PyQt6.QtWidgets import (
-    QMainWindow, QTabWidget, QToolBar, QStatusBar,
-    QLabel, QWidget, QSizePolicy, QTabBar,
+    QApplication, QMainWindow, QTabWidget, QToolBar, QStatusBar,
+    QLabel, QWidget, QSizePolicy, QTabBar, QSystemTrayIcon,
 )
 
+from src.core.device_tracker import DeviceTracker
 from src.ui import theme, icons
+from src.ui.diagnostics_panel import DiagnosticsPanel
 from src.ui.logcat_tab import LogcatTab
 
 
@@ -64,10 +66,17 @@ class LogcatGUI(QMainWindow):
         self.setMinimumSize(800, 550)
         self.setStyleSheet(theme.get_stylesheet())
 
+        # One adb device tracker shared by every tab
+        self._device_tracker = DeviceTracker(self)
+        self._tray: QSystemTrayIcon | None = None     # created with the first notification
+        self._device_tracker.device_added.connect(self._on_device_added)
+        self._device_tracker.device_removed.connect(self._on_device_removed)
+
         self._build_menubar()
         self._build_toolbar()
         self._build_central()
         self._build_statusbar()
+        self._build_diagnostics()
 
         self._status_timer = QTimer(self)
         self._status_timer.setInterval(2000)
@@ -75,6 +84,7 @@ class LogcatGUI(QMainWindow):
         self._status_timer.start()
 
         self.add_new_tab()
+        self._device_tracker.start()
 
     # ── Menubar ───────────────────────────────────────────────────────────────
 
@@ -89,6 +99,10 @@ class LogcatGUI(QMainWindow):
         act_close.setShortcut("Ctrl+W")
         act_close.triggered.connect(self._close_current_tab)
         file_menu.addSeparator()
+        act_flight = file_menu.addAction("Dump Flight Recorder")
+        act_flight.setShortcut("Ctrl+Shift+F")
+        act_flight.triggered.connect(lambda: self._current_tab() and self._current_tab().dump_flight_recorder())
+        file_menu.addSeparator()
         act_quit = file_menu.addAction("Quit")
         act_quit.setShortcut("Ctrl+Q")
         act_quit.triggered.connect(self.close)
@@ -97,6 +111,7 @@ class LogcatGUI(QMainWindow):
         act_settings = view_menu.addAction(icons.icon_settings(), "Settings…")
         act_settings.setShortcut("Ctrl+,")
         act_settings.triggered.connect(self.open_settings)
+        self._view_menu = view_menu
 
     # ── Toolbar ───────────────────────────────────────────────────────────────
 
@@ -180,18 +195,53 @@ class LogcatGUI(QMainWindow):
             self.lbl_status_state.setText("Idle")
             return
         self.lbl_status_device.setText(tab.current_device or "—")
-        self.lbl_status_lines.setText(f"{tab.line_count:,} lines")
+        lines = f"{tab.line_count:,} lines"
+        if tab.first_line_ms is not None:
+            lines += f"  ·  first line in {tab.first_line_ms:,.0f} ms"
+        self.lbl_status_lines.setText(lines)
         self.lbl_status_state.setText(
             '<span style="color:#3CB371">● Running</span>' if tab.is_running
             else "Idle"
         )
         self.lbl_status_state.setTextFormat(Qt.TextFormat.RichText)
 
+    # ── Diagnostics ────────────────────────────────────────────────────────────
+
+    def _build_diagnostics(self):
+        self.diagnostics = DiagnosticsPanel(self._tab_stats_sources, self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.diagnostics)
+        self.diagnostics.hide()
+        act = self.diagnostics.toggleViewAction()
+        act.setShortcut("Ctrl+Shift+D")
+        self._view_menu.addAction(act)
+
+    def _tab_stats_sources(self) -> list[tuple[str, LogcatTab]]:
+        return [(self.tabs.tabText(i), self.tabs.widget(i)) for i in range(self.tabs.count())
+                if isinstance(self.tabs.widget(i), LogcatTab)]
+
+    def _on_device_added(self, serial: str, state: str):
+        self.statusBar().showMessage(f"Device connected: {serial} ({state})", 4000)
+
+    def _on_device_removed(self, serial: str):
+        self.statusBar().showMessage(f"Device disconnected: {serial}", 4000)
+
+    def _notify(self, title: str, text: str):
+        """A desktop notification from the tray icon, or the status bar where there is no tray."""
+        if self._tray is None and QSystemTrayIcon.isSystemTrayAvailable():
+            self._tray = QSystemTrayIcon(self.windowIcon(), self)
+            self._tray.show()
+        if self._tray is not None:
+            self._tray.showMessage(title, text, QSystemTrayIcon.MessageIcon.Warning, 5000)
+        else:
+            self.statusBar().showMessage(f"{title}: {text}", 8000)
+        QApplication.alert(self)
+
     # ── Tab helpers ────────────────────────────────────────────────────────────
 
     def add_new_tab(self):
-        tab = LogcatTab()
+        tab = LogcatTab(device_tracker=self._device_tracker)
         tab.status_changed.connect(self._refresh_statusbar)
+        tab.watch_alert.connect(self._notify)
         idx = self.tabs.count()
         self.tabs.addTab(tab, f"Session {idx + 1}")
         self.tabs.setCurrentWidget(tab)
@@ -225,3 +275,6 @@ class LogcatGUI(QMainWindow):
                 if isinstance(w, LogcatTab):
                     w.reload_packages()
 
+    def closeEvent(self, event):
+        self._device_tracker.stop()
+        super().closeEvent(event)
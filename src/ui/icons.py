@@ -28,6 +28,21 @@ def icon_copy() -> QIcon:
 def icon_save() -> QIcon:
     return _std(QStyle.StandardPixmap.SP_DialogSaveButton)
 
+def icon_open() -> QIcon:
+    return _std(QStyle.StandardPixmap.SP_DialogOpenButton)
+
+def icon_session() -> QIcon:
+    return _std(QStyle.StandardPixmap.SP_DirIcon)
+
+def icon_replay() -> QIcon:
+    return _std(QStyle.StandardPixmap.SP_MediaSeekForward)
+
+def icon_crash() -> QIcon:
+    return _std(QStyle.StandardPixmap.SP_MessageBoxCritical)
+
+def icon_watch() -> QIcon:
+    return _std(QStyle.StandardPixmap.SP_MessageBoxWarning)
+
 def icon_settings() -> QIcon:
     return _std(QStyle.StandardPixmap.SP_FileDialogNewFolder)
 
@@ -1,21 +1,34 @@
 """LogcatTab — single device/package logcat session view."""
 from __future__ import annotations
 
+import os
 import re
+import signal
+import sys
+import time
+from bisect import bisect_left
 from datetime import datetime
 from pathlib import Path
 
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize, QPoint
-from PyQt6.QtGui import QTextCharFormat, QColor, QFont, QTextCursor, QFontDatabase, QPainter, QPolygon, QBrush
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize, QPoint, QEvent
+from PyQt6.QtGui import QTextBlockFormat, QTextCharFormat, QTextFormat, QColor, QFont, QTextCursor, QFontDatabase, QPainter, QPolygon, QBrush
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFrame,
     QLabel, QComboBox, QPushButton, QLineEdit,
-    QTextEdit, QFileDialog, QApplication, QSizePolicy,
+    QTextEdit, QFileDialog, QApplication, QSizePolicy, QMenu, QSplitter,
 )
 
+from src.core.filter_query import FilterError, compile_query, has_fields, message_terms, parse as parse_query
+from src.core.gc_stats import GcEvent
+from src.core.ingest_stats import IngestStats
+from src.core.logline import ANNOTATION, ANNOTATION_EXTRA, CRASH_UPDATE, GC_UPDATE, METRIC_UPDATE, REPEAT_UPDATE, WATCH_UPDATE
+from src.core.line_queue import LineQueue
 from src.core.process_reader import ProcessReader
-from src.utils.adb_utils import get_adb_devices
+from src.core.trigram_index import TrigramIndex
+from src.core.watchlist import parse_rules
+from src.utils.adb_utils import get_adb_device_states
 from src.ui import icons
+from src.ui.perf_panel import PerfPanel
 
 
 # ── Custom ComboBox with proper dropdown arrow ────────────────────────────────
@@ -55,6 +68,9 @@ _BG = {
     44: "#0E2540", 45: "#2E1040", 46: "#0E2E2E", 47: "#3A3A3A",
 }
 
+# Highlighting is capped; counting and navigation still cover every match.
+_MAX_HIGHLIGHTS = 2000
+
 _DEFAULT_FG = QColor("#E8E8E8")
 _DEFAULT_BG = QColor("#141414")
 
@@ -94,19 +110,49 @@ class LogcatTab(QWidget):
     """A single logcat capture session."""
 
     status_changed = pyqtSignal()
+    watch_alert = pyqtSignal(str, str)     # title, text of a watchlist notification
+
+    # Lines appended per event-loop pass while draining the capture queue.
+    DRAIN_LINES = 2000
 
     # ── Construction ──────────────────────────────────────────────────────────
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, device_tracker=None):
         super().__init__(parent)
+        self._device_tracker = device_tracker
         self._reader: ProcessReader | None = None
+        self._queue: LineQueue | None = None
         self._thread: QThread | None = None
         self._running = False
-        self._match_positions: list[int] = []
+        self._index = TrigramIndex()
+        self._stats = IngestStats()
+        self._evicted = 0           # lines dropped from the front of the view
+        self._matches: list[tuple[int, int, int]] = []  # (line id, column, length)
         self._match_idx = 0
+        self._search_upto = 0       # first line id not yet searched
+        self._query = None          # compiled predicate when the search is a field query
+        self._query_terms: list[str] = []
+        self._app_pids: set[str] = set()
+        self._blocks: dict[int, int] = {}   # head line id -> lines in a coalesced record after it
+        self._collapsed: set[int] = set()
+        self._runs: dict[int, int] = {}     # repeat run id -> line id of its first line
+        self._run_suffix: dict[int, int] = {}   # line id -> length of its "×N" suffix
+        self._crashes: dict[str, tuple] = {}    # fingerprint -> latest CRASH_UPDATE fields
+        self._watch_rules: list[str] = []       # watchlist rules of the capture, by index
+        self._watch: dict[int, tuple] = {}      # rule index -> latest WATCH_UPDATE fields
+        self._package_capture = ""  # package of a package capture
+        self._flight = False        # capture runs pidcat --flight-recorder
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self._search_new_lines)
         self._total_lines = 0
+        self._capture_started = 0.0
+        self._first_line_ms: float | None = None
 
         self._build_ui()
+        if self._device_tracker is not None:
+            self._device_tracker.devices_changed.connect(self._populate_devices)
 
     def _build_ui(self):
         root = QVBoxLayout(self)
@@ -116,7 +162,13 @@ class LogcatTab(QWidget):
         # Both bars already have border-bottom — no need for separator widgets
         root.addWidget(self._build_control_bar(), stretch=0)
         root.addWidget(self._build_search_bar(), stretch=0)
-        root.addWidget(self._build_log_area(), stretch=1)
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        splitter.addWidget(self._build_log_area())
+        self.perf_panel = PerfPanel()
+        self.perf_panel.hide()
+        splitter.addWidget(self.perf_panel)
+        splitter.setStretchFactor(0, 1)
+        root.addWidget(splitter, stretch=1)
 
     # ── Control bar ───────────────────────────────────────────────────────────
 
@@ -204,6 +256,9 @@ class LogcatTab(QWidget):
             ("Clear log",  icons.icon_clear(), self.clear_log),
             ("Copy all",   icons.icon_copy(),  self.copy_log),
             ("Save to…",   icons.icon_save(),  self.save_log),
+            ("Open log file…", icons.icon_open(), self.open_file),
+            ("Open session…", icons.icon_session(), self.open_session),
+            ("Replay capture…", icons.icon_replay(), self.open_replay),
         ]:
             b = QPushButton()
             b.setIcon(ico)
@@ -214,6 +269,30 @@ class LogcatTab(QWidget):
             b.clicked.connect(slot)
             h.addWidget(b, stretch=0)
 
+        self.btn_crashes = QPushButton()
+        self.btn_crashes.setIcon(icons.icon_crash())
+        self.btn_crashes.setProperty("role", "tool")
+        self.btn_crashes.setToolTip("Crashes and ANRs, by fingerprint")
+        self.btn_crashes.setFixedHeight(30)
+        self.btn_crashes.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self._crash_menu = QMenu(self.btn_crashes)
+        self._crash_menu.aboutToShow.connect(self._populate_crash_menu)
+        self.btn_crashes.setMenu(self._crash_menu)
+        h.addWidget(self.btn_crashes, stretch=0)
+        self._update_crash_button()
+
+        self.btn_watch = QPushButton()
+        self.btn_watch.setIcon(icons.icon_watch())
+        self.btn_watch.setProperty("role", "tool")
+        self.btn_watch.setToolTip("Watchlist hits, by rule")
+        self.btn_watch.setFixedHeight(30)
+        self.btn_watch.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self._watch_menu = QMenu(self.btn_watch)
+        self._watch_menu.aboutToShow.connect(self._populate_watch_menu)
+        self.btn_watch.setMenu(self._watch_menu)
+        h.addWidget(self.btn_watch, stretch=0)
+        self._update_watch_button()
+
         self.refresh_devices()
         return bar
 
@@ -234,6 +313,10 @@ class LogcatTab(QWidget):
         # Search input
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("Search / highlight…")
+        self.search_edit.setToolTip(
+            "Plain text, or a filter query such as\n"
+            "level>=W && tag~\"^Camera\" && !msg:chatty && pid in app"
+        )
         self.search_edit.setFixedHeight(32)
         self.search_edit.setMinimumWidth(150)
         self.search_edit.setTextMargins(4, 2, 4, 2)
@@ -304,6 +387,16 @@ class LogcatTab(QWidget):
         self.btn_wrap.toggled.connect(self._toggle_wrap)
         h.addWidget(self.btn_wrap)
 
+        self.btn_perf = QPushButton("Perf")
+        self.btn_perf.setProperty("role", "toggle")
+        self.btn_perf.setCheckable(True)
+        self.btn_perf.setToolTip("Startup time, skipped frames, StrictMode durations and GC pauses (p50/p95)")
+        self.btn_perf.setFixedHeight(32)
+        self.btn_perf.setMinimumWidth(60)
+        self.btn_perf.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Fixed)
+        self.btn_perf.toggled.connect(lambda checked: self.perf_panel.setVisible(checked))
+        h.addWidget(self.btn_perf)
+
         return bar
 
     # ── Log area ──────────────────────────────────────────────────────────────
@@ -316,6 +409,13 @@ class LogcatTab(QWidget):
         fixed = QFont("Menlo", 12)
         fixed.setStyleHint(QFont.StyleHint.Monospace)
         self.log_view.setFont(fixed)
+        from src.core.settings import Settings
+        scrollback = Settings().scrollback_lines
+        if scrollback > 0:
+            # +1 for the empty block after the last newline
+            self.log_view.document().setMaximumBlockCount(scrollback + 1)
+        # Double-clicking the first line of a stack trace collapses it
+        self.log_view.viewport().installEventFilter(self)
         return self.log_view
 
     # ── Separators ────────────────────────────────────────────────────────────
@@ -338,16 +438,27 @@ class LogcatTab(QWidget):
     # ── Device management ─────────────────────────────────────────────────────
 
     def refresh_devices(self):
-        current = self.device_combo.currentText()
+        if self._device_tracker is not None:
+            # Never touch adb on the UI thread; the tracker publishes the result.
+            self._device_tracker.request_refresh()
+            self._populate_devices(self._device_tracker.snapshot())
+        else:
+            self._populate_devices(get_adb_device_states(timeout=3) or {})
+
+    def _populate_devices(self, devices: dict):
+        current = self.current_device
+        self.device_combo.blockSignals(True)
         self.device_combo.clear()
-        devices = get_adb_devices()
         if devices:
-            self.device_combo.addItems(devices)
-            idx = self.device_combo.findText(current)
+            for serial, state in devices.items():
+                label = serial if state == "device" else f"{serial} ({state})"
+                self.device_combo.addItem(label, serial)
+            idx = self.device_combo.findData(current)
             if idx >= 0:
                 self.device_combo.setCurrentIndex(idx)
         else:
             self.device_combo.addItem("(no devices)")
+        self.device_combo.blockSignals(False)
         self.status_changed.emit()
 
     # ── Package management ────────────────────────────────────────────────────
@@ -376,42 +487,120 @@ class LogcatTab(QWidget):
     def start_capture(self):
         if self._running:
             return
-        device = self.device_combo.currentText()
-        if not device or device == "(no devices)":
+        device = self.current_device
+        if not device:
             return
         package = self.pkg_combo.currentText().strip()
-        self._running = True
-        self.btn_start.setEnabled(False)
-        self.btn_stop.setEnabled(True)
-        self.status_changed.emit()
 
-        from src.core.pidcat_runner import get_pidcat_path
-        import sys as _sys
-        
-        pidcat_path = get_pidcat_path()
-        cmd = [_sys.executable, pidcat_path, package or "com.fadcam.beta"]
+        from src.core.settings import Settings
+        settings = Settings()
+
+        args = [package or "com.fadcam.beta", "--backlog", settings.backlog]
+        if settings.backlog_lines > 0:
+            args += ["--backlog-lines", str(settings.backlog_lines)]
+        if settings.record_sessions:
+            session = f"{device.replace(':', '_')}_{datetime.now():%Y%m%d_%H%M%S}"
+            args += ["--store", str(Path(settings.sessions_dir) / session)]
+        if settings.flight_minutes > 0:
+            args += ["--flight-recorder", str(settings.flight_minutes), "--flight-dir", settings.flights_dir]
         
         env = None
         if device:
-            import os
             env = os.environ.copy()
             env['ANDROID_SERIAL'] = device
+        self._launch(args, env)
+
+    def open_file(self):
+        """Runs a saved logcat file or bugreport through pidcat's offline readers."""
+        if self._running:
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open log file", "",
+            "Log files (*.txt *.log);;Bugreports (*.zip);;All files (*)"
+        )
+        if path:
+            package = self.pkg_combo.currentText().strip()
+            mode = "--bugreport" if path.lower().endswith(".zip") else "--file"
+            self._launch(([package] if package else []) + [mode, path])
+
+    def open_session(self):
+        """Queries a recorded session store into this tab."""
+        if self._running:
+            return
+        from src.ui.session_dialog import SessionQueryDialog
+        dlg = SessionQueryDialog(self)
+        if dlg.exec():
+            package = self.pkg_combo.currentText().strip()
+            self._launch(([package] if package else []) + dlg.pidcat_args())
+
+    def open_replay(self):
+        """Replays a recorded capture through the live path at a chosen speed."""
+        if self._running:
+            return
+        from src.ui.replay_dialog import ReplayDialog
+        dlg = ReplayDialog(self)
+        if dlg.exec():
+            package = self.pkg_combo.currentText().strip()
+            self._launch(([package] if package else []) + dlg.pidcat_args())
+
+    def _launch(self, args: list[str], env=None):
+        """Starts a pidcat child with the given arguments and streams it into the view."""
+        self._running = True
+        self.btn_start.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+        self.status_changed.emit()
+
+        from src.core.pidcat_runner import get_pidcat_path
+
+        from src.core.settings import Settings
+        settings = Settings()
+        cmd = [sys.executable, get_pidcat_path(), "--annotate", "--dedup", settings.dedup]
+        for spec in settings.dedup_tags.split(","):
+            if spec.strip():
+                cmd += ["--dedup-tag", spec.strip()]
+        if settings.sample_target > 0:
+            cmd += ["--sample-target", str(settings.sample_target)]
+        cmd += [f"--highlight={rule}" for rule in settings.highlight_rules]
+        watchlist = [line for line in settings.watchlist if line.strip()]
+        if watchlist:
+            cmd += [f"--watch={line}" for line in watchlist]
+            cmd += ["--watch-alert-interval", str(settings.watch_alert_interval)]
+        try:
+            self._watch_rules = [rule.text for rule in parse_rules(watchlist)]
+        except ValueError:
+            self._watch_rules = []      # pidcat reports the bad rule
+        cmd += args
+        self._flight = "--flight-recorder" in args
+        self._package_capture = args[0] if args and not args[0].startswith("-") else ""
 
         self._thread = QThread()
-        self._reader = ProcessReader(cmd=cmd, env=env)
+        self._queue = LineQueue(settings.queue_lines, settings.overload_policy, self._stats)
+        self._reader = ProcessReader(cmd=cmd, env=env, stats=self._stats, queue=self._queue)
         self._reader.moveToThread(self._thread)
         self._thread.started.connect(self._reader.run)
-        self._reader.line_ready.connect(self._append_line)
+        self._reader.lines_available.connect(self._drain_queue)
         self._reader.finished.connect(self._on_reader_finished)
+        self._capture_started = time.perf_counter()
+        self._first_line_ms = None
         self._thread.start()
 
     def stop_capture(self):
+        if self._queue is not None:
+            self._queue.close()     # a reader blocked on a full queue must see the exit
         if self._reader and self._reader.process:
             try:
                 self._reader.process.terminate()
             except Exception:
                 pass
 
+    def dump_flight_recorder(self):
+        """Asks a flight recorder capture to write out what it holds."""
+        if self._flight and self._reader and self._reader.process and hasattr(signal, "SIGUSR1"):
+            try:
+                os.kill(self._reader.process.pid, signal.SIGUSR1)
+            except OSError:
+                pass
+
     def _on_reader_finished(self):
         self._running = False
         self.btn_start.setEnabled(True)
@@ -423,62 +612,250 @@ class LogcatTab(QWidget):
 
     # ── Log output ────────────────────────────────────────────────────────────
 
+    def _drain_queue(self):
+        """Shows the next slice of queued lines, yielding to the event loop between slices."""
+        queue = self._queue
+        if queue is None:
+            return
+        lines = queue.take(self.DRAIN_LINES)
+        if lines:
+            self._append_lines(lines)
+        if len(queue):
+            QTimer.singleShot(0, self._drain_queue)
+
     def _append_line(self, raw: str):
-        self._total_lines += 1
-        text = raw.rstrip("\n")
+        self._append_lines([raw])
+
+    def _append_lines(self, lines: list[str]):
+        """Inserts a batch of lines as a single document edit."""
+        started = time.perf_counter_ns()
+        if self._first_line_ms is None and self._capture_started:
+            self._first_line_ms = (time.perf_counter() - self._capture_started) * 1000
+            self.status_changed.emit()
+        self._total_lines += len(lines)
 
         cursor = self.log_view.textCursor()
         cursor.movePosition(QTextCursor.MoveOperation.End)
-
-        chunks = _parse_ansi(text)
-        for chunk_text, fg, bg, bold, italic in chunks:
-            fmt = QTextCharFormat()
-            fmt.setForeground(fg)
-            if bg != _DEFAULT_BG:
-                fmt.setBackground(bg)
-            if bold:
-                fmt.setFontWeight(QFont.Weight.Bold)
-            if italic:
-                fmt.setFontItalic(True)
-            cursor.insertText(chunk_text, fmt)
-
+        cursor.beginEditBlock()
         fmt_nl = QTextCharFormat()
-        cursor.insertText("\n", fmt_nl)
+        index_add = self._index.add
+        capture_package = self._package_capture
+        app_pids = self._app_pids if capture_package else None
+        last_prefix = meta = None
+        chars = 0
+        updates = 0
+        for raw in lines:
+            text = raw.rstrip("\r\n")
+            if text.startswith("\x1b_R"):
+                u = REPEAT_UPDATE.match(text)
+                if u:
+                    self._update_repeat(int(u.group(1)), int(u.group(2)))
+                    updates += 1
+                    continue
+            elif text.startswith("\x1b_M"):
+                u = METRIC_UPDATE.match(text)
+                if u:
+                    metric, package, name, ts, value = u.groups()
+                    self.perf_panel.add(ts, metric, package, name, int(value))
+                    updates += 1
+                    continue
+            elif text.startswith("\x1b_G"):
+                u = GC_UPDATE.match(text)
+                if u:
+                    process, ts, cause, freed, free_pct, used, heap, pause = u.groups()
+                    self.perf_panel.add_gc(process, GcEvent(ts, cause, float(freed), int(free_pct),
+                                                            float(used), float(heap), float(pause)))
+                    updates += 1
+                    continue
+            elif text.startswith("\x1b_C"):
+                u = CRASH_UPDATE.match(text)
+                if u:
+                    self._note_crash(*u.groups())
+                    updates += 1
+                    continue
+            elif text.startswith("\x1b_W"):
+                u = WATCH_UPDATE.match(text)
+                if u:
+                    self._note_watch(*u.groups())
+                    updates += 1
+                    continue
+            m = ANNOTATION.match(text)
+            if m:
+                # (ts, level, tag, pid, tid); wrapped lines of one record share it
+                if m.group(0) != last_prefix:
+                    last_prefix = m.group(0)
+                    level, tag, pid, tid, ts, extra = m.groups()
+                    meta = (ts, level, sys.intern(tag), pid, tid)
+                    if extra:
+                        self._note_extra(extra)
+                    if app_pids is not None:
+                        app_pids.add(pid)
+                text = text[m.end():]
+                plain = _ANSI_RESET.sub("", text)
+                index_add(plain, meta, capture_package)
+            else:
+                plain = _ANSI_RESET.sub("", text)
+                index_add(plain)
+            chars += len(plain) + 1
+            chunks = _parse_ansi(text)
+            for chunk_text, fg, bg, bold, italic in chunks:
+                fmt = QTextCharFormat()
+                fmt.setForeground(fg)
+                if bg != _DEFAULT_BG:
+                    fmt.setBackground(bg)
+                if bold:
+                    fmt.setFontWeight(QFont.Weight.Bold)
+                if italic:
+                    fmt.setFontItalic(True)
+                cursor.insertText(chunk_text, fmt)
+            cursor.insertText("\n", fmt_nl)
+        cursor.endEditBlock()
+        self._sync_evicted()
+        if self.search_edit.text() and not self._search_timer.isActive():
+            self._search_timer.start()
 
         if self.btn_autoscroll.isChecked():
             self.log_view.setTextCursor(cursor)
             self.log_view.ensureCursorVisible()
+        self._total_lines -= updates
+        self._stats.appended(len(lines) - updates, chars, time.perf_counter_ns() - started, updates)
 
     # ── Search / highlight ────────────────────────────────────────────────────
 
-    def _on_search_changed(self):
+    def _sync_evicted(self):
+        """Drops index entries and matches for lines the document has discarded."""
+        evicted = self._index.next_id - (self.log_view.document().blockCount() - 1)
+        if evicted <= self._evicted:
+            return
+        text = self._index.text
+        self._stats.evicted(evicted - self._evicted,
+                            sum(len(text(i)) + 1 for i in range(self._evicted, evicted)))
+        self._evicted = evicted
+        self._index.evict_before(evicted)
+        while self._blocks:
+            head = next(iter(self._blocks))
+            if head >= evicted:
+                break
+            del self._blocks[head]
+            self._collapsed.discard(head)
+        if self._matches and self._matches[0][0] < evicted:
+            dropped = bisect_left(self._matches, (evicted,))
+            del self._matches[:dropped]
+            self._match_idx = max(self._match_idx - dropped, 0)
+            self._update_match_label()
+
+    def _match_spans(self, line_id: int, pattern) -> list[tuple[int, int, int]]:
+        text = self._index.text(line_id)
+        if isinstance(pattern, re.Pattern):
+            return [(line_id, m.start(), m.end() - m.start())
+                    for m in pattern.finditer(text) if m.end() > m.start()]
+        haystack = text if self.btn_case.isChecked() else text.lower()
+        spans = []
+        pos = haystack.find(pattern)
+        while pos != -1:
+            spans.append((line_id, pos, len(pattern)))
+            pos = haystack.find(pattern, pos + len(pattern))
+        return spans
+
+    def _search_pattern(self):
         query = self.search_edit.text()
-        self._match_positions = []
-        self._match_idx = 0
+        if self.btn_regex.isChecked():
+            flags = 0 if self.btn_case.isChecked() else re.IGNORECASE
+            try:
+                return re.compile(query, flags)
+            except re.error:
+                return None
+        return query if self.btn_case.isChecked() else query.lower()
+
+    def _compile_search(self):
+        """Compiles the search text as a filter query if it uses any fields."""
+        self._query = None
+        self._query_terms = []
+        text = self.search_edit.text()
+        if not text or self.btn_regex.isChecked():
+            return
+        try:
+            node = parse_query(text)
+            if has_fields(node):
+                self._query = compile_query(node, sets={"app": self._app_pids})
+                self._query_terms = message_terms(node)
+        except FilterError:
+            pass  # not a query, search it as text
+
+    def _find_record_matches(self, start_id: int) -> list[tuple[int, int, int]]:
+        """Whole-line matches of the field query; msg is the displayed line text."""
+        index = self._index
+        if self._query_terms:
+            ids = index.search(max(self._query_terms, key=len), start_id=start_id)
+        else:
+            ids = range(max(start_id, index.first_id), index.next_id)
+        predicate = self._query
+        matches = []
+        for line_id in ids:
+            meta = index.data(line_id)
+            if meta is not None and predicate(meta + (index.text(line_id),)):
+                matches.append((line_id, 0, 0))
+        return matches
+
+    def _find_matches(self, start_id: int) -> list[tuple[int, int, int]]:
+        if self._query is not None:
+            return self._find_record_matches(start_id)
+        pattern = self._search_pattern()
+        if not pattern:
+            return []
+        ids = self._index.search(self.search_edit.text(), self.btn_case.isChecked(),
+                                 self.btn_regex.isChecked(), start_id=start_id)
+        matches = []
+        for line_id in ids:
+            matches.extend(self._match_spans(line_id, pattern))
+        return matches
 
+    def _on_search_changed(self):
+        self._search_timer.stop()
+        self._match_idx = 0
+        self._search_upto = self._index.next_id
+        self._compile_search()
+        self._matches = self._find_matches(self._index.first_id) if self.search_edit.text() else []
+        self._highlight_matches()
+        self._update_match_label()
+
+    def _search_new_lines(self):
+        """Extends the current matches with lines appended since the last search."""
+        start = self._search_upto
+        self._search_upto = self._index.next_id
+        if not self.search_edit.text():
+            return
+        new = self._find_matches(max(start, self._index.first_id))
+        if new:
+            self._matches.extend(new)
+            self._highlight_matches()
+            self._update_match_label()
+
+    def _highlight_matches(self):
+        fmt = QTextCharFormat()
+        fmt.setBackground(QColor("#3D1510"))
+        fmt.setForeground(QColor("#FFD050"))
+        line_fmt = QTextCharFormat()
+        line_fmt.setBackground(QColor("#3D1510"))
+        line_fmt.setProperty(QTextFormat.Property.FullWidthSelection, True)
+        doc = self.log_view.document()
         extra = []
-        if query:
-            from PyQt6.QtGui import QTextDocument
-            find_flags = QTextDocument.FindFlag(0)
-            if self.btn_case.isChecked():
-                find_flags |= QTextDocument.FindFlag.FindCaseSensitively
-
-            doc = self.log_view.document()
-            cursor = doc.find(query, 0, find_flags)
-            while not cursor.isNull():
-                fmt = QTextCharFormat()
-                fmt.setBackground(QColor("#3D1510"))
-                fmt.setForeground(QColor("#FFD050"))
-                self._match_positions.append(cursor.position())
-                extra.append((cursor, fmt))
-                cursor = doc.find(query, cursor, find_flags)
-
-        self.log_view.setExtraSelections(
-            [self._make_extra(c, f) for c, f in extra]
-        )
-        count = len(self._match_positions)
-        cur_label = f"{min(self._match_idx + 1, count)} / {count}" if count else "0 / 0"
-        self.lbl_match.setText(cur_label)
+        for line_id, column, length in self._matches[-_MAX_HIGHLIGHTS:]:
+            block = doc.findBlockByNumber(line_id - self._evicted)
+            if not block.isValid():
+                continue
+            cursor = QTextCursor(block)
+            if not length:
+                extra.append(self._make_extra(cursor, line_fmt))
+                continue
+            cursor.setPosition(block.position() + column)
+            cursor.setPosition(block.position() + column + length, QTextCursor.MoveMode.KeepAnchor)
+            extra.append(self._make_extra(cursor, fmt))
+        self.log_view.setExtraSelections(extra)
+
+    def _update_match_label(self):
+        count = len(self._matches)
+        self.lbl_match.setText(f"{min(self._match_idx + 1, count)} / {count}" if count else "0 / 0")
 
     @staticmethod
     def _make_extra(cursor, fmt) -> "QTextEdit.ExtraSelection":
@@ -488,23 +865,171 @@ class LogcatTab(QWidget):
         return sel
 
     def _prev_match(self):
-        if self._match_positions:
-            self._match_idx = (self._match_idx - 1) % len(self._match_positions)
+        if self._matches:
+            self._match_idx = (self._match_idx - 1) % len(self._matches)
             self._jump_to_match()
 
     def _next_match(self):
-        if self._match_positions:
-            self._match_idx = (self._match_idx + 1) % len(self._match_positions)
+        if self._matches:
+            self._match_idx = (self._match_idx + 1) % len(self._matches)
             self._jump_to_match()
 
     def _jump_to_match(self):
-        pos = self._match_positions[self._match_idx]
-        cursor = self.log_view.textCursor()
-        cursor.setPosition(pos)
-        self.log_view.setTextCursor(cursor)
-        self.log_view.ensureCursorVisible()
-        count = len(self._match_positions)
-        self.lbl_match.setText(f"{self._match_idx + 1} / {count}")
+        line_id, column, length = self._matches[self._match_idx]
+        for head in self._collapsed:
+            if head < line_id <= head + self._blocks[head]:
+                self._toggle_block(head)
+                break
+        block = self.log_view.document().findBlockByNumber(line_id - self._evicted)
+        if block.isValid():
+            cursor = self.log_view.textCursor()
+            cursor.setPosition(block.position() + column)
+            self.log_view.setTextCursor(cursor)
+            self.log_view.ensureCursorVisible()
+        self._update_match_label()
+
+    # ── Coalesced blocks and repeats ──────────────────────────────────────────
+
+    def _note_extra(self, extra: str):
+        """Records the block / repeat run a line about to be added starts."""
+        line_id = self._index.next_id
+        for key, value in ANNOTATION_EXTRA.findall(extra):
+            if key == "b":
+                self._blocks[line_id] = int(value)
+            elif key == "r":
+                self._runs[int(value)] = line_id
+                if len(self._runs) > 4096:
+                    for run in list(self._runs)[:2048]:
+                        del self._runs[run]
+
+    def _update_repeat(self, run: int, count: int):
+        """Shows a repeat count at the end of a run's first line."""
+        line_id = self._runs.get(run)
+        if line_id is None or line_id < self._evicted:
+            return
+        block = self.log_view.document().findBlockByNumber(line_id - self._evicted)
+        if not block.isValid():
+            return
+        suffix = f"  ×{count:,}"
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+        old = self._run_suffix.get(line_id, 0)
+        if old:
+            cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.KeepAnchor, old)
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor("#E8A020"))
+        fmt.setFontWeight(QFont.Weight.Bold)
+        cursor.insertText(suffix, fmt)
+        self._run_suffix[line_id] = len(suffix)
+        if len(self._run_suffix) > 4096:
+            self._run_suffix = {k: v for k, v in self._run_suffix.items() if k >= self._evicted}
+
+    # ── Crashes ───────────────────────────────────────────────────────────────
+
+    def _note_crash(self, fingerprint, count, kind, tag, tid, ts, process, title):
+        self._crashes[fingerprint] = (int(count), kind, tag, tid, ts, process, title)
+        self._update_crash_button()
+
+    def _update_crash_button(self):
+        total = sum(crash[0] for crash in self._crashes.values())
+        self.btn_crashes.setText(f" {total:,}" if total else "")
+        self.btn_crashes.setEnabled(bool(total))
+
+    def _populate_crash_menu(self):
+        self._crash_menu.clear()
+        for fingerprint, (count, kind, tag, tid, ts, process, title) in sorted(
+                self._crashes.items(), key=lambda item: -item[1][0]):
+            label = f"×{count}  {kind.upper()}  {title[:80]}  [{process}]"
+            action = self._crash_menu.addAction(label)
+            action.setToolTip(f"{fingerprint} · last at {ts}")
+            action.triggered.connect(lambda _=False, fp=fingerprint: self._jump_to_crash(fp))
+
+    def _jump_to_crash(self, fingerprint: str):
+        """Scrolls to the first line of a crash's latest occurrence, if it is still in view."""
+        _, _, tag, tid, ts, _, _ = self._crashes[fingerprint]
+        self._jump_to_record(ts, tag, tid)
+
+    # ── Watchlist ─────────────────────────────────────────────────────────────
+
+    def _note_watch(self, index, hits, alert, tag, tid, ts, message):
+        index = int(index)
+        self._watch[index] = (int(hits), tag, tid, ts, message)
+        self._update_watch_button()
+        if alert == "1":
+            rule = self._watch_rules[index] if index < len(self._watch_rules) else f"rule {index + 1}"
+            self.watch_alert.emit(f"Watch: {rule}", f"{ts}  {tag}: {message}")
+
+    def _update_watch_button(self):
+        total = sum(hit[0] for hit in self._watch.values())
+        self.btn_watch.setText(f" {total:,}" if total else "")
+        self.btn_watch.setEnabled(bool(total))
+
+    def _populate_watch_menu(self):
+        self._watch_menu.clear()
+        for index, (hits, tag, tid, ts, message) in sorted(self._watch.items(), key=lambda item: -item[1][0]):
+            rule = self._watch_rules[index] if index < len(self._watch_rules) else f"rule {index + 1}"
+            action = self._watch_menu.addAction(f"×{hits:,}  {rule}")
+            action.setToolTip(f"last at {ts}  {tag}: {message[:120]}")
+            action.triggered.connect(lambda _=False, ts=ts, tag=tag, tid=tid: self._jump_to_record(ts, tag, tid))
+
+    # ── Jumping to records ────────────────────────────────────────────────────
+
+    def _jump_to_record(self, ts: str, tag: str, tid: str):
+        """Scrolls to the first line of the latest record with these fields, if it is still in view."""
+        data = self._index.data
+        start = self._index.next_id - 1
+        found = None
+        # Search back from the newest line, then walk back to its first line.
+        for line_id in range(start, max(self._evicted, start - 20_000) - 1, -1):
+            meta = data(line_id)
+            if meta and meta[0] == ts and meta[2] == tag and meta[4] == tid:
+                found = line_id
+            elif found is not None:
+                break
+        if found is None:
+            return
+        for head in self._collapsed:
+            if head < found <= head + self._blocks[head]:
+                self._toggle_block(head)
+                break
+        block = self.log_view.document().findBlockByNumber(found - self._evicted)
+        if block.isValid():
+            self.btn_autoscroll.setChecked(False)
+            self.log_view.setTextCursor(QTextCursor(block))
+            self.log_view.ensureCursorVisible()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.MouseButtonDblClick and obj is self.log_view.viewport():
+            line_id = self.log_view.cursorForPosition(event.position().toPoint()).blockNumber() + self._evicted
+            if line_id in self._blocks:
+                self._toggle_block(line_id)
+                return True
+        return super().eventFilter(obj, event)
+
+    def _toggle_block(self, head_id: int):
+        """Hides or shows the lines of a coalesced record below its first line."""
+        doc = self.log_view.document()
+        head = doc.findBlockByNumber(head_id - self._evicted)
+        if not head.isValid():
+            return
+        collapse = head_id not in self._collapsed
+        if collapse:
+            self._collapsed.add(head_id)
+        else:
+            self._collapsed.discard(head_id)
+        block = head.next()
+        for _ in range(self._blocks[head_id]):
+            if not block.isValid():
+                break
+            block.setVisible(not collapse)
+            block = block.next()
+        fmt = QTextBlockFormat()
+        if collapse:
+            fmt.setBackground(QColor("#3D1510"))
+        cursor = QTextCursor(head)
+        cursor.setBlockFormat(fmt)
+        end = block.position() if block.isValid() else doc.characterCount()
+        doc.markContentsDirty(head.position(), end - head.position())
 
     def _toggle_wrap(self, checked: bool):
         mode = QTextEdit.LineWrapMode.WidgetWidth if checked else QTextEdit.LineWrapMode.NoWrap
@@ -514,8 +1039,24 @@ class LogcatTab(QWidget):
 
     def clear_log(self):
         self.log_view.clear()
+        self._stats.cleared()
         self._total_lines = 0
-        self._match_positions = []
+        self._index.clear()
+        self._evicted = 0
+        self._search_upto = 0
+        self._matches = []
+        self._match_idx = 0
+        self._app_pids.clear()
+        self._blocks.clear()
+        self._collapsed.clear()
+        self._runs.clear()
+        self._run_suffix.clear()
+        self._crashes.clear()
+        self._update_crash_button()
+        self._watch.clear()
+        self._update_watch_button()
+        self.perf_panel.clear()
+        self.log_view.setExtraSelections([])
         self.lbl_match.setText("0 / 0")
         self.status_changed.emit()
 
@@ -540,9 +1081,19 @@ class LogcatTab(QWidget):
     def line_count(self) -> int:
         return self._total_lines
 
+    @property
+    def stats(self) -> IngestStats:
+        """Ingest counters for the diagnostics panel."""
+        return self._stats
+
+    @property
+    def first_line_ms(self) -> float | None:
+        """Milliseconds from Start until the first line reached the view."""
+        return self._first_line_ms
+
     @property
     def current_device(self) -> str:
-        return self.device_combo.currentText()
+        return self.device_combo.currentData() or ""
 
     @property
     def current_package(self) -> str:
@@ -0,0 +1,167 @@
+"""Performance panel — startup, jank, StrictMode and GC series of one tab, with p50/p95."""
+from __future__ import annotations
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import (
+    QFrame, QVBoxLayout, QLabel, QTabWidget,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+)
+
+from src.core.gc_stats import PAUSE_BUCKETS, GcAnalytics, sparkline
+from src.core.perf_metrics import METRICS, PerfMetrics
+from src.ui import theme
+
+COLUMNS = (
+    ("Metric", "Displayed launch time, Choreographer skipped frames or StrictMode violation duration"),
+    ("Package", "Package the samples belong to"),
+    ("Activity / kind", "Launched activity, or StrictMode violation kind"),
+    ("Count", "Samples seen"),
+    ("p50", "Median of the latest samples"),
+    ("p95", "95th percentile of the latest samples"),
+    ("Max", "Worst of the latest samples"),
+    ("Last", "Most recent sample"),
+)
+
+GC_COLUMNS = (
+    ("Process", "Process the collections ran in"),
+    ("GCs", "Collections seen"),
+    ("Pause p50", "Median stop-the-world pause of the latest collections"),
+    ("Pause p95", "95th percentile pause"),
+    ("Max", "Longest pause"),
+    ("Pauses", "Pause histogram: <" + " / <".join(map(str, PAUSE_BUCKETS)) + f" / ≥{PAUSE_BUCKETS[-1]} ms"),
+    ("Alloc rate", "Allocation between collections: latest and its trend"),
+    ("Used after GC", "Heap left in use after a collection, first → latest; steady growth points to a leak"),
+)
+# Growth of the heap in use after GC that gets the row flagged.
+LEAK_WARN = 0.2
+
+
+def _table(columns) -> QTableWidget:
+    table = QTableWidget(0, len(columns))
+    table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+    table.verticalHeader().setVisible(False)
+    for col, (title, tip) in enumerate(columns):
+        item = QTableWidgetItem(title)
+        item.setToolTip(tip)
+        table.setHorizontalHeaderItem(col, item)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+    table.horizontalHeader().setStretchLastSection(True)
+    return table
+
+
+class PerfPanel(QFrame):
+    """Collects the METRIC_UPDATE and GC_UPDATE samples of a tab and tabulates them once a second while visible."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.metrics = PerfMetrics()
+        self.gc = GcAnalytics()
+        self._dirty = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+        layout.setSpacing(4)
+
+        self.lbl_summary = QLabel("No performance samples yet")
+        self.lbl_summary.setStyleSheet(f"color: {theme.TEXT_MUTED}; font-size: 11px;")
+        layout.addWidget(self.lbl_summary)
+
+        self.table = _table(COLUMNS)
+        self.gc_table = _table(GC_COLUMNS)
+        pages = QTabWidget()
+        pages.addTab(self.table, "App metrics")
+        pages.addTab(self.gc_table, "GC")
+        layout.addWidget(pages)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refresh)
+
+    def add(self, timestamp: str, metric: str, package: str, name: str, value: int):
+        if metric in METRICS:
+            self.metrics.add(timestamp, metric, package, name, value)
+            self._dirty = True
+
+    def add_gc(self, process: str, event):
+        self.gc.add(process, event)
+        self._dirty = True
+
+    def clear(self):
+        self.metrics.series.clear()
+        self.gc.series.clear()
+        self._dirty = True
+        if self.isVisible():
+            self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._dirty = True
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def refresh(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        order = list(METRICS)
+        rows = sorted(self.metrics.series.values(), key=lambda s: (order.index(s.metric), s.package, s.name))
+        self.table.setRowCount(len(rows))
+        for row, series in enumerate(rows):
+            label, unit = METRICS[series.metric]
+            p50, p95, worst, last = series.stats()
+            cells = (
+                label,
+                series.package,
+                series.name,
+                f"{series.count:,}",
+                f"{p50:,} {unit}",
+                f"{p95:,} {unit}",
+                f"{worst:,} {unit}",
+                f"{last:,} {unit}",
+            )
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if col >= 3:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, col, item)
+        collections = self._refresh_gc()
+        samples = sum(series.count for series in rows)
+        self.lbl_summary.setText(f"{samples:,} samples in {len(rows)} series  ·  {collections:,} GCs"
+                                 if rows or collections else "No performance samples yet")
+
+    def _refresh_gc(self) -> int:
+        rows = sorted(self.gc.series.values(), key=lambda s: s.process)
+        self.gc_table.setRowCount(len(rows))
+        for row, series in enumerate(rows):
+            p50, p95, worst = series.pauses()
+            histogram = series.histogram()
+            rates = series.allocation_rates()
+            first, last = series.used_after_gc()
+            cells = (
+                series.process,
+                f"{series.count:,}",
+                f"{p50:.1f} ms",
+                f"{p95:.1f} ms",
+                f"{worst:.1f} ms",
+                sparkline(histogram),
+                f"{rates[-1] / 1024:,.1f} MB/s  {sparkline(rates)}" if rates else "–",
+                f"{first / 1024:,.1f} → {last / 1024:,.1f} MB",
+            )
+            leaking = first > 0 and (last - first) / first > LEAK_WARN
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if 1 <= col <= 4:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if col == 5:
+                    item.setToolTip("  ".join(f"{label}: {n:,}" for label, n in zip(
+                        [f"<{b}" for b in PAUSE_BUCKETS] + [f"≥{PAUSE_BUCKETS[-1]}"], histogram)))
+                if col == 7 and leaking:
+                    item.setForeground(QColor(theme.ACCENT))
+                self.gc_table.setItem(row, col, item)
+        return sum(series.count for series in rows)
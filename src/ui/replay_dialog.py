@@ -0,0 +1,83 @@
+"""Replay dialog — pick a recorded capture and the speed to play it back at."""
+from __future__ import annotations
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
+    QLineEdit, QPushButton, QComboBox, QDialogButtonBox, QFileDialog,
+)
+
+from src.core.settings import Settings
+
+SPEEDS = (("1× (real time)", "1"), ("2×", "2"), ("10×", "10"), ("100×", "100"), ("As fast as possible", "0"))
+
+
+class ReplayDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Replay Capture")
+        self.setModal(True)
+        self.resize(480, 180)
+        self._build_ui()
+
+    # ── Layout ────────────────────────────────────────────────────────────────
+
+    def _build_ui(self):
+        root = QVBoxLayout(self)
+        root.setContentsMargins(20, 20, 20, 20)
+        root.setSpacing(16)
+
+        form = QFormLayout()
+        form.setSpacing(10)
+
+        path_row = QHBoxLayout()
+        path_row.setSpacing(8)
+        self.edit_path = QLineEdit()
+        self.edit_path.setPlaceholderText("Saved logcat file or session directory")
+        path_row.addWidget(self.edit_path, stretch=1)
+        btn_file = QPushButton("File…")
+        btn_file.clicked.connect(self._browse_file)
+        path_row.addWidget(btn_file)
+        btn_session = QPushButton("Session…")
+        btn_session.clicked.connect(self._browse_session)
+        path_row.addWidget(btn_session)
+        form.addRow("Capture:", path_row)
+
+        self.speed_combo = QComboBox()
+        for label, speed in SPEEDS:
+            self.speed_combo.addItem(label, speed)
+        form.addRow("Speed:", self.speed_combo)
+
+        root.addLayout(form)
+        root.addStretch()
+
+        btns = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok |
+            QDialogButtonBox.StandardButton.Cancel
+        )
+        ok_btn = btns.button(QDialogButtonBox.StandardButton.Ok)
+        if ok_btn:
+            ok_btn.setText("Replay")
+            ok_btn.setProperty("role", "primary")
+        btns.accepted.connect(self._accept)
+        btns.rejected.connect(self.reject)
+        root.addWidget(btns)
+
+    def _browse_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Replay log file", "", "Log files (*.txt *.log);;All files (*)")
+        if path:
+            self.edit_path.setText(path)
+
+    def _browse_session(self):
+        path = QFileDialog.getExistingDirectory(self, "Replay session", Settings().sessions_dir)
+        if path:
+            self.edit_path.setText(path)
+
+    def _accept(self):
+        if self.edit_path.text().strip():
+            self.accept()
+
+    # ── Result ────────────────────────────────────────────────────────────────
+
+    def pidcat_args(self) -> list[str]:
+        """pidcat arguments that run this replay."""
+        return ["--replay", self.edit_path.text().strip(), "--replay-speed", self.speed_combo.currentData()]
@@ -0,0 +1,93 @@
+"""Session query dialog — pick a recorded session store and what to read from it."""
+from __future__ import annotations
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
+    QLineEdit, QPushButton, QComboBox, QDialogButtonBox, QFileDialog,
+)
+
+from src.core.logline import LOG_LEVELS
+from src.core.settings import Settings
+
+
+class SessionQueryDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Open Session")
+        self.setModal(True)
+        self.resize(480, 260)
+        self._build_ui()
+
+    # ── Layout ────────────────────────────────────────────────────────────────
+
+    def _build_ui(self):
+        root = QVBoxLayout(self)
+        root.setContentsMargins(20, 20, 20, 20)
+        root.setSpacing(16)
+
+        form = QFormLayout()
+        form.setSpacing(10)
+
+        dir_row = QHBoxLayout()
+        dir_row.setSpacing(8)
+        self.edit_dir = QLineEdit()
+        self.edit_dir.setPlaceholderText("Session directory")
+        dir_row.addWidget(self.edit_dir, stretch=1)
+        btn_browse = QPushButton("Browse…")
+        btn_browse.clicked.connect(self._browse)
+        dir_row.addWidget(btn_browse)
+        form.addRow("Session:", dir_row)
+
+        self.edit_since = QLineEdit()
+        self.edit_since.setPlaceholderText("HH:MM[:SS] or MM-DD HH:MM (optional)")
+        form.addRow("From:", self.edit_since)
+
+        self.edit_until = QLineEdit()
+        self.edit_until.setPlaceholderText("HH:MM[:SS] or MM-DD HH:MM (optional)")
+        form.addRow("To:", self.edit_until)
+
+        self.level_combo = QComboBox()
+        for level in LOG_LEVELS:
+            self.level_combo.addItem(level)
+        form.addRow("Min level:", self.level_combo)
+
+        self.edit_tags = QLineEdit()
+        self.edit_tags.setPlaceholderText("Tag regexes, comma separated (optional)")
+        form.addRow("Tags:", self.edit_tags)
+
+        root.addLayout(form)
+        root.addStretch()
+
+        btns = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Open |
+            QDialogButtonBox.StandardButton.Cancel
+        )
+        open_btn = btns.button(QDialogButtonBox.StandardButton.Open)
+        if open_btn:
+            open_btn.setProperty("role", "primary")
+        btns.accepted.connect(self._accept)
+        btns.rejected.connect(self.reject)
+        root.addWidget(btns)
+
+    def _browse(self):
+        path = QFileDialog.getExistingDirectory(self, "Open session", Settings().sessions_dir)
+        if path:
+            self.edit_dir.setText(path)
+
+    def _accept(self):
+        if self.edit_dir.text().strip():
+            self.accept()
+
+    # ── Result ────────────────────────────────────────────────────────────────
+
+    def pidcat_args(self) -> list[str]:
+        """pidcat arguments that run this query."""
+        args = ["--from-store", self.edit_dir.text().strip(), "-l", self.level_combo.currentText()]
+        if self.edit_since.text().strip():
+            args += ["--since", self.edit_since.text().strip()]
+        if self.edit_until.text().strip():
+            args += ["--until", self.edit_until.text().strip()]
+        for tag in self.edit_tags.text().split(","):
+            if tag.strip():
+                args += ["-t", tag.strip()]
+        return args
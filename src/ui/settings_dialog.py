@@ -6,10 +6,13 @@ from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QGroupBox,
     QListWidget, QListWidgetItem, QPushButton,
     QComboBox, QLineEdit, QLabel, QDialogButtonBox,
-    QSizePolicy,
+    QSizePolicy, QSpinBox, QCheckBox, QMessageBox, QPlainTextEdit,
 )
 
+from src.core.dedup import parse_tag_modes
+from src.core.highlight import parse_rule as parse_highlight
 from src.core.settings import Settings
+from src.core.watchlist import parse_rules
 from src.ui import icons
 
 
@@ -76,6 +79,151 @@ class SettingsDialog(QDialog):
         def_row.addWidget(self.default_combo, stretch=1)
         root.addLayout(def_row)
 
+        # Startup backlog
+        backlog_row = QHBoxLayout()
+        backlog_row.setSpacing(10)
+        backlog_row.addWidget(QLabel("On start:"))
+        self.backlog_combo = QComboBox()
+        for label, mode in [
+            ("Load device buffer in bulk", "dump"),
+            ("Stream device buffer", "stream"),
+            ("Skip device buffer", "none"),
+        ]:
+            self.backlog_combo.addItem(label, mode)
+        backlog_row.addWidget(self.backlog_combo, stretch=1)
+        backlog_row.addWidget(QLabel("Last"))
+        self.backlog_lines = QSpinBox()
+        self.backlog_lines.setRange(0, 1_000_000)
+        self.backlog_lines.setSingleStep(1000)
+        self.backlog_lines.setSpecialValueText("all")
+        self.backlog_lines.setToolTip("Only load the last N lines of the device buffer")
+        backlog_row.addWidget(self.backlog_lines)
+        root.addLayout(backlog_row)
+
+        # Session recording
+        self.chk_record = QCheckBox(f"Record captures into sessions under {self._settings.sessions_dir}")
+        root.addWidget(self.chk_record)
+
+        # Scrollback
+        scroll_row = QHBoxLayout()
+        scroll_row.setSpacing(10)
+        scroll_row.addWidget(QLabel("Keep in view:"))
+        self.scrollback_lines = QSpinBox()
+        self.scrollback_lines.setRange(0, 10_000_000)
+        self.scrollback_lines.setSingleStep(100_000)
+        self.scrollback_lines.setSpecialValueText("unlimited")
+        self.scrollback_lines.setSuffix(" lines")
+        self.scrollback_lines.setToolTip("Older lines are dropped from the view and the search index")
+        scroll_row.addWidget(self.scrollback_lines)
+        scroll_row.addStretch()
+        root.addLayout(scroll_row)
+
+        # Repeated lines
+        dedup_row = QHBoxLayout()
+        dedup_row.setSpacing(10)
+        dedup_row.addWidget(QLabel("Repeated lines:"))
+        self.dedup_combo = QComboBox()
+        for label, mode in [
+            ("Show every copy", "off"),
+            ("Fold identical lines", "exact"),
+            ("Fold lines differing only in numbers", "masked"),
+        ]:
+            self.dedup_combo.addItem(label, mode)
+        dedup_row.addWidget(self.dedup_combo, stretch=1)
+        root.addLayout(dedup_row)
+
+        self.edit_dedup_tags = QLineEdit()
+        self.edit_dedup_tags.setPlaceholderText("Per tag, e.g. Choreographer=masked, MyTag=off")
+        self.edit_dedup_tags.setToolTip("Overrides for single tags: off, exact or masked")
+        root.addWidget(self.edit_dedup_tags)
+
+        # Overload
+        overload_row = QHBoxLayout()
+        overload_row.setSpacing(10)
+        overload_row.addWidget(QLabel("When the view falls behind:"))
+        self.overload_combo = QComboBox()
+        for label, policy in [
+            ("Pause reading (the device drops)", "block"),
+            ("Drop verbose/debug first, keep warnings", "drop"),
+            ("Sample, keep warnings", "sample"),
+        ]:
+            self.overload_combo.addItem(label, policy)
+        overload_row.addWidget(self.overload_combo, stretch=1)
+        self.queue_lines = QSpinBox()
+        self.queue_lines.setRange(1_000, 1_000_000)
+        self.queue_lines.setSingleStep(10_000)
+        self.queue_lines.setSuffix(" lines")
+        self.queue_lines.setToolTip("Lines waiting for the view before the policy applies")
+        overload_row.addWidget(self.queue_lines)
+        root.addLayout(overload_row)
+
+        # Sampling
+        sample_row = QHBoxLayout()
+        sample_row.setSpacing(10)
+        sample_row.addWidget(QLabel("Sample verbose/debug/info down to:"))
+        self.sample_target = QSpinBox()
+        self.sample_target.setRange(0, 1_000_000)
+        self.sample_target.setSingleStep(500)
+        self.sample_target.setSpecialValueText("off")
+        self.sample_target.setSuffix(" lines/s")
+        self.sample_target.setToolTip("Warnings and above, and the first lines of every tag, are always shown")
+        sample_row.addWidget(self.sample_target)
+        sample_row.addStretch()
+        root.addLayout(sample_row)
+
+        # Flight recorder
+        flight_row = QHBoxLayout()
+        flight_row.setSpacing(10)
+        flight_row.addWidget(QLabel("Flight recorder, keep the last:"))
+        self.flight_minutes = QSpinBox()
+        self.flight_minutes.setRange(0, 120)
+        self.flight_minutes.setSpecialValueText("off")
+        self.flight_minutes.setSuffix(" min")
+        self.flight_minutes.setToolTip(
+            "Captures show nothing and keep the last minutes in memory; a crash, ANR or\n"
+            f"Ctrl+Shift+F writes them to {self._settings.flights_dir}")
+        flight_row.addWidget(self.flight_minutes)
+        flight_row.addStretch()
+        root.addLayout(flight_row)
+
+        # Watchlist
+        watch_grp = QGroupBox("Watchlist")
+        watch_lay = QVBoxLayout(watch_grp)
+        watch_lay.setSpacing(8)
+        self.edit_watchlist = QPlainTextEdit()
+        self.edit_watchlist.setPlaceholderText(
+            "One rule per line, highlighted and counted in every capture:\n"
+            "E_TIMEOUT            keyword, any case\n"
+            "/HTTP [45]\\d\\d/      regex (/.../i ignores case)\n"
+            "!sqlite_busy         a leading ! also notifies on a hit")
+        self.edit_watchlist.setFixedHeight(96)
+        watch_lay.addWidget(self.edit_watchlist)
+        alert_row = QHBoxLayout()
+        alert_row.setSpacing(10)
+        alert_row.addWidget(QLabel("Notify at most once per rule every"))
+        self.watch_alert_interval = QSpinBox()
+        self.watch_alert_interval.setRange(0, 3600)
+        self.watch_alert_interval.setSuffix(" s")
+        alert_row.addWidget(self.watch_alert_interval)
+        alert_row.addStretch()
+        watch_lay.addLayout(alert_row)
+        root.addWidget(watch_grp)
+
+        # Highlight rules
+        highlight_grp = QGroupBox("Highlight rules")
+        highlight_lay = QVBoxLayout(highlight_grp)
+        self.edit_highlights = QPlainTextEdit()
+        self.edit_highlights.setPlaceholderText(
+            "STYLE=REGEX, one per line; later rules win where matches overlap:\n"
+            "bold red=Connection (reset|refused)\n"
+            "black on yellow=(?i)\\btimeout\\b\n"
+            "bright cyan=/api/v\\d+/\\w+")
+        self.edit_highlights.setToolTip("Colors: black, red, green, yellow, blue, magenta, cyan, white;\n"
+                                        "'bright' before a color, 'on' before the background, 'bold'")
+        self.edit_highlights.setFixedHeight(96)
+        highlight_lay.addWidget(self.edit_highlights)
+        root.addWidget(highlight_grp)
+
         root.addStretch()
 
         # Dialog buttons
@@ -97,6 +245,22 @@ class SettingsDialog(QDialog):
         for pkg in self._settings.packages:
             self.pkg_list.addItem(pkg)
         self._refresh_default_combo()
+        idx = self.backlog_combo.findData(self._settings.backlog)
+        self.backlog_combo.setCurrentIndex(max(idx, 0))
+        self.backlog_lines.setValue(self._settings.backlog_lines)
+        self.chk_record.setChecked(self._settings.record_sessions)
+        self.scrollback_lines.setValue(self._settings.scrollback_lines)
+        idx = self.dedup_combo.findData(self._settings.dedup)
+        self.dedup_combo.setCurrentIndex(max(idx, 0))
+        self.edit_dedup_tags.setText(self._settings.dedup_tags)
+        idx = self.overload_combo.findData(self._settings.overload_policy)
+        self.overload_combo.setCurrentIndex(max(idx, 0))
+        self.queue_lines.setValue(self._settings.queue_lines)
+        self.sample_target.setValue(self._settings.sample_target)
+        self.flight_minutes.setValue(self._settings.flight_minutes)
+        self.edit_watchlist.setPlainText("\n".join(self._settings.watchlist))
+        self.watch_alert_interval.setValue(self._settings.watch_alert_interval)
+        self.edit_highlights.setPlainText("\n".join(self._settings.highlight_rules))
 
     def _refresh_default_combo(self):
         current = self.default_combo.currentText()
@@ -133,6 +297,25 @@ class SettingsDialog(QDialog):
         self._refresh_default_combo()
 
     def _save(self):
+        dedup_tags = self.edit_dedup_tags.text().strip()
+        try:
+            parse_tag_modes(t for t in dedup_tags.split(",") if t.strip())
+        except ValueError as e:
+            QMessageBox.warning(self, "Settings", f"Repeated lines per tag: {e}")
+            return
+        watchlist = [line.strip() for line in self.edit_watchlist.toPlainText().splitlines() if line.strip()]
+        try:
+            parse_rules(watchlist)
+        except ValueError as e:
+            QMessageBox.warning(self, "Settings", f"Watchlist: {e}")
+            return
+        highlights = [line.strip() for line in self.edit_highlights.toPlainText().splitlines() if line.strip()]
+        try:
+            for rule in highlights:
+                parse_highlight(rule)
+        except ValueError as e:
+            QMessageBox.warning(self, "Settings", f"Highlight rules: {e}")
+            return
         packages = [
             self.pkg_list.item(i).text()
             for i in range(self.pkg_list.count())
@@ -142,6 +325,19 @@ class SettingsDialog(QDialog):
             default = ""
         self._settings.packages = packages
         self._settings.default_package = default
+        self._settings.backlog = self.backlog_combo.currentData()
+        self._settings.backlog_lines = self.backlog_lines.value()
+        self._settings.record_sessions = self.chk_record.isChecked()
+        self._settings.scrollback_lines = self.scrollback_lines.value()
+        self._settings.dedup = self.dedup_combo.currentData()
+        self._settings.dedup_tags = dedup_tags
+        self._settings.overload_policy = self.overload_combo.currentData()
+        self._settings.queue_lines = self.queue_lines.value()
+        self._settings.sample_target = self.sample_target.value()
+        self._settings.flight_minutes = self.flight_minutes.value()
+        self._settings.watchlist = watchlist
+        self._settings.watch_alert_interval = self.watch_alert_interval.value()
+        self._settings.highlight_rules = highlights
         self._settings.save()
         self.accept()
 
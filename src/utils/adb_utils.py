@@ -1,19 +1,32 @@
 import os
 import subprocess
 
-def get_adb_devices():
-    """Returns a list of connected ADB device serials."""
+ADB_SERVER_HOST = '127.0.0.1'
+ADB_SERVER_PORT = int(os.environ.get('ANDROID_ADB_SERVER_PORT', '5037'))
+
+
+def parse_device_list(text):
+    """Parses `adb devices` / track-devices output into {serial: state}."""
+    devices = {}
+    for l in text.splitlines():
+        l = l.strip()
+        if not l or l.startswith('List of devices') or l.startswith('*'):
+            continue
+        parts = l.split()
+        if parts:
+            devices[parts[0]] = parts[1] if len(parts) > 1 else 'unknown'
+    return devices
+
+
+def get_adb_device_states(timeout=5):
+    """Returns {serial: state} for connected ADB devices, or None if adb is unusable."""
     try:
-        res = subprocess.run(['adb', 'devices'], capture_output=True, text=True, check=False)
-        lines = res.stdout.splitlines()[1:]
-        devices = []
-        for l in lines:
-            l = l.strip()
-            if not l:
-                continue
-            parts = l.split()
-            if parts:
-                devices.append(parts[0])
-        return devices
-    except FileNotFoundError:
-        return []
+        res = subprocess.run(['adb', 'devices'], capture_output=True, text=True, check=False, timeout=timeout)
+        return parse_device_list(res.stdout)
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+
+
+def get_adb_devices(timeout=5):
+    """Returns a list of connected ADB device serials."""
+    return list(get_adb_device_states(timeout) or {})
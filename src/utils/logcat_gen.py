@@ -0,0 +1,296 @@
+"""Seeded generator of realistic synthetic logcat streams.
+
+Produces a mix of ordinary app and system chatter plus the events FadCat cares
+about: ActivityManager process starts and deaths, Java crashes with multi-line
+stack traces, native tombstones from DEBUG, Dalvik and ART GC lines, ANRs,
+startup/jank/StrictMode telemetry and bursts of repeated spam.
+
+The same seed always produces the same stream. Output formats are the ones
+`adb logcat -v` knows: brief, threadtime, long and binary (-B, logger_entry v4).
+
+  python -m src.utils.logcat_gen --lines 100000 --format threadtime -o corpus.txt
+"""
+import argparse
+import random
+import struct
+import sys
+import time
+from typing import NamedTuple
+
+FORMATS = ('brief', 'threadtime', 'long', 'binary')
+LEVEL_PRIORITY = {'V': 2, 'D': 3, 'I': 4, 'W': 5, 'E': 6, 'F': 7}
+# 2021-01-02 03:04:05 UTC, a fixed epoch so a seed always gives the same text
+DEFAULT_START = 1609556645.0
+
+_WORDS = ('request', 'cache', 'session', 'frame', 'buffer', 'socket', 'token', 'surface', 'config',
+          'stream', 'camera', 'preview', 'encoder', 'thread', 'handler', 'binder', 'service', 'job')
+_CHATTER = (
+    ('V', 'ViewRootImpl', 'Relayout returned: old=[0,0][{a},{b}] new=[0,0][{a},{b}]'),
+    ('D', 'OkHttp', '--> GET https://api.example.com/v1/{w}/{n} http/1.1'),
+    ('D', 'OkHttp', '<-- 200 OK https://api.example.com/v1/{w}/{n} ({n}ms, {a}-byte body)'),
+    ('I', 'CameraService', 'Camera {d}: opened by uid {n}, facing {w}'),
+    ('D', 'CameraDevice', 'waitUntilIdle: {w} {n} pending requests'),
+    ('D', 'Surface', 'Surface::disconnect(this={h},api=1)'),
+    ('I', 'MediaCodec', 'configure {w} encoder: {a}x{b} @ {d} fps'),
+    ('W', 'System', 'A resource failed to call close.'),
+    ('D', 'NetworkMonitor', 'PROBE_DNS {w}.example.com {n}ms OK'),
+    ('I', 'ActivityThread', 'Handling {w} for {n}'),
+    ('E', 'BufferQueueProducer', '[SurfaceView] dequeueBuffer: BufferQueue has been abandoned'),
+    ('W', 'Looper', 'Slow dispatch took {n}ms main h=android.app.ActivityThread$H c=null m={d}'),
+    ('V', 'FadCam', '{w} state -> {w2} ({n})'),
+    ('D', 'FadCam', 'Recording segment {n}: {a} bytes written'),
+    ('I', 'chatty', 'uid={n}({w}) identical {d} lines'),
+)
+_EXCEPTIONS = ('java.lang.NullPointerException: Attempt to invoke virtual method on a null object reference',
+               'java.lang.IllegalStateException: {w} not initialized',
+               'java.lang.IndexOutOfBoundsException: Index: {d}, Size: {d}',
+               'android.view.WindowManager$BadTokenException: Unable to add window -- token null is not valid')
+_NATIVE_FRAMES = ('/apex/com.android.runtime/lib64/bionic/libc.so (abort+164)',
+                  '/system/lib64/libcamera_client.so (android::Camera::connect+212)',
+                  '/system/lib64/libmedia_codec.so (android::MediaCodec::onMessageReceived+1324)',
+                  '/data/app/{p}/lib/arm64/libnative.so (Java_{j}_process+88)')
+
+
+class GeneratedEntry(NamedTuple):
+    time: float     # epoch seconds
+    level: str
+    tag: str
+    pid: int
+    tid: int
+    uid: int
+    message: str
+
+
+class LogcatGenerator:
+    """Deterministic stream of GeneratedEntry for a fake device running some apps."""
+
+    def __init__(self, seed=0, packages=('com.fadcam.beta', 'com.android.systemui', 'com.example.app'),
+                 rate=2000.0, start=DEFAULT_START):
+        self.random = random.Random(seed)
+        self.packages = list(packages)
+        self.rate = rate
+        self.time = start
+        self.next_pid = 2000
+        self.system_pid = 1000
+        self.running = {}   # package -> (pid, uid)
+        self.spam = None    # (remaining, entry template) while a spam burst is going on
+
+    # ── Helpers ───────────────────────────────────────────────────────────────
+
+    def _tick(self):
+        self.time += self.random.expovariate(self.rate)
+        return self.time
+
+    def _fill(self, template, package='com.example.app'):
+        r = self.random
+        return template.format(
+            a=r.randint(100, 4000), b=r.randint(100, 4000), d=r.randint(0, 60), n=r.randint(1, 99999),
+            w=r.choice(_WORDS), w2=r.choice(_WORDS), h='0x%x' % r.getrandbits(40),
+            p=package, j=package.replace('.', '_'),
+        )
+
+    def _entry(self, level, tag, pid, message, tid=None, uid=1000):
+        return GeneratedEntry(self._tick(), level, tag, pid, tid if tid is not None else pid, uid, message)
+
+    def _system(self, level, tag, message):
+        return self._entry(level, tag, self.system_pid, message, tid=self.system_pid + self.random.randint(1, 80))
+
+    def _app(self):
+        """Returns (True, package) for a running app or (False, package) for one to start."""
+        stopped = [p for p in self.packages if p not in self.running]
+        if stopped and (not self.running or self.random.random() < 0.0005):
+            return False, self.random.choice(stopped)
+        return True, self.random.choice(list(self.running))
+
+    # ── Events ────────────────────────────────────────────────────────────────
+
+    def _start_proc(self, package):
+        pid, self.next_pid = self.next_pid, self.next_pid + self.random.randint(1, 40)
+        uid = 10000 + self.packages.index(package) if package in self.packages else 10999
+        self.running[package] = (pid, uid)
+        yield self._system('I', 'ActivityManager',
+                           f'Start proc {pid}:{package}/u0a{uid - 10000} for activity {{{package}/{package}.MainActivity}}')
+        yield self._entry('I', 'ActivityTaskManager', self.system_pid,
+                          f'Displayed {package}/.MainActivity: +{self.random.randint(180, 2400)}ms')
+
+    def _death(self, package):
+        pid, uid = self.running.pop(package)
+        if self.random.random() < 0.5:
+            yield self._system('I', 'ActivityManager', f'Killing {pid}:{package}/u0a{uid - 10000} (adj 905): empty #17')
+        else:
+            yield self._system('I', 'ActivityManager', f'Process {package} (pid {pid}) has died.')
+
+    def _java_crash(self, package):
+        pid, uid = self.running[package]
+        r = self.random
+        yield self._entry('E', 'AndroidRuntime', pid, 'FATAL EXCEPTION: main', uid=uid)
+        yield self._entry('E', 'AndroidRuntime', pid, f'Process: {package}, PID: {pid}', uid=uid)
+        yield self._entry('E', 'AndroidRuntime', pid, self._fill(r.choice(_EXCEPTIONS)), uid=uid)
+        for depth in range(r.randint(6, 30)):
+            cls = f'{package}.{r.choice(_WORDS).capitalize()}{r.choice(("Manager", "Fragment", "Service", "View"))}'
+            yield self._entry('E', 'AndroidRuntime', pid, f'\tat {cls}.{r.choice(_WORDS)}({cls.rsplit(".", 1)[1]}.java:{r.randint(10, 900)})', uid=uid)
+        yield from self._death(package)
+
+    def _tombstone(self, package):
+        pid, uid = self.running[package]
+        r = self.random
+        debug = self.next_pid + 7
+        yield self._entry('F', 'DEBUG', debug, '*** *** *** *** *** *** *** *** *** *** *** *** *** *** *** ***', uid=0)
+        yield self._entry('F', 'DEBUG', debug, "Build fingerprint: 'google/sdk_gphone64/emu64a:14/UE1A/1:userdebug/dev-keys'", uid=0)
+        yield self._entry('F', 'DEBUG', debug, f'pid: {pid}, tid: {pid + 3}, name: {r.choice(_WORDS)}  >>> {package} <<<', uid=0)
+        yield self._entry('F', 'DEBUG', debug, 'signal 6 (SIGABRT), code -1 (SI_QUEUE), fault addr --------', uid=0)
+        yield self._entry('F', 'DEBUG', debug, 'backtrace:', uid=0)
+        for depth in range(r.randint(4, 12)):
+            frame = self._fill(r.choice(_NATIVE_FRAMES), package)
+            yield self._entry('F', 'DEBUG', debug, f'      #{depth:02d} pc {r.getrandbits(32):016x}  {frame}', uid=0)
+        yield from self._death(package)
+
+    def _anr(self, package):
+        pid, _ = self.running[package]
+        yield self._system('E', 'ActivityManager', f'ANR in {package} ({package}/.MainActivity)')
+        yield self._system('E', 'ActivityManager', f'PID: {pid}')
+        yield self._system('E', 'ActivityManager',
+                           'Reason: Input dispatching timed out (Waiting to send non-key event because the touched window has not finished processing)')
+
+    def _gc(self, package):
+        pid, uid = self.running[package]
+        r = self.random
+        if r.random() < 0.3:
+            kind = r.choice(('GC_CONCURRENT', 'GC_FOR_ALLOC', 'GC_EXPLICIT'))
+            total = r.randint(4000, 64000)
+            free = r.randint(5, 70)
+            message = (f'{kind} freed {r.randint(100, 9000)}K, {free}% free {total * (100 - free) // 100}K/{total}K, '
+                       f'paused {r.randint(1, 30)}ms+{r.randint(1, 9)}ms')
+            return self._entry('D', 'dalvikvm', pid, message, uid=uid)
+        total = r.randint(8, 512)
+        message = (f'{r.choice(("Background concurrent copying", "Explicit concurrent mark compact", "Background young concurrent copying"))} '
+                   f'GC freed {r.randint(1000, 900000)}({r.randint(100, 90000)}KB) AllocSpace objects, '
+                   f'{r.randint(0, 40)}({r.randint(0, 9000)}KB) LOS objects, {r.randint(5, 80)}% free, '
+                   f'{r.randint(1, total)}MB/{total}MB, paused {r.randint(20, 9000)}us total {r.uniform(1, 400):.3f}ms')
+        return self._entry('I', 'art', pid, message, tid=pid + 7, uid=uid)
+
+    def _telemetry(self, package):
+        pid, uid = self.running[package]
+        r = self.random
+        if r.random() < 0.6:
+            return self._entry('I', 'Choreographer', pid,
+                               f'Skipped {r.randint(30, 400)} frames!  The application may be doing too much work on its main thread.', uid=uid)
+        violation = r.choice(('DiskReadViolation', 'DiskWriteViolation', 'NetworkViolation'))
+        return self._entry('D', 'StrictMode', pid,
+                           f'StrictMode policy violation; ~duration={r.randint(5, 900)} ms: android.os.StrictMode$StrictMode{violation}: policy=65599 violation=2', uid=uid)
+
+    # ── Stream ────────────────────────────────────────────────────────────────
+
+    def entries(self, count):
+        """Yields count entries (multi-line events may run a few entries over)."""
+        produced = 0
+        while produced < count:
+            for entry in self._next_event():
+                yield entry
+                produced += 1
+
+    def _next_event(self):
+        r = self.random
+        if self.spam:
+            remaining, (level, tag, pid, uid, message) = self.spam
+            self.spam = (remaining - 1, self.spam[1]) if remaining > 1 else None
+            return [self._entry(level, tag, pid, message, uid=uid)]
+        running, package = self._app()
+        if not running:
+            return list(self._start_proc(package))
+        pid, uid = self.running[package]
+        roll = r.random()
+        if roll < 0.0003:
+            return list(self._java_crash(package))
+        if roll < 0.0005:
+            return list(self._tombstone(package))
+        if roll < 0.0006:
+            return list(self._anr(package))
+        if roll < 0.0008:
+            return list(self._death(package))
+        if roll < 0.02:
+            return [self._gc(package)]
+        if roll < 0.03:
+            return [self._telemetry(package)]
+        if roll < 0.032:
+            message = self._fill('Retrying {w} upload, attempt {d}')
+            self.spam = (r.randint(20, 400), ('W', 'SpammySdk', pid, uid, message))
+            return [self._entry('W', 'SpammySdk', pid, message, uid=uid)]
+        level, tag, template = r.choice(_CHATTER)
+        if r.random() < 0.35:
+            return [self._system(level, tag, self._fill(template))]
+        return [self._entry(level, tag, pid, self._fill(template, package), tid=pid + r.randint(0, 20), uid=uid)]
+
+
+# ── Formatting ────────────────────────────────────────────────────────────────
+
+def _stamp(t):
+    tm = time.gmtime(t)
+    return '%02d-%02d %02d:%02d:%02d.%03d' % (tm.tm_mon, tm.tm_mday, tm.tm_hour, tm.tm_min, tm.tm_sec, int(t % 1 * 1000))
+
+
+def format_brief(entry):
+    return f'{entry.level}/{entry.tag}({entry.pid:5d}): {entry.message}\n'
+
+
+def format_threadtime(entry):
+    return f'{_stamp(entry.time)} {entry.pid:5d} {entry.tid:5d} {entry.level} {entry.tag:8s}: {entry.message}\n'
+
+
+def format_long(entry):
+    return f'[ {_stamp(entry.time)} {entry.pid:5d}:{entry.tid:5d} {entry.level}/{entry.tag} ]\n{entry.message}\n\n'
+
+
+def format_binary(entry):
+    """One logger_entry (v4 header: len, hdr_size, pid, tid, sec, nsec, lid, uid) with its payload."""
+    payload = bytes([LEVEL_PRIORITY[entry.level]]) + entry.tag.encode() + b'\0' + entry.message.encode() + b'\0'
+    sec = int(entry.time)
+    header = struct.pack('<HHiIIIII', len(payload), 28, entry.pid, entry.tid, sec,
+                         int((entry.time - sec) * 1e9), 0, entry.uid)
+    return header + payload
+
+
+FORMATTERS = {'brief': format_brief, 'threadtime': format_threadtime, 'long': format_long, 'binary': format_binary}
+
+
+def generate(out, count, fmt='threadtime', seed=0, **options):
+    """Writes count generated entries to a text (or, for binary, bytes) file object."""
+    formatter = FORMATTERS[fmt]
+    batch = []
+    for entry in LogcatGenerator(seed, **options).entries(count):
+        batch.append(formatter(entry))
+        if len(batch) >= 4096:
+            out.write((b'' if fmt == 'binary' else '').join(batch))
+            batch = []
+    out.write((b'' if fmt == 'binary' else '').join(batch))
+
+
+def generate_lines(count, fmt='threadtime', seed=0, **options):
+    """Returns generated text lines (with newlines) as a list."""
+    formatter = FORMATTERS[fmt]
+    return [formatter(entry) for entry in LogcatGenerator(seed, **options).entries(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic logcat stream.')
+    parser.add_argument('-n', '--lines', type=int, default=100000, help='Number of entries (default: 100000)')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='threadtime', help='Output format (default: threadtime)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('-r', '--rate', type=float, default=2000.0, help='Average lines per second of device time (default: 2000)')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    binary = args.format == 'binary'
+    if args.output:
+        out = open(args.output, 'wb' if binary else 'w', encoding=None if binary else 'utf-8')
+    else:
+        out = sys.stdout.buffer if binary else sys.stdout
+    try:
+        generate(out, args.lines, args.format, args.seed, rate=args.rate)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()